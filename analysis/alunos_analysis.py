@@ -1,34 +1,43 @@
 # analysis/alunos_analysis.py
 
+import datetime
+
+import numpy as np
 import pandas as pd
+from config.settings import SHEET_AGENDA, SHEET_PAGAMENTOS
+from utils.instrumentation import instrumented
+from utils.result_cache import memoized
+
+# Faixas etárias do público-alvo: intervalos [início, fim) em anos
+FAIXAS_IDADE = [0, 17, 25, 35, 50, 100]
+ROTULOS_FAIXAS = ['Menor de 18', '18-25 anos', '26-35 anos', '36-50 anos', '51+ anos']
 
 class AlunosAnalysis:
     def __init__(self, data_handler):
         self.handler = data_handler
 
+    @instrumented("analise")
+    @memoized
     def get_total_alunos(self, status='Ativo'):
         df_alunos = self.handler.get_data('alunos')
         if df_alunos.empty:
             return 0
         return df_alunos[df_alunos['status'] == status].shape[0]
 
+    @instrumented("analise")
+    @memoized
     def get_novas_matriculas_por_mes(self, start_date, end_date):
         # (Este método continua o mesmo)
-        df_alunos = self.handler.get_data('alunos')
-        if df_alunos.empty or 'data_cadastro' not in df_alunos.columns:
-            return pd.DataFrame(columns=['mes', 'novas_matriculas'])
-        df_alunos['data_cadastro'] = pd.to_datetime(df_alunos['data_cadastro'], errors='coerce')
-        start_date_dt = pd.to_datetime(start_date)
-        end_date_dt = pd.to_datetime(end_date)
-        mask = (df_alunos['data_cadastro'] >= start_date_dt) & (df_alunos['data_cadastro'] <= end_date_dt)
-        df_periodo = df_alunos.loc[mask].copy()
-        if df_periodo.empty:
+        df_periodo = self.handler.slice_by_period('alunos', start_date, end_date)
+        if df_periodo.empty or 'data_cadastro' not in df_periodo.columns:
             return pd.DataFrame(columns=['mes', 'novas_matriculas'])
         df_periodo['mes'] = df_periodo['data_cadastro'].dt.strftime('%Y-%m')
         novas_matriculas = df_periodo.groupby('mes').size().reset_index(name='novas_matriculas')
         return novas_matriculas.sort_values('mes')
 
     # --- NOVA FUNÇÃO ADICIONADA ---
+    @instrumented("analise")
+    @memoized
     def get_churn_kpis(self):
         """
         Calcula a taxa de evasão geral (lifetime).
@@ -46,4 +55,197 @@ class AlunosAnalysis:
         return {
             "inativos": alunos_inativos,
             "taxa_evasao": taxa_evasao
-        }
\ No newline at end of file
+        }
+
+    @instrumented("analise")
+    def get_demografia(self, data_referencia=None):
+        """{"generos": Series, "faixas_etarias": Series}, com a idade na data de referência (hoje, por padrão)."""
+        if data_referencia is None:
+            data_referencia = datetime.date.today()
+        # A data entra na chave do cache: o resultado muda quando alguém faz aniversário
+        return self._get_demografia(pd.Timestamp(data_referencia).normalize())
+
+    @memoized
+    def _get_demografia(self, data_referencia):
+        df_alunos = self.handler.get_data('alunos')
+        if df_alunos.empty:
+            return {
+                "generos": pd.Series(dtype='int64', name='count'),
+                "faixas_etarias": pd.Series(0, index=pd.CategoricalIndex(ROTULOS_FAIXAS, ordered=True), name='count'),
+            }
+
+        # Idade em anos completos: diferença de anos menos 1 se o aniversário ainda não chegou
+        nascimento = df_alunos['data_nascimento']
+        dia_do_ano = nascimento.dt.month.to_numpy() * 100 + nascimento.dt.day.to_numpy()
+        idade = data_referencia.year - nascimento.dt.year.to_numpy()
+        idade = idade - (dia_do_ano > data_referencia.month * 100 + data_referencia.day)
+
+        faixa = np.searchsorted(FAIXAS_IDADE, idade, side='right') - 1
+        validas = ~np.isnan(idade) & (faixa >= 0) & (faixa < len(ROTULOS_FAIXAS))
+        faixas_etarias = pd.Series(
+            np.bincount(faixa[validas].astype(np.int64), minlength=len(ROTULOS_FAIXAS)),
+            index=pd.CategoricalIndex(ROTULOS_FAIXAS, ordered=True), name='count'
+        )
+
+        generos = df_alunos['genero'][df_alunos['genero'].isin(['Feminino', 'Masculino'])].value_counts()
+        generos = generos[generos > 0] # 'genero' é categórico: descarta categorias sem alunos
+        return {"generos": generos, "faixas_etarias": faixas_etarias}
+
+    # --- Coortes e evasão por período ---
+
+    @memoized
+    def _get_atividade_mensal(self):
+        """
+        Atividade aluno x mês (aula não cancelada ou pagamento confirmado), como
+        pares (aluno, mês) distintos e como bitmap por aluno (64 meses por palavra).
+        """
+        alunos = self.handler.indexes.get('alunos')
+        df_alunos = alunos.frame
+        if df_alunos.empty:
+            return None
+
+        if self.handler.storage.pushdown:
+            ids, meses = self._atividade_sql()
+        else:
+            ids, datas = [], []
+            df_agenda = self.handler.get_data('agenda_aulas')
+            if not df_agenda.empty:
+                realizadas = df_agenda.loc[df_agenda['status'] != 'Cancelada']
+                ids.append(realizadas['aluno_id'].to_numpy())
+                datas.append(realizadas['data_aula'].to_numpy())
+            df_pagamentos = self.handler.get_data('pagamentos')
+            if not df_pagamentos.empty:
+                pagos = df_pagamentos.loc[df_pagamentos['status'] == 'Pago']
+                ids.append(pagos['aluno_id'].to_numpy())
+                datas.append(pagos['data_pagamento'].to_numpy())
+
+            ids = np.concatenate(ids) if ids else np.array([], dtype=np.int64)
+            meses = np.concatenate(datas).astype('datetime64[M]') if datas else np.array([], dtype='datetime64[M]')
+        aluno_pos = alunos.positions(ids)
+        validos = (aluno_pos >= 0) & ~np.isnat(meses)
+        aluno_pos, meses = aluno_pos[validos], meses[validos].astype(np.int64)
+
+        cadastro = df_alunos['data_cadastro'].to_numpy().astype('datetime64[M]')
+        com_cadastro = ~np.isnat(cadastro)
+        todos = np.concatenate([meses, cadastro[com_cadastro].astype(np.int64)])
+        if not len(todos):
+            return None
+        primeiro_mes = int(todos.min())
+        n_meses = int(todos.max()) - primeiro_mes + 1
+
+        # Pares (aluno, mês) distintos, já ordenados por aluno e mês
+        pares = np.unique(aluno_pos * n_meses + (meses - primeiro_mes))
+        pares_aluno, pares_mes = np.divmod(pares, n_meses)
+
+        n_palavras = (n_meses + 63) // 64
+        chave = pares_aluno * n_palavras + pares_mes // 64
+        bits = np.left_shift(np.uint64(1), (pares_mes % 64).astype(np.uint64))
+        bitmap = np.zeros(len(df_alunos) * n_palavras, dtype=np.uint64)
+        if len(chave):
+            inicios = np.flatnonzero(np.r_[True, chave[1:] != chave[:-1]])
+            bitmap[chave[inicios]] = np.bitwise_or.reduceat(bits, inicios)
+
+        return {
+            "primeiro_mes": primeiro_mes,
+            "n_meses": n_meses,
+            "bitmap": bitmap.reshape(len(df_alunos), n_palavras),
+            "pares_aluno": pares_aluno,
+            "pares_mes": pares_mes,
+            "coorte": np.where(com_cadastro, cadastro.astype(np.int64) - primeiro_mes, -1),
+            "status_ativo": (df_alunos['status'] == 'Ativo').to_numpy(),
+        }
+
+    def _atividade_sql(self):
+        """Pares (aluno, mês de atividade) distintos, calculados no banco sem ler agenda e pagamentos."""
+        pares = self.handler.storage.query(f'''
+            SELECT aluno_id, substr(data_aula, 1, 7) AS mes FROM "{SHEET_AGENDA}"
+            WHERE aluno_id IS NOT NULL AND data_aula IS NOT NULL AND (status IS NULL OR status <> 'Cancelada')
+            UNION
+            SELECT aluno_id, substr(data_pagamento, 1, 7) FROM "{SHEET_PAGAMENTOS}"
+            WHERE aluno_id IS NOT NULL AND data_pagamento IS NOT NULL AND status = 'Pago'
+        ''')
+        ids = pares['aluno_id'].to_numpy(dtype=np.int64)
+        meses = pd.to_datetime(pares['mes'], format='%Y-%m').to_numpy().astype('datetime64[M]')
+        return ids, meses
+
+    @staticmethod
+    def _ativos_no_mes(atividade, mes):
+        """Vetor booleano (um por aluno): ativo no mês `mes` (índice relativo ao primeiro mês)."""
+        bitmap = atividade["bitmap"]
+        if mes < 0 or mes >= atividade["n_meses"]:
+            return np.zeros(len(bitmap), dtype=bool)
+        palavra = bitmap[:, mes // 64]
+        return ((palavra >> np.uint64(mes % 64)) & np.uint64(1)).astype(bool)
+
+    @staticmethod
+    def _indice_mes(atividade, data):
+        return int(np.datetime64(pd.Timestamp(data), 'M').astype(np.int64)) - atividade["primeiro_mes"]
+
+    @instrumented("analise")
+    @memoized
+    def get_churn_periodo(self, start_date, end_date):
+        """
+        Evasão no período: ativos no mês anterior ao início que não estão ativos
+        no mês final (no mês mais recente, quem ainda está 'Ativo' não conta).
+        """
+        vazio = {"ativos_inicio": 0, "evadidos": 0, "novos": 0, "taxa_evasao": 0.0}
+        atividade = self._get_atividade_mensal()
+        if atividade is None:
+            return vazio
+
+        inicio = self._indice_mes(atividade, start_date)
+        fim = self._indice_mes(atividade, end_date)
+        base = self._ativos_no_mes(atividade, inicio - 1)
+        evadidos = base & ~self._ativos_no_mes(atividade, fim)
+        if fim >= atividade["n_meses"] - 1:
+            evadidos &= ~atividade["status_ativo"]
+
+        coorte = atividade["coorte"]
+        ativos_inicio = int(base.sum())
+        total_evadidos = int(evadidos.sum())
+        return {
+            "ativos_inicio": ativos_inicio,
+            "evadidos": total_evadidos,
+            "novos": int(((coorte >= inicio) & (coorte <= fim)).sum()),
+            "taxa_evasao": (total_evadidos / ativos_inicio) * 100 if ativos_inicio > 0 else 0.0,
+        }
+
+    @instrumented("analise")
+    @memoized
+    def get_retencao_coortes(self, start_date=None, end_date=None):
+        """
+        Retenção por coorte de cadastro ('AAAA-MM'): coluna k = % da coorte ativa
+        k meses depois; 'alunos' é o tamanho da coorte. Com período, só as coortes dele.
+        """
+        atividade = self._get_atividade_mensal()
+        if atividade is None:
+            return pd.DataFrame(columns=['alunos'])
+        n = atividade["n_meses"]
+        coorte = atividade["coorte"]
+
+        # Uma única contagem sobre os pares (aluno, mês): coorte x distância em meses
+        coorte_pares = coorte[atividade["pares_aluno"]]
+        distancia = atividade["pares_mes"] - coorte_pares
+        validos = (coorte_pares >= 0) & (distancia >= 0)
+        ativos = np.bincount(coorte_pares[validos] * n + distancia[validos], minlength=n * n).reshape(n, n)
+        tamanho = np.bincount(coorte[coorte >= 0], minlength=n)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            retencao = ativos / tamanho[:, None] * 100
+        # Coorte c só tem dados até a distância n-1-c
+        retencao[np.arange(n)[None, :] > (n - 1 - np.arange(n))[:, None]] = np.nan
+
+        linhas = tamanho > 0
+        if start_date is not None:
+            linhas &= np.arange(n) >= self._indice_mes(atividade, start_date)
+        if end_date is not None:
+            linhas &= np.arange(n) <= self._indice_mes(atividade, end_date)
+        if not linhas.any():
+            return pd.DataFrame(columns=['alunos'])
+
+        indices = np.flatnonzero(linhas)
+        meses = (np.datetime64(0, 'M') + atividade["primeiro_mes"] + indices).astype('datetime64[M]')
+        resultado = pd.DataFrame(retencao[indices], index=pd.Index(np.datetime_as_string(meses, unit='M'), name='coorte'))
+        resultado = resultado.loc[:, resultado.notna().any()]
+        resultado.insert(0, 'alunos', tamanho[indices])
+        return resultado
@@ -1,55 +1,77 @@
 # analysis/aulas_analysis.py
+import numpy as np
 import pandas as pd
+from config.settings import SHEET_AGENDA, SHEET_INSTRUMENTOS
+from utils.instrumentation import instrumented
+from utils.result_cache import memoized
+from utils.id_index import frame_by_name, totals_by_code
+
+# Nomes fixos (segunda = 0, como em dt.weekday): não dependem do locale do sistema
+DIAS_SEMANA = ['Segunda-feira', 'Terça-feira', 'Quarta-feira', 'Quinta-feira', 'Sexta-feira', 'Sábado', 'Domingo']
 
 class AulasAnalysis:
     def __init__(self, data_handler):
         self.handler = data_handler
 
     def _filter_aulas_by_date(self, start_date, end_date, status_filter=None):
-        df_agenda = self.handler.get_data('agenda_aulas')
-        if df_agenda.empty:
-            return pd.DataFrame()
-        
-        df_agenda['data_aula'] = pd.to_datetime(df_agenda['data_aula'], errors='coerce')
-        start_date_dt = pd.to_datetime(start_date)
-        end_date_dt = pd.to_datetime(end_date)
-        
-        mask = (df_agenda['data_aula'] >= start_date_dt) & (df_agenda['data_aula'] <= end_date_dt)
-        df_periodo = df_agenda.loc[mask]
+        # A agenda fica ordenada por 'data_aula': o recorte é feito por busca binária
+        df_periodo = self.handler.slice_by_period('agenda_aulas', start_date, end_date)
         
         if status_filter and not df_periodo.empty:
             df_periodo = df_periodo[df_periodo['status'].isin(status_filter)]
             
         return df_periodo
 
+    @instrumented("analise")
+    @memoized
     def get_total_aulas_por_status(self, start_date, end_date):
-        df_periodo = self._filter_aulas_by_date(start_date, end_date)
-        if df_periodo.empty:
+        # Soma as células diárias do cubo de aulas em vez de agrupar cada aula
+        cubo = self.handler.rollups.aulas(start_date, end_date)
+        if cubo.empty:
             return pd.DataFrame(columns=['status', 'total_aulas'])
-        return df_periodo.groupby('status').size().reset_index(name='total_aulas')
+        return cubo.groupby('status', observed=True)['aulas'].sum().reset_index(name='total_aulas')
 
+    @instrumented("analise")
+    @memoized
     def get_popularidade_instrumentos(self, start_date, end_date):
+        if self.handler.storage.pushdown:
+            return self._popularidade_sql(start_date, end_date)
         df_periodo = self._filter_aulas_by_date(start_date, end_date)
-        df_instrumentos = self.handler.get_data('instrumentos')
-        if df_periodo.empty or df_instrumentos.empty:
+        instrumentos = self.handler.indexes.get('instrumentos')
+        if df_periodo.empty or instrumentos.frame.empty:
             return pd.DataFrame()
-        
-        df_merged = pd.merge(df_periodo, df_instrumentos, left_on='instrumento_id', right_on='id')
-        resultado = df_merged.groupby('nome_instrumento').size().reset_index(name='total_aulas_agendadas')
+
+        # Código do nome de cada aula via índice por id, em vez de merge + groupby
+        codes, nomes = instrumentos.name_codes(df_periodo['instrumento_id'].to_numpy(), 'nome_instrumento')
+        counts, _ = totals_by_code(codes, len(nomes))
+        resultado = frame_by_name(nomes, counts, 'nome_instrumento', total_aulas_agendadas=counts)
         return resultado.sort_values('total_aulas_agendadas', ascending=False)
 
+    def _popularidade_sql(self, start_date, end_date):
+        """Aulas do período por instrumento, contadas no banco."""
+        contagem = self.handler.storage.query(f'''
+            SELECT i.nome_instrumento AS nome, COUNT(*) AS aulas
+            FROM "{SHEET_AGENDA}" a JOIN "{SHEET_INSTRUMENTOS}" i ON i.id = a.instrumento_id
+            WHERE a.data_aula BETWEEN ? AND ? AND i.nome_instrumento IS NOT NULL
+            GROUP BY i.nome_instrumento
+        ''', (pd.to_datetime(start_date), pd.to_datetime(end_date)))
+        if contagem.empty:
+            return pd.DataFrame()
+        counts = contagem['aulas'].to_numpy(dtype=np.int64)
+        resultado = frame_by_name(contagem['nome'].to_numpy(dtype=object), counts, 'nome_instrumento',
+                                  total_aulas_agendadas=counts)
+        return resultado.sort_values('total_aulas_agendadas', ascending=False)
+
+    @instrumented("analise")
+    @memoized
     def get_peak_hours_data(self, start_date, end_date):
-        # (Este método já está correto)
-        df_periodo = self._filter_aulas_by_date(start_date, end_date)
-        if df_periodo.empty:
+        # Grade 7x24 do período = diferença das somas prefixas diárias dos cubos
+        grade = self.handler.rollups.horarios(start_date, end_date)
+        horas = np.flatnonzero(grade.sum(axis=0))
+        if not len(horas):
             return pd.DataFrame()
-        # ... resto do código ...
-        df_periodo['dia_semana_num'] = df_periodo['data_aula'].dt.weekday
-        df_periodo['dia_semana_nome'] = df_periodo['data_aula'].dt.day_name(locale='pt_BR.utf8')
-        df_periodo['hora_aula'] = pd.to_datetime(df_periodo['hora_inicio'], format='%H:%M:%S', errors='coerce').dt.hour
-        heatmap_data = df_periodo.pivot_table(index=['dia_semana_num', 'dia_semana_nome'], columns='hora_aula', values='id', aggfunc='count', fill_value=0)
-        dias_ordem = {0: 'Segunda-feira', 1: 'Terça-feira', 2: 'Quarta-feira', 3: 'Quinta-feira', 4: 'Sexta-feira', 5: 'Sábado', 6: 'Domingo'}
-        heatmap_data = heatmap_data.reset_index().set_index('dia_semana_num').rename(columns={'dia_semana_nome':''}).reindex(range(7)).fillna(0)
-        heatmap_data[''] = heatmap_data.index.map(dias_ordem)
-        heatmap_data = heatmap_data.set_index('')
-        return heatmap_data
\ No newline at end of file
+        return pd.DataFrame(
+            grade[:, horas],
+            index=pd.Index(DIAS_SEMANA, name=''),
+            columns=pd.Index(horas, name='hora_aula'),
+        )
@@ -1,52 +1,86 @@
 # analysis/financeiro_analysis.py
 import pandas as pd
+from config.settings import SHEET_AGENDA, SHEET_PAGAMENTOS
+from utils.instrumentation import instrumented
+from utils.result_cache import memoized
+from utils.rollups import by_month
+from utils.id_index import frame_by_name, totals_by_code
 
 class FinanceiroAnalysis:
     def __init__(self, data_handler):
         self.handler = data_handler
 
     def _filter_pagamentos_by_date(self, start_date, end_date):
-        df_pagamentos = self.handler.get_data('pagamentos')
+        # Os pagamentos ficam ordenados por 'data_pagamento': o recorte é feito por busca binária
+        df_pagamentos = self.handler.slice_by_period('pagamentos', start_date, end_date)
         if df_pagamentos.empty:
-            return pd.DataFrame()
-        
-        df_pagamentos['data_pagamento'] = pd.to_datetime(df_pagamentos['data_pagamento'], errors='coerce')
-        start_date_dt = pd.to_datetime(start_date)
-        end_date_dt = pd.to_datetime(end_date)
-
-        mask = (df_pagamentos['data_pagamento'] >= start_date_dt) & (df_pagamentos['data_pagamento'] <= end_date_dt) & (df_pagamentos['status'] == 'Pago')
-        return df_pagamentos.loc[mask]
+            return df_pagamentos
+        return df_pagamentos.loc[df_pagamentos['status'] == 'Pago']
 
+    @instrumented("analise")
+    @memoized
     def get_faturamento_total_por_mes(self, start_date, end_date):
-        pagamentos_validos = self._filter_pagamentos_by_date(start_date, end_date)
-        if pagamentos_validos.empty:
+        # Soma as células diárias do cubo de pagamentos em vez de varrer cada pagamento
+        cubo = self.handler.rollups.pagamentos(start_date, end_date)
+        if cubo.empty:
             return pd.DataFrame(columns=['mes', 'faturamento_mensal'])
-        
-        pagamentos_validos['mes'] = pagamentos_validos['data_pagamento'].dt.strftime('%Y-%m')
-        resultado = pagamentos_validos.groupby('mes')['valor_pago'].sum().reset_index(name='faturamento_mensal')
+        cubo = cubo[cubo['status'] == 'Pago']
+        if cubo.empty:
+            return pd.DataFrame(columns=['mes', 'faturamento_mensal'])
+
+        resultado = by_month(cubo, 'valor').rename_axis('mes').reset_index(name='faturamento_mensal')
         return resultado.sort_values('mes')
 
-    def get_faturamento_por_instrumento(self, start_date, end_date):
+    def _faturamento_por_nome(self, start_date, end_date, sheet_name, id_column, name_column):
+        """
+        Soma dos pagamentos do período pelo nome (instrumento ou professor) da
+        aula de referência. Equivale a pagamentos -> agenda -> `sheet_name` com
+        dois pd.merge, mas usando os índices por id do DataHandler.
+        """
+        if self.handler.storage.pushdown:
+            return self._faturamento_por_nome_sql(start_date, end_date, sheet_name, id_column, name_column)
         pagamentos_validos = self._filter_pagamentos_by_date(start_date, end_date)
-        df_agenda = self.handler.get_data('agenda_aulas')
-        df_instrumentos = self.handler.get_data('instrumentos')
-        if pagamentos_validos.empty or df_agenda.empty or df_instrumentos.empty:
-            return pd.DataFrame()
+        agenda = self.handler.indexes.get('agenda_aulas')
+        destino = self.handler.indexes.get(sheet_name)
+        if pagamentos_validos.empty or agenda.frame.empty or destino.frame.empty:
+            return None
+
+        aula_pos = agenda.positions(pagamentos_validos['referencia_aula_id'].to_numpy())
+        encontrados = aula_pos >= 0
+        codes, nomes = destino.name_codes(agenda.values(id_column, aula_pos[encontrados]), name_column)
+        valores = pagamentos_validos['valor_pago'].to_numpy()[encontrados]
+        counts, totais = totals_by_code(codes, len(nomes), valores)
+        return frame_by_name(nomes, counts, name_column, total=totais)
+
+    def _faturamento_por_nome_sql(self, start_date, end_date, sheet_name, id_column, name_column):
+        """O mesmo cálculo como uma consulta: recorte pelo índice da data e junções pelos índices dos ids."""
+        resultado = self.handler.storage.query(f'''
+            SELECT d."{name_column}" AS nome, COUNT(*) AS n, COALESCE(SUM(p.valor_pago), 0) AS total
+            FROM "{SHEET_PAGAMENTOS}" p
+            JOIN "{SHEET_AGENDA}" a ON a.id = p.referencia_aula_id
+            JOIN "{self.handler.sheet_names[sheet_name]}" d ON d.id = a."{id_column}"
+            WHERE p.data_pagamento BETWEEN ? AND ? AND p.status = 'Pago' AND d."{name_column}" IS NOT NULL
+            GROUP BY d."{name_column}"
+        ''', (pd.to_datetime(start_date), pd.to_datetime(end_date)))
+        if resultado.empty:
+            return None
+        return frame_by_name(resultado['nome'].to_numpy(dtype=object), resultado['n'].to_numpy(), name_column,
+                             total=resultado['total'].to_numpy(dtype=float))
 
-        merge1 = pd.merge(pagamentos_validos, df_agenda, left_on='referencia_aula_id', right_on='id')
-        merge2 = pd.merge(merge1, df_instrumentos, left_on='instrumento_id', right_on='id')
-        resultado = merge2.groupby('nome_instrumento')['valor_pago'].sum().reset_index(name='faturamento_instrumento')
+    @instrumented("analise")
+    @memoized
+    def get_faturamento_por_instrumento(self, start_date, end_date):
+        resultado = self._faturamento_por_nome(start_date, end_date, 'instrumentos', 'instrumento_id', 'nome_instrumento')
+        if resultado is None:
+            return pd.DataFrame()
+        resultado = resultado.rename(columns={'total': 'faturamento_instrumento'})
         return resultado.sort_values('faturamento_instrumento', ascending=False)
 
+    @instrumented("analise")
+    @memoized
     def get_faturamento_por_professor(self, start_date, end_date):
-        pagamentos_validos = self._filter_pagamentos_by_date(start_date, end_date)
-        df_agenda = self.handler.get_data('agenda_aulas')
-        df_professores = self.handler.get_data('professores')
-        if pagamentos_validos.empty or df_agenda.empty or df_professores.empty:
+        resultado = self._faturamento_por_nome(start_date, end_date, 'professores', 'professor_id', 'nome')
+        if resultado is None:
             return pd.DataFrame()
-        
-        merge1 = pd.merge(pagamentos_validos, df_agenda, left_on='referencia_aula_id', right_on='id')
-        merge2 = pd.merge(merge1, df_professores, left_on='professor_id', right_on='id')
-        resultado = merge2.groupby('nome')['valor_pago'].sum().reset_index(name='faturamento_professor')
-        resultado = resultado.rename(columns={'nome': 'nome_professor'})
+        resultado = resultado.rename(columns={'nome': 'nome_professor', 'total': 'faturamento_professor'})
         return resultado.sort_values('faturamento_professor', ascending=False)
\ No newline at end of file
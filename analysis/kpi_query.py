@@ -0,0 +1,179 @@
+# analysis/kpi_query.py
+
+import numpy as np
+import pandas as pd
+from analysis.alunos_analysis import AlunosAnalysis
+from analysis.aulas_analysis import AulasAnalysis
+from utils.id_index import frame_by_name
+from utils.instrumentation import instrumented
+
+
+class KpiQuery:
+    """
+    Vários KPIs de um período numa única chamada. Cada fonte (KPIS) é recortada
+    uma vez e agrupada pelas dimensões pedidas; os KPIs ficam no cache um a um.
+    """
+
+    # KPI -> (fonte, dimensão que ele precisa no groupby da fonte)
+    KPIS = {
+        'faturamento_total': ('pagamentos', None),
+        'aulas_pagas': ('pagamentos', None),
+        'ticket_medio': ('pagamentos', None),
+        'faturamento_por_mes': ('pagamentos', 'mes'),
+        'faturamento_por_instrumento': ('pagamentos', 'instrumento_id'),
+        'faturamento_por_professor': ('pagamentos', 'professor_id'),
+        'total_aulas': ('aulas', 'status'),
+        'aulas_por_status': ('aulas', 'status'),
+        'aulas_concluidas': ('aulas', 'status'),
+        'taxa_conclusao': ('aulas', 'status'),
+        # Sem cubo próprio: vêm das análises
+        'popularidade_instrumentos': ('analises', None),
+        'horarios_pico': ('analises', None),
+        'alunos_ativos': ('analises', None),
+    }
+
+    def __init__(self, data_handler):
+        self.handler = data_handler
+        self._alunos = AlunosAnalysis(data_handler)
+        self._aulas = AulasAnalysis(data_handler)
+
+    @instrumented("analise")
+    def compute(self, period, kpis):
+        """{kpi: valor} dos KPIs pedidos para o período (start_date, end_date)."""
+        desconhecidos = [nome for nome in kpis if nome not in self.KPIS]
+        if desconhecidos:
+            raise ValueError(f"KPI desconhecido: {', '.join(desconhecidos)} (disponíveis: {', '.join(self.KPIS)})")
+        cache = self.handler.result_cache
+        period = tuple(period)
+
+        resultados, por_fonte = {}, {}
+        for nome in dict.fromkeys(kpis):
+            achado, valor = cache.lookup((type(self).__name__, nome, period))
+            if achado:
+                resultados[nome] = valor
+            else:
+                por_fonte.setdefault(self.KPIS[nome][0], []).append(nome)
+
+        for fonte, nomes in por_fonte.items():
+            dims = list(dict.fromkeys(self.KPIS[nome][1] for nome in nomes if self.KPIS[nome][1]))
+            with cache.recording() as calculo:
+                base = getattr(self, f'_varrer_{fonte}')(*period, dims)
+                valores = {nome: getattr(self, f'_kpi_{nome}')(base) for nome in nomes}
+            for nome, valor in valores.items():
+                resultados[nome] = cache.store((type(self).__name__, nome, period), valor, calculo)
+        return {nome: resultados[nome] for nome in kpis}
+
+    # --- Fontes: um recorte e um groupby por fonte ---
+
+    def _varrer_pagamentos(self, start_date, end_date, dims):
+        """Células pagas do cubo de pagamentos no período, agrupadas pelas dimensões pedidas."""
+        cubo = self.handler.rollups.pagamentos(start_date, end_date)
+        if cubo.empty:
+            return None
+        cubo = cubo.loc[cubo['status'] == 'Pago']
+        if cubo.empty:
+            return None
+        valores = cubo[['valor', 'pagamentos']]
+        if not dims:
+            return valores
+        chaves = [
+            pd.Series(cubo['dia'].to_numpy().astype('datetime64[M]'), index=cubo.index, name='mes')
+            if dim == 'mes' else cubo[dim]
+            for dim in dims
+        ]
+        return valores.groupby(chaves, observed=True).sum()
+
+    def _varrer_aulas(self, start_date, end_date, dims):
+        """Células do cubo de aulas no período, agrupadas pelas dimensões pedidas."""
+        cubo = self.handler.rollups.aulas(start_date, end_date)
+        if cubo.empty:
+            return None
+        return cubo[['aulas']].groupby([cubo[dim] for dim in dims], observed=True).sum()
+
+    def _varrer_analises(self, start_date, end_date, dims):
+        return start_date, end_date
+
+    @staticmethod
+    def _por(base, dim):
+        """Totais da fonte só pela dimensão `dim` (o groupby pode ter sido feito por mais de uma)."""
+        if base.index.nlevels == 1:
+            return base
+        return base.groupby(level=dim, observed=True).sum()
+
+    # --- Pagamentos ---
+
+    def _kpi_faturamento_total(self, base):
+        return float(base['valor'].sum()) if base is not None else 0.0
+
+    def _kpi_aulas_pagas(self, base):
+        return int(base['pagamentos'].sum()) if base is not None else 0
+
+    def _kpi_ticket_medio(self, base):
+        pagas = self._kpi_aulas_pagas(base)
+        return self._kpi_faturamento_total(base) / pagas if pagas > 0 else 0.0
+
+    def _kpi_faturamento_por_mes(self, base):
+        if base is None:
+            return pd.DataFrame(columns=['mes', 'faturamento_mensal'])
+        por_mes = self._por(base, 'mes')['valor']
+        por_mes.index = pd.DatetimeIndex(por_mes.index).strftime('%Y-%m')
+        return por_mes.rename_axis('mes').reset_index(name='faturamento_mensal').sort_values('mes')
+
+    def _faturamento_por_nome(self, base, sheet_name, id_column, name_column):
+        """Valor e nº de pagamentos por nome do instrumento/professor das aulas de referência."""
+        destino = self.handler.indexes.get(sheet_name)
+        if base is None or destino.frame.empty:
+            return None
+        por_id = self._por(base, id_column)
+        codes, nomes = destino.name_codes(por_id.index.to_numpy(), name_column)
+        encontrados = codes >= 0
+        pagamentos = np.bincount(codes[encontrados], weights=por_id['pagamentos'].to_numpy()[encontrados],
+                                 minlength=len(nomes))
+        totais = np.bincount(codes[encontrados], weights=por_id['valor'].to_numpy(dtype=float)[encontrados],
+                             minlength=len(nomes))
+        return frame_by_name(nomes, pagamentos, name_column, total=totais)
+
+    def _kpi_faturamento_por_instrumento(self, base):
+        resultado = self._faturamento_por_nome(base, 'instrumentos', 'instrumento_id', 'nome_instrumento')
+        if resultado is None:
+            return pd.DataFrame()
+        resultado = resultado.rename(columns={'total': 'faturamento_instrumento'})
+        return resultado.sort_values('faturamento_instrumento', ascending=False)
+
+    def _kpi_faturamento_por_professor(self, base):
+        resultado = self._faturamento_por_nome(base, 'professores', 'professor_id', 'nome')
+        if resultado is None:
+            return pd.DataFrame()
+        resultado = resultado.rename(columns={'nome': 'nome_professor', 'total': 'faturamento_professor'})
+        return resultado.sort_values('faturamento_professor', ascending=False)
+
+    # --- Aulas ---
+
+    def _kpi_aulas_por_status(self, base):
+        if base is None:
+            return pd.DataFrame(columns=['status', 'total_aulas'])
+        return self._por(base, 'status')['aulas'].reset_index(name='total_aulas')
+
+    def _kpi_total_aulas(self, base):
+        return int(base['aulas'].sum()) if base is not None else 0
+
+    def _kpi_aulas_concluidas(self, base):
+        if base is None:
+            return 0
+        por_status = self._por(base, 'status')['aulas']
+        return int(por_status[por_status.index == 'Concluída'].sum())
+
+    def _kpi_taxa_conclusao(self, base):
+        total = self._kpi_total_aulas(base)
+        return self._kpi_aulas_concluidas(base) / total * 100 if total > 0 else 0.0
+
+    # --- Delegados às análises ---
+
+    def _kpi_popularidade_instrumentos(self, periodo):
+        return self._aulas.get_popularidade_instrumentos(*periodo)
+
+    def _kpi_horarios_pico(self, periodo):
+        return self._aulas.get_peak_hours_data(*periodo)
+
+    def _kpi_alunos_ativos(self, periodo):
+        return self._alunos.get_total_alunos(status='Ativo')
@@ -1,71 +1,92 @@
 # analysis/professores_analysis.py
 
+import numpy as np
 import pandas as pd
+from config.settings import SHEET_AGENDA, SHEET_PROFESSORES
+from utils.instrumentation import instrumented
+from utils.result_cache import memoized
+from utils.id_index import frame_by_name, totals_by_code
 
 class ProfessoresAnalysis:
     def __init__(self, data_handler):
         self.handler = data_handler
 
     # --- FUNÇÃO ATUALIZADA E MELHORADA ---
+    @instrumented("analise")
+    @memoized
     def get_carga_horaria_professor(self, start_date, end_date):
         """
         Calcula a carga horária (em aulas e horas) por professor para um dado período.
         """
-        df_agenda = self.handler.get_data('agenda_aulas')
-        df_professores = self.handler.get_data('professores')
+        if self.handler.storage.pushdown:
+            return self._carga_horaria_sql(start_date, end_date)
+        df_agenda = self.handler.slice_by_period('agenda_aulas', start_date, end_date)
+        professores = self.handler.indexes.get('professores')
 
-        if df_agenda.empty or df_professores.empty:
+        if df_agenda.empty or professores.frame.empty:
             return pd.DataFrame(columns=['nome_professor', 'aulas_concluidas', 'horas_lecionadas'])
 
-        # Prepara as colunas de data e hora
-        df_agenda['data_aula'] = pd.to_datetime(df_agenda['data_aula'], errors='coerce')
-        df_agenda['hora_inicio'] = pd.to_timedelta(df_agenda['hora_inicio'].astype(str), errors='coerce')
-        df_agenda['hora_fim'] = pd.to_timedelta(df_agenda['hora_fim'].astype(str), errors='coerce')
-
-        # Filtra pelo período e status
-        start_date_dt = pd.to_datetime(start_date)
-        end_date_dt = pd.to_datetime(end_date)
-        mask = (
-            (df_agenda['status'] == 'Concluída') &
-            (df_agenda['data_aula'] >= start_date_dt) &
-            (df_agenda['data_aula'] <= end_date_dt)
-        )
-        df_agenda_filtrada = df_agenda.loc[mask].copy()
+        # O período já veio recortado por slice_by_period; falta só o status.
+        # 'hora_inicio'/'hora_fim' já chegam como timedelta64 (ver config/schema.py)
+        df_agenda_filtrada = df_agenda.loc[df_agenda['status'] == 'Concluída']
 
         if df_agenda_filtrada.empty:
             return pd.DataFrame(columns=['nome_professor', 'aulas_concluidas', 'horas_lecionadas'])
             
         # Calcula a duração de cada aula em horas
-        df_agenda_filtrada['duracao_horas'] = (df_agenda_filtrada['hora_fim'] - df_agenda_filtrada['hora_inicio']).dt.total_seconds() / 3600
-
-        # Junta com a tabela de professores
-        df_merged = pd.merge(df_agenda_filtrada, df_professores, left_on='professor_id', right_on='id')
+        duracao_horas = (df_agenda_filtrada['hora_fim'] - df_agenda_filtrada['hora_inicio']).dt.total_seconds().to_numpy() / 3600
 
-        # Agrupa por nome e agrega os resultados
-        resultado = df_merged.groupby('nome').agg(
-            aulas_concluidas=('id_x', 'count'),
-            horas_lecionadas=('duracao_horas', 'sum')
-        ).reset_index()
+        # Nome do professor de cada aula via índice por id; contagem e soma por nome com bincount
+        codes, nomes = professores.name_codes(df_agenda_filtrada['professor_id'].to_numpy(), 'nome')
+        aulas, horas = totals_by_code(codes, len(nomes), duracao_horas)
+        resultado = frame_by_name(nomes, aulas, 'nome', aulas_concluidas=aulas, horas_lecionadas=horas)
         resultado = resultado.rename(columns={'nome': 'nome_professor'})
         
         return resultado.sort_values('aulas_concluidas', ascending=False)
 
+    def _carga_horaria_sql(self, start_date, end_date):
+        """Carga horária com o filtro, a junção e o agrupamento feitos no banco (horários em segundos)."""
+        carga = self.handler.storage.query(f'''
+            SELECT pr.nome AS nome, COUNT(*) AS aulas, COALESCE(SUM(a.hora_fim - a.hora_inicio), 0) / 3600.0 AS horas
+            FROM "{SHEET_AGENDA}" a JOIN "{SHEET_PROFESSORES}" pr ON pr.id = a.professor_id
+            WHERE a.data_aula BETWEEN ? AND ? AND a.status = 'Concluída' AND pr.nome IS NOT NULL
+            GROUP BY pr.nome
+        ''', (pd.to_datetime(start_date), pd.to_datetime(end_date)))
+        if carga.empty:
+            return pd.DataFrame(columns=['nome_professor', 'aulas_concluidas', 'horas_lecionadas'])
+        aulas = carga['aulas'].to_numpy(dtype=np.int64)
+        resultado = frame_by_name(carga['nome'].to_numpy(dtype=object), aulas, 'nome',
+                                  aulas_concluidas=aulas, horas_lecionadas=carga['horas'].to_numpy(dtype=float))
+        resultado = resultado.rename(columns={'nome': 'nome_professor'})
+        return resultado.sort_values('aulas_concluidas', ascending=False)
+
+    @instrumented("analise")
+    @memoized
     def get_instrumentos_por_professor(self):
-        # (Este método não precisa de alteração)
         df_agenda = self.handler.get_data('agenda_aulas')
-        df_professores = self.handler.get_data('professores')
-        df_instrumentos = self.handler.get_data('instrumentos')
+        professores = self.handler.indexes.get('professores')
+        instrumentos = self.handler.indexes.get('instrumentos')
 
-        if df_agenda.empty or df_professores.empty or df_instrumentos.empty:
+        if df_agenda.empty or professores.frame.empty or instrumentos.frame.empty:
             return pd.DataFrame()
             
         aulas_concluidas = df_agenda[df_agenda['status'] == 'Concluída']
-        merge1 = pd.merge(aulas_concluidas, df_professores, left_on='professor_id', right_on='id')
-        merge2 = pd.merge(merge1, df_instrumentos, left_on='instrumento_id', right_on='id', suffixes=('_prof', '_instr'))
-        
-        resultado = merge2.groupby('nome').agg(
-            instrumentos_lecionados=('nome_instrumento', lambda x: ', '.join(x.unique()))
-        ).reset_index()
+        prof_codes, nomes_prof = professores.name_codes(aulas_concluidas['professor_id'].to_numpy(), 'nome')
+        instr_codes, nomes_instr = instrumentos.name_codes(aulas_concluidas['instrumento_id'].to_numpy(), 'nome_instrumento')
+        validos = (prof_codes >= 0) & (instr_codes >= 0)
+        prof_codes, instr_codes = prof_codes[validos], instr_codes[validos]
+
+        # Pares (professor, instrumento) distintos, na ordem em que aparecem pela primeira vez
+        _, primeiros = np.unique(prof_codes * len(nomes_instr) + instr_codes, return_index=True)
+        primeiros = np.sort(primeiros)
+        pares = pd.DataFrame({'prof': prof_codes[primeiros], 'instrumento': nomes_instr[instr_codes[primeiros]]})
+        lecionados = pares.groupby('prof', sort=False)['instrumento'].agg(', '.join)
+
+        counts = np.zeros(len(nomes_prof), dtype=np.int64)
+        counts[lecionados.index.to_numpy()] = 1
+        instrumentos_lecionados = np.empty(len(nomes_prof), dtype=object)
+        instrumentos_lecionados[lecionados.index.to_numpy()] = lecionados.to_numpy()
+        resultado = frame_by_name(nomes_prof, counts, 'nome', instrumentos_lecionados=instrumentos_lecionados)
         resultado = resultado.rename(columns={'nome': 'nome_professor'})
         
         return resultado.sort_values('nome_professor')
\ No newline at end of file
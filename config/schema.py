@@ -0,0 +1,77 @@
+# config/schema.py
+"""
+Tipos de cada aba, aplicados uma única vez pelo DataHandler ao carregar:
+    'id'       -> inteiro compacto (int32, ou int64 se não couber)
+    'date'     -> datetime64 (o Excel guarda 'AAAA-MM-DD')
+    'time'     -> timedelta64 desde a meia-noite (o Excel guarda 'HH:MM:SS')
+    'category' -> categórico (status, gênero, método de pagamento...)
+    'float'    -> float64
+Colunas que não aparecem no esquema (ou na aba) ficam como o Excel as entregou.
+"""
+from config.settings import (
+    SHEET_ALUNOS, SHEET_PROFESSORES, SHEET_INSTRUMENTOS,
+    SHEET_AULAS_OFERTADAS, SHEET_MATRICULAS, SHEET_AGENDA, SHEET_PAGAMENTOS
+)
+
+# Abas mantidas em ordem por esta data (busca binária em slice_by_period)
+SHEET_DATE_KEYS = {
+    SHEET_ALUNOS: 'data_cadastro',
+    SHEET_MATRICULAS: 'data_matricula',
+    SHEET_AGENDA: 'data_aula',
+    SHEET_PAGAMENTOS: 'data_pagamento',
+}
+
+# Mude este número sempre que alterar os esquemas: invalida o cache em disco
+SCHEMA_VERSION = 2
+
+SHEET_SCHEMAS = {
+    SHEET_ALUNOS: {
+        'id': 'id',
+        'data_nascimento': 'date',
+        'genero': 'category',
+        'data_cadastro': 'date',
+        'status': 'category',
+    },
+    SHEET_PROFESSORES: {
+        'id': 'id',
+        'data_contratacao': 'date',
+        'especializacao': 'category',
+        'status': 'category',
+    },
+    SHEET_INSTRUMENTOS: {
+        'id': 'id',
+    },
+    SHEET_AULAS_OFERTADAS: {
+        'id': 'id',
+        'professor_id': 'id',
+        'instrumento_id': 'id',
+        'status': 'category',
+    },
+    SHEET_MATRICULAS: {
+        'id': 'id',
+        'aluno_id': 'id',
+        'aula_ofertada_id': 'id',
+        'data_matricula': 'date',
+        'status': 'category',
+    },
+    SHEET_AGENDA: {
+        'id': 'id',
+        'aluno_id': 'id',
+        'professor_id': 'id',
+        'instrumento_id': 'id',
+        'data_aula': 'date',
+        'hora_inicio': 'time',
+        'hora_fim': 'time',
+        'valor_aula': 'float',
+        'status': 'category',
+    },
+    SHEET_PAGAMENTOS: {
+        'id': 'id',
+        'aluno_id': 'id',
+        'data_pagamento': 'date',
+        'valor_pago': 'float',
+        'metodo_pagamento': 'category',
+        'referencia_aula_id': 'id',
+        'status': 'category',
+    },
+}
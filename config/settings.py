@@ -8,6 +8,39 @@ load_dotenv()
 # Teremos um único arquivo com várias abas (sheets)
 DATA_XLSX_PATH = os.getenv("DATA_XLSX_PATH", "data/academia_maestro_dados.xlsx")
 
+# Onde as abas ficam: "excel", "sqlite" ou "duckdb" (DATA_SQL_PATH, ver scripts/migrar_para_sql.py)
+DATA_BACKEND = os.getenv("DATA_BACKEND", "excel").lower()
+DATA_SQL_PATH = os.getenv("DATA_SQL_PATH", "data/academia_maestro.sqlite")
+
+# Cache colunar das abas (Parquet ou pickle); vazio = ao lado do DATA_XLSX_PATH
+DATA_CACHE_ENABLED = os.getenv("DATA_CACHE_ENABLED", "1") == "1"
+DATA_CACHE_DIR = os.getenv("DATA_CACHE_DIR", "")
+
+# Linhas no journal de inserções antes de gravá-las no Excel
+JOURNAL_COMPACT_THRESHOLD = int(os.getenv("JOURNAL_COMPACT_THRESHOLD", "5000"))
+
+# Leitura do Excel em blocos de N linhas (0 = pd.read_excel da aba inteira)
+DATA_STREAM_CHUNK_ROWS = int(os.getenv("DATA_STREAM_CHUNK_ROWS", "0"))
+
+# Observa o .xlsx e relê as abas alteradas depois de DATA_WATCH_DEBOUNCE_MS sem mudanças
+DATA_WATCH_ENABLED = os.getenv("DATA_WATCH_ENABLED", "0") == "1"
+DATA_WATCH_INTERVAL_MS = int(os.getenv("DATA_WATCH_INTERVAL_MS", "1000"))
+DATA_WATCH_DEBOUNCE_MS = int(os.getenv("DATA_WATCH_DEBOUNCE_MS", "1500"))
+
+# Instrumentação: tempo e linhas das últimas chamadas; MEMORY=1 usa tracemalloc (lento).
+# DEBUG_PANEL=1 mostra o painel "Desempenho" e liga a gravação.
+INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION_ENABLED", "0") == "1"
+INSTRUMENTATION_BUFFER = int(os.getenv("INSTRUMENTATION_BUFFER", "5000"))
+INSTRUMENTATION_MEMORY = os.getenv("INSTRUMENTATION_MEMORY", "0") == "1"
+DEBUG_PANEL = os.getenv("DEBUG_PANEL", "0") == "1"
+
+# Limite de memória do cache de resultados das análises (LRU), em MB
+ANALYSIS_CACHE_MAX_MB = float(os.getenv("ANALYSIS_CACHE_MAX_MB", "64"))
+
+# Cache dos gráficos já desenhados (LRU), em MB; com 0 as telas desenham direto no TkAgg
+CHART_CACHE_ENABLED = os.getenv("CHART_CACHE_ENABLED", "1") == "1"
+CHART_CACHE_MAX_MB = float(os.getenv("CHART_CACHE_MAX_MB", "48"))
+
 # Nomes das abas que usaremos no arquivo Excel
 # Usar constantes evita erros de digitação no resto do código
 SHEET_ALUNOS = "alunos"
@@ -1,5 +1,28 @@
-from ui.app import App
+import time
+
+INICIO = time.perf_counter()
+
+import argparse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard da Academia Maestro.")
+    parser.add_argument(
+        "--profile-startup", action="store_true",
+        help="Imprime o tempo de cada import e etapa da inicialização até a primeira tela"
+    )
+    args = parser.parse_args()
+
+    profiler = None
+    if args.profile_startup:
+        from utils.startup_profile import StartupProfiler
+        profiler = StartupProfiler(INICIO)
+        profiler.instalar()
+
+    from ui.app import App
+    app = App(profiler)
+    app.mainloop()
+
 
 if __name__ == "__main__":
-    app = App()
-    app.mainloop()
\ No newline at end of file
+    main()
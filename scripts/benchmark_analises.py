@@ -0,0 +1,221 @@
+# scripts/benchmark_analises.py
+"""
+Latência (mediana, cache de resultados limpo) e pico de memória (tracemalloc)
+de cada método público das análises e do DataHandler, sobre dados sintéticos.
+Com --comparar, sai com código 1 se algum método ficar mais lento que a linha
+de base (--salvar) além de --limite.
+
+Uso (a partir da raiz do projeto):
+    python -m scripts.benchmark_analises --agenda 1000 100000 --salvar baseline.json
+    python -m scripts.benchmark_analises --agenda 1000 100000 --comparar baseline.json --limite 0.25
+    python -m scripts.benchmark_analises --agenda 10000000 --backend sqlite
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from scripts.synthetic_data import ensure_dataset
+
+FORMATO_VERSAO = 1
+# Diferenças abaixo disso (em segundos) são ruído de medição, não regressão
+PISO_REGRESSAO_S = 0.002
+
+
+def metodos_publicos(analise, start_date, end_date):
+    """(nome, método, kwargs) de cada método público; start_date/end_date recebem o período."""
+    periodo = {"start_date": start_date, "end_date": end_date}
+    metodos = []
+    for nome, metodo in inspect.getmembers(analise, inspect.ismethod):
+        if nome.startswith("_"):
+            continue
+        parametros = inspect.signature(metodo).parameters
+        obrigatorios = [p for p in parametros.values() if p.default is inspect.Parameter.empty]
+        if any(p.name not in periodo for p in obrigatorios):
+            print(f"Aviso: {type(analise).__name__}.{nome} ignorado (parâmetros desconhecidos).")
+            continue
+        metodos.append((nome, metodo, {k: v for k, v in periodo.items() if k in parametros}))
+    return metodos
+
+
+def medir(func, repeticoes, antes=None):
+    """Mediana e mínimo de `repeticoes` execuções e pico de memória (MB) de uma execução extra."""
+    tempos = []
+    for _ in range(repeticoes):
+        if antes:
+            antes()
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    if antes:
+        antes()
+    tracemalloc.start()
+    try:
+        func()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"mediana_s": statistics.median(tempos), "min_s": min(tempos), "pico_mb": pico / 2**20}
+
+
+def _linhas_agenda(primeiro_id, n):
+    return [
+        {
+            "id": primeiro_id + i, "aluno_id": 1 + i % 50, "professor_id": 1 + i % 10, "instrumento_id": 1 + i % 7,
+            "data_aula": "2025-06-02", "hora_inicio": "10:00:00", "hora_fim": "11:00:00",
+            "valor_aula": 250.0, "status": "Agendada",
+        }
+        for i in range(n)
+    ]
+
+
+def medir_insercoes(path, backend, repeticoes, start_date, end_date):
+    """Inserções de 1 e de 1000 aulas numa cópia dos dados, com os cubos diários já montados."""
+    import pandas as pd
+
+    from utils.data_handler import DataHandler
+    from utils.sheet_cache import SheetCache
+
+    pasta = tempfile.mkdtemp(prefix="bench_insercao_")
+    try:
+        copia = os.path.join(pasta, os.path.basename(path))
+        # copy2 preserva o mtime: a cópia continua válida para o cache colunar do original
+        shutil.copy2(path, copia)
+        extras = {"cache_dir": SheetCache(path).cache_dir} if backend == "excel" else {}
+        handler = DataHandler(copia, backend=backend, **extras)
+        handler.rollups.aulas(start_date, end_date)
+        proximo = [int(handler.get_data("agenda_aulas")["id"].max()) + 1]
+
+        def inserir(n):
+            def run():
+                linhas = _linhas_agenda(proximo[0], n)
+                proximo[0] += n
+                if n == 1:
+                    handler.insert_data("agenda_aulas", pd.DataFrame(linhas))
+                else:
+                    handler.insert_many("agenda_aulas", linhas)
+            return run
+
+        resultados = {
+            "DataHandler.inserir_1": medir(inserir(1), repeticoes),
+            "DataHandler.inserir_1000": medir(inserir(1000), repeticoes),
+        }
+        handler.storage.close()
+        return resultados
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+def medir_tamanho(n_agenda, seed, backend, repeticoes, start_date, end_date):
+    """Roda num processo novo: {nome: medidas} para os dados sintéticos com `n_agenda` aulas."""
+    from analysis.alunos_analysis import AlunosAnalysis
+    from analysis.aulas_analysis import AulasAnalysis
+    from analysis.financeiro_analysis import FinanceiroAnalysis
+    from analysis.professores_analysis import ProfessoresAnalysis
+    from utils.copy_on_write import enable_copy_on_write
+    from utils.data_handler import DataHandler
+
+    enable_copy_on_write()
+    path = ensure_dataset(n_agenda, seed, backend)
+    # A primeira carga monta o cache colunar (Excel); as medidas são da carga com o cache pronto
+    DataHandler(path, backend=backend).storage.close()
+    resultados = {"DataHandler.carregar": medir(lambda: DataHandler(path, backend=backend), repeticoes)}
+
+    handler = DataHandler(path, backend=backend)
+    for classe in (AlunosAnalysis, AulasAnalysis, FinanceiroAnalysis, ProfessoresAnalysis):
+        for nome, metodo, kwargs in metodos_publicos(classe(handler), start_date, end_date):
+            resultados[f"{classe.__name__}.{nome}"] = medir(
+                lambda: metodo(**kwargs), repeticoes, antes=handler.result_cache.clear
+            )
+    resultados.update(medir_insercoes(path, backend, repeticoes, start_date, end_date))
+    return resultados
+
+
+def executar(tamanhos, seed, backend, repeticoes, start_date, end_date):
+    import numpy as np
+    import pandas as pd
+
+    relatorio = {
+        "versao": FORMATO_VERSAO,
+        "ambiente": {
+            "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+            "plataforma": platform.platform(), "cpus": os.cpu_count(),
+        },
+        "parametros": {
+            "seed": seed, "backend": backend, "repeticoes": repeticoes, "inicio": start_date, "fim": end_date,
+        },
+        "resultados": {},
+    }
+    for n_agenda in tamanhos:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            relatorio["resultados"][str(n_agenda)] = pool.submit(
+                medir_tamanho, n_agenda, seed, backend, repeticoes, start_date, end_date
+            ).result()
+    return relatorio
+
+
+def comparar(relatorio, base, limite):
+    """Lista de (tamanho, nome, mediana da base, mediana atual) mais lentos que a base além de `limite`."""
+    regressoes = []
+    for tamanho, medidas in relatorio["resultados"].items():
+        for nome, atual in medidas.items():
+            anterior = base.get("resultados", {}).get(tamanho, {}).get(nome)
+            if anterior is None:
+                continue
+            antes, agora = anterior["mediana_s"], atual["mediana_s"]
+            if agora > antes * (1 + limite) and agora - antes > PISO_REGRESSAO_S:
+                regressoes.append((tamanho, nome, antes, agora))
+    return regressoes
+
+
+def imprimir(relatorio, base=None):
+    for tamanho, medidas in relatorio["resultados"].items():
+        print(f"\n{int(tamanho):,} aulas ({relatorio['parametros']['backend']})")
+        print(f"{'Medida':<52} {'Mediana (ms)':>12} {'Mín (ms)':>10} {'Pico (MB)':>10} {'vs base':>8}")
+        for nome, m in medidas.items():
+            anterior = (base or {}).get("resultados", {}).get(tamanho, {}).get(nome)
+            razao = f"{m['mediana_s'] / anterior['mediana_s']:>7.2f}x" if anterior and anterior["mediana_s"] else f"{'-':>8}"
+            print(f"{nome:<52} {m['mediana_s'] * 1000:>12.2f} {m['min_s'] * 1000:>10.2f} {m['pico_mb']:>10.1f} {razao}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latência e memória das análises e do DataHandler, com linha de base.")
+    parser.add_argument("--agenda", type=int, nargs="+", default=[1_000, 100_000], help="Tamanhos (linhas em agenda_aulas)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--backend", choices=("excel", "sqlite", "duckdb"), default="excel")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--inicio", default="2024-01-01")
+    parser.add_argument("--fim", default="2024-12-31")
+    parser.add_argument("--salvar", help="Grava os resultados como linha de base neste JSON")
+    parser.add_argument("--comparar", help="Linha de base (JSON) para detectar regressões")
+    parser.add_argument("--limite", type=float, default=0.25, help="Lentidão tolerada sobre a base (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    relatorio = executar(args.agenda, args.seed, args.backend, args.repeticoes, args.inicio, args.fim)
+    base = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+    imprimir(relatorio, base)
+
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"\nLinha de base gravada em {args.salvar}")
+    if base is not None:
+        regressoes = comparar(relatorio, base, args.limite)
+        if regressoes:
+            print(f"\n❌ {len(regressoes)} regressão(ões) acima de {args.limite:.0%}:")
+            for tamanho, nome, antes, agora in regressoes:
+                print(f"  {nome} ({int(tamanho):,} aulas): {antes * 1000:.2f} ms -> {agora * 1000:.2f} ms")
+            sys.exit(1)
+        print(f"\n✅ Nenhuma regressão acima de {args.limite:.0%}.")
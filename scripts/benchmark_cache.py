@@ -0,0 +1,63 @@
+# scripts/benchmark_cache.py
+"""
+Compara o tempo de inicialização do DataHandler lendo o .xlsx (frio) e
+lendo o cache colunar (quente) em uma planilha sintética.
+
+Uso (a partir da raiz do projeto):
+    python -m scripts.benchmark_cache --agenda 1000000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from scripts.synthetic_data import generate_frames, write_workbook
+from utils.copy_on_write import enable_copy_on_write
+from utils.data_handler import DataHandler
+
+
+def _cronometrar(func):
+    inicio = time.perf_counter()
+    resultado = func()
+    return time.perf_counter() - inicio, resultado
+
+
+def run(xlsx_path, cache_dir, repeticoes=3):
+    t_xlsx, _ = _cronometrar(lambda: DataHandler(xlsx_path, use_cache=False, backend="excel"))
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    t_build, handler = _cronometrar(lambda: DataHandler(xlsx_path, cache_dir=cache_dir, backend="excel"))
+
+    tempos_quentes = []
+    for _ in range(repeticoes):
+        t, handler = _cronometrar(lambda: DataHandler(xlsx_path, cache_dir=cache_dir, backend="excel"))
+        tempos_quentes.append(t)
+    t_warm = min(tempos_quentes)
+
+    linhas = len(handler.get_data("agenda_aulas"))
+    print()
+    print(f"Linhas em agenda_aulas:         {linhas:>12,}")
+    print(f"Frio (somente .xlsx):           {t_xlsx:>10.2f} s")
+    print(f"Frio + construção do cache:     {t_build:>10.2f} s")
+    print(f"Quente (cache válido, melhor):  {t_warm:>10.2f} s")
+    print(f"Ganho na inicialização:         {t_xlsx / t_warm:>10.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do cache colunar do DataHandler.")
+    parser.add_argument("--agenda", type=int, default=1_000_000, help="Linhas em agenda_aulas na planilha sintética")
+    parser.add_argument("--arquivo", help="Usa um .xlsx existente em vez de gerar um sintético")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções com o cache quente")
+    args = parser.parse_args()
+    enable_copy_on_write()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.arquivo:
+            xlsx_path = args.arquivo
+        else:
+            xlsx_path = os.path.join(tmp, "sintetico.xlsx")
+            print(f"Gerando planilha sintética com {args.agenda:,} aulas...")
+            t_gen, _ = _cronometrar(lambda: write_workbook(xlsx_path, generate_frames(args.agenda)))
+            print(f"Planilha gerada em {t_gen:.1f} s")
+        run(xlsx_path, os.path.join(tmp, "cache"), args.repeticoes)
@@ -0,0 +1,115 @@
+# scripts/benchmark_graficos.py
+"""
+Tempo e memória de N atualizações de um gráfico de barras: recriando a
+Figure a cada vez ou reaproveitando um ChartPanel. Com --tk, usa
+FigureCanvasTkAgg numa janela oculta (senão, canvas Agg).
+
+Uso (a partir da raiz do projeto):
+    python -m scripts.benchmark_graficos --atualizacoes 100 [--tk]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+import numpy as np
+from matplotlib.figure import Figure
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from ui.charts import ChartPanel
+
+MESES = [f"2024-{m:02d}" for m in range(1, 13)]
+
+
+def _series(n, seed=7):
+    rng = np.random.default_rng(seed)
+    return [rng.uniform(1_000, 50_000, size=len(MESES)) for _ in range(n)]
+
+
+def refresh_recreate(master, series, flush):
+    widget = None
+    for values in series:
+        if widget is not None:
+            widget.destroy()
+        fig = Figure(figsize=(10, 5), dpi=100)
+        ax = fig.add_subplot(111)
+        ax.bar(MESES, values, color='#1A3A7D')
+        ax.set_title('Evolução do Faturamento no Período', color='black')
+        ax.set_ylabel('Valor (R$)', color='black')
+        ax.tick_params(axis='x', colors='black', rotation=45)
+        fig.tight_layout()
+        if master is None:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            FigureCanvasAgg(fig).draw()
+        else:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            canvas = FigureCanvasTkAgg(fig, master=master)
+            canvas.draw()
+            widget = canvas.get_tk_widget()
+            widget.pack(fill="both", expand=True)
+        flush()
+
+
+def refresh_reuse(master, series, flush):
+    panel = ChartPanel(master)
+    if panel.widget is not None:
+        panel.widget.pack(fill="both", expand=True)
+    for values in series:
+        panel.bar(MESES, values, color='#1A3A7D', title='Evolução do Faturamento no Período', ylabel='Valor (R$)')
+        flush()
+
+
+def measure(func, *args):
+    """Retorna (segundos, crescimento alocado em MB, crescimento do RSS em MB ou None)."""
+    gc.collect()
+    rss_antes = psutil.Process().memory_info().rss if psutil else None
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - inicio
+    gc.collect()
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss = (psutil.Process().memory_info().rss - rss_antes) / 2**20 if psutil else None
+    return elapsed, atual / 2**20, rss
+
+
+def run(atualizacoes=100, use_tk=False):
+    root = None
+    flush = lambda: None
+    if use_tk:
+        import tkinter
+        root = tkinter.Tk()
+        root.withdraw()
+        # draw_idle() só desenha quando o Tk processa os eventos pendentes
+        flush = root.update
+
+    series = _series(atualizacoes)
+    print(f"{atualizacoes} atualizações, canvas {'TkAgg' if use_tk else 'Agg'}")
+    print(f"{'Estratégia':<14} {'Total (s)':>10} {'ms/atualiz.':>12} {'ΔAlocado (MB)':>14} {'ΔRSS (MB)':>10}")
+    resultados = {}
+    for name, func in (("recriar", refresh_recreate), ("reaproveitar", refresh_reuse)):
+        master = tkinter.Frame(root) if use_tk else None
+        if master is not None:
+            master.pack()
+        elapsed, alocado, rss = measure(func, master, series, flush)
+        if master is not None:
+            master.destroy()
+        resultados[name] = elapsed
+        rss_txt = f"{rss:>10.1f}" if rss is not None else f"{'-':>10}"
+        print(f"{name:<14} {elapsed:>10.2f} {1000 * elapsed / atualizacoes:>12.1f} {alocado:>14.2f} {rss_txt}")
+    print(f"Aceleração: {resultados['recriar'] / resultados['reaproveitar']:.1f}x")
+    if root is not None:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tempo e memória de atualizações repetidas de um gráfico.")
+    parser.add_argument("--atualizacoes", type=int, default=100)
+    parser.add_argument("--tk", action="store_true", help="Usa FigureCanvasTkAgg (precisa de display)")
+    args = parser.parse_args()
+    run(args.atualizacoes, args.tk)
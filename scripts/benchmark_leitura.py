@@ -0,0 +1,69 @@
+# scripts/benchmark_leitura.py
+"""
+Linhas/s e pico de RSS de três formas de ler a planilha (read_excel, blocos e
+KPIs por bloco), cada uma num processo novo.
+
+Uso (a partir da raiz do projeto):
+    python -m scripts.benchmark_leitura --agenda 200000 --bloco 50000
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from scripts.synthetic_data import ensure_workbook
+
+MODOS = ("read_excel", "blocos", "kpis")
+
+
+def _pico_rss_mb():
+    try:
+        import resource
+        # ru_maxrss vem em KB no Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 2**20
+
+
+def medir(modo, xlsx_path, chunk_rows, start_date, end_date):
+    """Roda num processo novo: devolve (linhas, segundos, RSS antes da leitura, pico de RSS) em MB."""
+    import pandas as pd
+    from utils.storage import prepare_sheet
+    from utils.excel_stream import read_sheets_streaming, stream_kpis
+
+    base = _pico_rss_mb()
+    inicio = time.perf_counter()
+    if modo == "read_excel":
+        abas = {k: prepare_sheet(k, v) for k, v in pd.read_excel(xlsx_path, sheet_name=None).items()}
+        linhas = sum(len(df) for df in abas.values())
+    elif modo == "blocos":
+        abas = {k: prepare_sheet(k, v) for k, v in read_sheets_streaming(xlsx_path, chunk_rows=chunk_rows).items()}
+        linhas = sum(len(df) for df in abas.values())
+    else:
+        _, linhas = stream_kpis(xlsx_path, start_date, end_date, chunk_rows)
+    return linhas, time.perf_counter() - inicio, base, _pico_rss_mb()
+
+
+def run(xlsx_path, chunk_rows, start_date, end_date, modos=MODOS):
+    print(f"Arquivo: {xlsx_path} (blocos de {chunk_rows:,} linhas)")
+    print(f"{'Modo':<12} {'Linhas':>10} {'Tempo (s)':>10} {'Linhas/s':>10} {'RSS base (MB)':>14} {'Pico RSS (MB)':>14}")
+    resultados = {}
+    for modo in modos:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            linhas, segundos, base, pico = pool.submit(medir, modo, xlsx_path, chunk_rows, start_date, end_date).result()
+        resultados[modo] = (linhas, segundos, pico)
+        print(f"{modo:<12} {linhas:>10,} {segundos:>10.2f} {linhas / segundos:>10,.0f} {base:>14.1f} {pico:>14.1f}")
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Linhas/s e pico de RSS da leitura da planilha.")
+    parser.add_argument("--agenda", type=int, default=200_000, help="Linhas em agenda_aulas na planilha sintética")
+    parser.add_argument("--arquivo", help="Usa esta planilha em vez da sintética")
+    parser.add_argument("--bloco", type=int, default=50_000, help="Linhas por bloco")
+    parser.add_argument("--inicio", default="2021-01-01")
+    parser.add_argument("--fim", default="2025-12-31")
+    parser.add_argument("--modos", nargs="+", choices=MODOS, default=list(MODOS))
+    args = parser.parse_args()
+    run(args.arquivo or ensure_workbook(args.agenda), args.bloco, args.inicio, args.fim, args.modos)
@@ -0,0 +1,116 @@
+# scripts/benchmark_memoria.py
+"""
+Pico de memória de cada atualização de tela, sem abrir a interface Tk.
+Sai com código 1 se alguma tela passar do limite informado.
+
+Uso (a partir da raiz do projeto):
+    python -m scripts.benchmark_memoria --agenda 200000 --limite-mb 150
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from analysis.alunos_analysis import AlunosAnalysis
+from analysis.aulas_analysis import AulasAnalysis
+from analysis.financeiro_analysis import FinanceiroAnalysis
+from analysis.kpi_query import KpiQuery
+from analysis.professores_analysis import ProfessoresAnalysis
+from scripts.synthetic_data import ensure_workbook
+from utils.copy_on_write import enable_copy_on_write
+from utils.data_handler import DataHandler
+
+
+def view_refreshes(analyzers, data_handler, start_date, end_date):
+    """Chamadas feitas pelo update_view de cada tela, na mesma ordem."""
+    alunos = analyzers["alunos"]
+    financeiro, professores = analyzers["financeiro"], analyzers["professores"]
+    kpis, periodo = analyzers["kpis"], (start_date, end_date)
+    return {
+        "overview": lambda: (
+            kpis.compute(periodo, ["alunos_ativos", "faturamento_total", "aulas_concluidas"]),
+            kpis.compute(periodo, ["faturamento_por_mes"]),
+            kpis.compute(periodo, ["popularidade_instrumentos"]),
+        ),
+        "finance": lambda: (
+            kpis.compute(periodo, ["faturamento_total", "aulas_pagas", "ticket_medio"]),
+            kpis.compute(periodo, ["faturamento_por_mes"]),
+            kpis.compute(periodo, ["faturamento_por_instrumento"]),
+            financeiro._filter_pagamentos_by_date(start_date, end_date),
+        ),
+        "students": lambda: (
+            data_handler.get_data('alunos'),
+            alunos.get_total_alunos('Ativo'),
+            alunos.get_novas_matriculas_por_mes(start_date, end_date),
+            alunos.get_churn_periodo(start_date, end_date),
+            alunos.get_demografia(),
+        ),
+        "teachers": lambda: (
+            professores.get_carga_horaria_professor(start_date, end_date),
+            data_handler.get_data('professores'),
+        ),
+        "classes": lambda: (
+            kpis.compute(periodo, ["total_aulas", "aulas_concluidas", "taxa_conclusao", "aulas_por_status"]),
+            kpis.compute(periodo, ["horarios_pico"]),
+            kpis.compute(periodo, ["popularidade_instrumentos"]),
+        ),
+    }
+
+
+def measure(func):
+    """Retorna (segundos, pico alocado em MB, crescimento do RSS em MB ou None)."""
+    rss_antes = psutil.Process().memory_info().rss if psutil else None
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        func()
+    finally:
+        elapsed = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    rss = (psutil.Process().memory_info().rss - rss_antes) / 2**20 if psutil else None
+    return elapsed, pico / 2**20, rss
+
+
+def run(data_handler, start_date, end_date, limite_mb=None):
+    analyzers = {
+        "alunos": AlunosAnalysis(data_handler),
+        "aulas": AulasAnalysis(data_handler),
+        "financeiro": FinanceiroAnalysis(data_handler),
+        "professores": ProfessoresAnalysis(data_handler),
+        "kpis": KpiQuery(data_handler),
+    }
+    excedidas = []
+    print(f"{'Tela':<10} {'Tempo (s)':>10} {'Pico (MB)':>10} {'ΔRSS (MB)':>10}")
+    for name, refresh in view_refreshes(analyzers, data_handler, start_date, end_date).items():
+        try:
+            elapsed, pico, rss = measure(refresh)
+        except Exception as e:
+            print(f"{name:<10} erro: {e}")
+            continue
+        rss_txt = f"{rss:>10.1f}" if rss is not None else f"{'-':>10}"
+        print(f"{name:<10} {elapsed:>10.3f} {pico:>10.1f} {rss_txt}")
+        if limite_mb is not None and pico > limite_mb:
+            excedidas.append(name)
+    return excedidas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pico de memória por atualização de tela.")
+    parser.add_argument("--agenda", type=int, default=200_000, help="Linhas em agenda_aulas na planilha sintética")
+    parser.add_argument("--inicio", default="2021-01-01")
+    parser.add_argument("--fim", default="2025-12-31")
+    parser.add_argument("--limite-mb", type=float, help="Falha se o pico de alguma tela passar deste valor")
+    args = parser.parse_args()
+    enable_copy_on_write()
+
+    handler = DataHandler(ensure_workbook(args.agenda), backend="excel")
+    excedidas = run(handler, args.inicio, args.fim, args.limite_mb)
+    if excedidas:
+        print(f"❌ Pico de memória acima de {args.limite_mb} MB em: {', '.join(excedidas)}")
+        sys.exit(1)
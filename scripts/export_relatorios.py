@@ -1 +1,302 @@
-# TODO: Gera relatórios CSV/Excel a partir do banco
+# scripts/export_relatorios.py
+"""
+Gera relatórios (CSV, XLSX e/ou PNG) sem abrir a interface, em
+<saida>/<período>/ (e professores/<id>_<nome>/ com --por-professor). Os
+gráficos são desenhados com Agg num pool de processos.
+
+Uso (a partir da raiz do projeto):
+    python -m scripts.export_relatorios --inicio 2024-01-01 --fim 2024-12-31 \\
+        --mensal --por-professor --formatos csv xlsx png --saida relatorios
+"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import pandas as pd
+
+from analysis.alunos_analysis import AlunosAnalysis
+from analysis.aulas_analysis import AulasAnalysis
+from analysis.financeiro_analysis import FinanceiroAnalysis
+from analysis.kpi_query import KpiQuery
+from analysis.professores_analysis import ProfessoresAnalysis
+from utils.copy_on_write import enable_copy_on_write
+from utils.data_handler import DataHandler
+from utils.rollups import by_month
+
+FORMATOS = ("csv", "xlsx", "png")
+# Uma aba do Excel comporta 1.048.576 linhas (uma delas é o cabeçalho)
+LINHAS_POR_ABA_XLSX = 1_048_575
+COR_PRINCIPAL = '#1A3A7D'
+
+
+# --- Períodos ---
+
+def periodos(inicio, fim, mensal=False):
+    """Lista de (rótulo, início, fim). Com `mensal`, um período por mês do intervalo."""
+    inicio, fim = pd.Timestamp(inicio), pd.Timestamp(fim)
+    if not mensal:
+        return [(f"{inicio:%Y-%m-%d}_a_{fim:%Y-%m-%d}", f"{inicio:%Y-%m-%d}", f"{fim:%Y-%m-%d}")]
+    resultado = []
+    for mes in pd.period_range(inicio, fim, freq='M'):
+        start = max(mes.start_time, inicio)
+        end = min(mes.end_time.normalize(), fim)
+        resultado.append((str(mes), f"{start:%Y-%m-%d}", f"{end:%Y-%m-%d}"))
+    return resultado
+
+
+# --- Tabelas e gráficos ---
+
+def criar_analises(data_handler):
+    return {
+        "alunos": AlunosAnalysis(data_handler),
+        "aulas": AulasAnalysis(data_handler),
+        "financeiro": FinanceiroAnalysis(data_handler),
+        "professores": ProfessoresAnalysis(data_handler),
+        "kpis": KpiQuery(data_handler),
+    }
+
+
+def tabelas_periodo(analyzers, data_handler, start_date, end_date):
+    """Todas as tabelas do período, na ordem em que são gravadas."""
+    alunos, professores = analyzers["alunos"], analyzers["professores"]
+
+    # Um recorte e um groupby por cubo para todos os KPIs e tabelas de faturamento e aulas
+    kpis = analyzers["kpis"].compute((start_date, end_date), [
+        "faturamento_total", "faturamento_por_mes", "faturamento_por_instrumento", "faturamento_por_professor",
+        "total_aulas", "aulas_concluidas", "taxa_conclusao", "aulas_por_status",
+        "popularidade_instrumentos", "horarios_pico", "alunos_ativos",
+    ])
+    matriculas = alunos.get_novas_matriculas_por_mes(start_date, end_date)
+    churn = alunos.get_churn_periodo(start_date, end_date)
+
+    resumo = pd.DataFrame([{
+        "inicio": start_date,
+        "fim": end_date,
+        "faturamento_total": kpis["faturamento_total"],
+        "total_aulas": kpis["total_aulas"],
+        "aulas_concluidas": kpis["aulas_concluidas"],
+        "taxa_conclusao": kpis["taxa_conclusao"],
+        "alunos_ativos": kpis["alunos_ativos"],
+        "novas_matriculas": matriculas['novas_matriculas'].sum(),
+        "evadidos": churn["evadidos"],
+        "taxa_evasao": churn["taxa_evasao"],
+    }])
+    horarios = kpis["horarios_pico"]
+    return {
+        "resumo": resumo,
+        "faturamento_mensal": kpis["faturamento_por_mes"],
+        "faturamento_por_instrumento": kpis["faturamento_por_instrumento"],
+        "faturamento_por_professor": kpis["faturamento_por_professor"],
+        "aulas_por_status": kpis["aulas_por_status"],
+        "popularidade_instrumentos": kpis["popularidade_instrumentos"],
+        "carga_horaria_professores": professores.get_carga_horaria_professor(start_date, end_date),
+        "horarios_pico": horarios.rename_axis('dia_semana').reset_index() if not horarios.empty else horarios,
+        "novas_matriculas": matriculas,
+        "retencao_coortes": alunos.get_retencao_coortes(start_date, end_date).reset_index(),
+        # Detalhe: podem ter milhões de linhas e são gravadas em blocos
+        "agenda_aulas": data_handler.slice_by_period('agenda_aulas', start_date, end_date),
+        "pagamentos": data_handler.slice_by_period('pagamentos', start_date, end_date),
+    }
+
+
+def graficos_periodo(tabelas, analyzers, start_date, end_date):
+    """Tarefas de desenho do período: (arquivo, método do ChartPanel, args, kwargs, figsize)."""
+    tarefas = []
+    faturamento = tabelas["faturamento_mensal"]
+    if not faturamento.empty:
+        tarefas.append(("faturamento_mensal.png", "bar", (
+            faturamento['mes'].tolist(), faturamento['faturamento_mensal'].tolist(),
+        ), dict(color=COR_PRINCIPAL, title='Faturamento Mensal', ylabel='Valor (R$)'), (10, 5)))
+    por_professor = tabelas["faturamento_por_professor"]
+    if not por_professor.empty:
+        tarefas.append(("faturamento_por_professor.png", "bar", (
+            por_professor['nome_professor'].tolist(), por_professor['faturamento_professor'].tolist(),
+        ), dict(color=COR_PRINCIPAL, title='Faturamento por Professor', ylabel='Valor (R$)'), (10, 5)))
+    status = tabelas["aulas_por_status"]
+    if not status.empty:
+        tarefas.append(("aulas_por_status.png", "pie", (
+            status['total_aulas'].tolist(), status['status'].astype(str).tolist(),
+        ), dict(title='Distribuição de Status no Período'), (5, 5)))
+    popularidade = tabelas["popularidade_instrumentos"]
+    if not popularidade.empty:
+        tarefas.append(("popularidade_instrumentos.png", "bar", (
+            popularidade['nome_instrumento'].tolist(), popularidade['total_aulas_agendadas'].tolist(),
+        ), dict(color=COR_PRINCIPAL, title='Popularidade dos Instrumentos', ylabel='Nº de Aulas'), (10, 5)))
+    horarios = analyzers["aulas"].get_peak_hours_data(start_date, end_date)
+    if not horarios.empty:
+        tarefas.append(("horarios_pico.png", "image", (horarios,), dict(
+            title="Concentração de Aulas por Dia e Hora", xlabel="Hora do Dia",
+            ylabel="Dia da Semana", cbar_label="Nº de Aulas",
+        ), (10, 6)))
+    coortes = tabelas["retencao_coortes"]
+    if not coortes.empty:
+        tarefas.append(("retencao_coortes.png", "image", (coortes.set_index('coorte').drop(columns='alunos'),), dict(
+            title='Retenção por Coorte de Cadastro (%)', xlabel='Meses desde o cadastro',
+            ylabel='Coorte', cbar_label='% de alunos ativos', cmap="Blues",
+        ), (10, 6)))
+    return tarefas
+
+
+def professores_periodo(data_handler, start_date, end_date):
+    """
+    (id, nome, tabelas, gráficos) de cada professor com aulas no período.
+    A agenda e os cubos diários são agrupados por professor uma única vez.
+    """
+    agenda = data_handler.slice_by_period('agenda_aulas', start_date, end_date)
+    if agenda.empty:
+        return
+    nomes = data_handler.get_data('professores').drop_duplicates('id').set_index('id')['nome']
+    cubo_aulas = data_handler.rollups.aulas(start_date, end_date)
+    cubo_pagamentos = data_handler.rollups.pagamentos(start_date, end_date)
+    cubo_pagamentos = cubo_pagamentos[cubo_pagamentos['status'] == 'Pago'] if not cubo_pagamentos.empty else cubo_pagamentos
+    aulas_por_prof = dict(tuple(cubo_aulas.groupby('professor_id'))) if not cubo_aulas.empty else {}
+    pagamentos_por_prof = dict(tuple(cubo_pagamentos.groupby('professor_id'))) if not cubo_pagamentos.empty else {}
+
+    for professor_id, agenda_prof in agenda.groupby('professor_id', sort=True):
+        vazio = pd.DataFrame(columns=['dia', 'aulas', 'horas', 'valor'])
+        aulas_prof = aulas_por_prof.get(professor_id, vazio)
+        pagos_prof = pagamentos_por_prof.get(professor_id, vazio)
+        por_mes = pd.DataFrame({
+            'aulas': by_month(aulas_prof, 'aulas'),
+            'horas': by_month(aulas_prof, 'horas'),
+            'faturamento': by_month(pagos_prof, 'valor'),
+        }).fillna(0).sort_index().rename_axis('mes').reset_index()
+        tabelas = {"resumo_mensal": por_mes, "agenda_aulas": agenda_prof}
+        nome = str(nomes.get(professor_id, professor_id))
+        graficos = []
+        if not por_mes.empty:
+            graficos.append(("aulas_por_mes.png", "bar", (por_mes['mes'].tolist(), por_mes['aulas'].tolist()), dict(
+                color=COR_PRINCIPAL, title=f'Aulas por Mês - {nome}', ylabel='Nº de Aulas',
+            ), (10, 5)))
+        yield int(professor_id), nome, tabelas, graficos
+
+
+# --- Gravação ---
+
+def _blocos(df, bloco):
+    for inicio in range(0, len(df), bloco):
+        yield df.iloc[inicio:inicio + bloco]
+
+
+def gravar_csv(pasta, tabelas, bloco):
+    for nome, df in tabelas.items():
+        caminho = os.path.join(pasta, f"{nome}.csv")
+        df.iloc[:0].to_csv(caminho, index=False)
+        for parte in _blocos(df, bloco):
+            parte.to_csv(caminho, mode='a', header=False, index=False)
+
+
+def gravar_xlsx(caminho, tabelas, bloco):
+    """Uma aba por tabela; tabelas acima do limite do Excel continuam em abas '<nome>_2', '<nome>_3'..."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    for nome, df in tabelas.items():
+        cabecalho = [str(col) for col in df.columns]
+        aba, linhas, n_abas = None, LINHAS_POR_ABA_XLSX, 0
+        if df.empty:
+            wb.create_sheet(nome[:31]).append(cabecalho)
+            continue
+        for parte in _blocos(df, bloco):
+            # openpyxl não aceita NaN/NaT: vazios viram None
+            parte = parte.astype(object)
+            parte = parte.where(parte.notna(), None)
+            for row in parte.itertuples(index=False, name=None):
+                if linhas >= LINHAS_POR_ABA_XLSX:
+                    n_abas += 1
+                    sufixo = f"_{n_abas}" if n_abas > 1 else ""
+                    aba = wb.create_sheet(nome[:31 - len(sufixo)] + sufixo)
+                    aba.append(cabecalho)
+                    linhas = 0
+                aba.append(row)
+                linhas += 1
+    wb.save(caminho)
+
+
+# Painéis de cada processo do pool, um por (método, tamanho)
+_PAINEIS = {}
+
+
+def desenhar(pasta, arquivo, metodo, args, kwargs, figsize):
+    """Roda num processo do pool: desenha com Agg e salva o PNG."""
+    import matplotlib.image as mpimg
+    import numpy as np
+    from ui.charts import ChartPanel
+
+    panel = _PAINEIS.get((metodo, figsize))
+    if panel is None:
+        panel = _PAINEIS[(metodo, figsize)] = ChartPanel(figsize=figsize)
+    getattr(panel, metodo)(*args, **kwargs)
+    # Com canvas Agg o draw_idle() já desenhou: grava o buffer sem savefig
+    caminho = os.path.join(pasta, arquivo)
+    mpimg.imsave(caminho, np.asarray(panel.canvas.buffer_rgba()))
+    return caminho
+
+
+def gravar(pasta, tabelas, graficos, formatos, pool, bloco):
+    """Grava as tabelas e envia os gráficos ao pool; devolve os futures dos gráficos."""
+    os.makedirs(pasta, exist_ok=True)
+    if "csv" in formatos:
+        gravar_csv(pasta, tabelas, bloco)
+    if "xlsx" in formatos:
+        gravar_xlsx(os.path.join(pasta, "relatorio.xlsx"), tabelas, bloco)
+    if "png" not in formatos:
+        return []
+    return [pool.submit(desenhar, pasta, *tarefa) for tarefa in graficos]
+
+
+# --- Execução ---
+
+def _nome_pasta(professor_id, nome):
+    slug = re.sub(r'\W+', '_', nome.strip().lower()).strip('_')
+    return f"{professor_id}_{slug}"
+
+
+def exportar(data_handler, lista_periodos, formatos, saida, por_professor=False, processos=None, bloco=50_000):
+    analyzers = criar_analises(data_handler)
+    pool = None
+    if "png" in formatos:
+        # spawn: os processos não herdam a memória (nem as threads) do DataHandler
+        pool = ProcessPoolExecutor(max_workers=processos, mp_context=get_context("spawn"))
+    futures = []
+    try:
+        for rotulo, start_date, end_date in lista_periodos:
+            pasta = os.path.join(saida, rotulo)
+            tabelas = tabelas_periodo(analyzers, data_handler, start_date, end_date)
+            graficos = graficos_periodo(tabelas, analyzers, start_date, end_date)
+            futures += gravar(pasta, tabelas, graficos, formatos, pool, bloco)
+            if por_professor:
+                for professor_id, nome, tabelas_prof, graficos_prof in professores_periodo(data_handler, start_date, end_date):
+                    pasta_prof = os.path.join(pasta, "professores", _nome_pasta(professor_id, nome))
+                    futures += gravar(pasta_prof, tabelas_prof, graficos_prof, formatos, pool, bloco)
+            print(f"✔ {rotulo}")
+        for future in futures:
+            future.result()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return len(futures)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta relatórios das análises sem abrir a interface.")
+    parser.add_argument("--inicio", required=True, help="Data inicial (AAAA-MM-DD)")
+    parser.add_argument("--fim", required=True, help="Data final (AAAA-MM-DD)")
+    parser.add_argument("--mensal", action="store_true", help="Um relatório por mês do intervalo")
+    parser.add_argument("--por-professor", action="store_true", help="Também um relatório por professor")
+    parser.add_argument("--formatos", nargs="+", choices=FORMATOS, default=["csv"])
+    parser.add_argument("--saida", default="relatorios")
+    parser.add_argument("--arquivo", help="Planilha ou banco de dados, conforme DATA_BACKEND (padrão: DATA_XLSX_PATH ou DATA_SQL_PATH)")
+    parser.add_argument("--processos", type=int, default=None, help="Processos para desenhar gráficos (padrão: nº de CPUs)")
+    parser.add_argument("--bloco", type=int, default=50_000, help="Linhas por bloco ao gravar tabelas grandes")
+    args = parser.parse_args()
+    enable_copy_on_write()
+
+    inicio = time.perf_counter()
+    handler = DataHandler(args.arquivo)
+    lista = periodos(args.inicio, args.fim, args.mensal)
+    n_graficos = exportar(handler, lista, set(args.formatos), args.saida, args.por_professor, args.processos, args.bloco)
+    print(f"{len(lista)} período(s), {n_graficos} gráfico(s) em {time.perf_counter() - inicio:.1f} s -> {args.saida}")
@@ -0,0 +1,46 @@
+# scripts/migrar_para_sql.py
+"""
+Migra a planilha (com o journal) para o banco embutido usado com
+DATA_BACKEND=sqlite/duckdb. As tabelas são recriadas do zero.
+
+Uso (a partir da raiz do projeto):
+    python -m scripts.migrar_para_sql --destino data/academia_maestro.sqlite
+    DATA_BACKEND=sqlite python main.py
+"""
+import argparse
+import time
+
+from config.settings import DATA_SQL_PATH, DATA_XLSX_PATH
+from utils.copy_on_write import enable_copy_on_write
+from utils.data_handler import DataHandler
+from utils.sql_storage import SqlStorage, remove_database
+
+
+def migrar(origem, destino, engine="sqlite"):
+    """Copia todas as abas de `origem` (.xlsx) para um banco novo em `destino`. Devolve {aba: linhas}."""
+    handler = DataHandler(origem, backend="excel")
+    abas = {sheet_name: handler.get_data(table_name) for table_name, sheet_name in handler.sheet_names.items()}
+
+    remove_database(destino)
+    storage = SqlStorage(destino, engine=engine)
+    try:
+        storage.import_sheets(abas)
+    finally:
+        storage.close()
+    return {sheet_name: len(df) for sheet_name, df in abas.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migra a planilha de dados para SQLite ou DuckDB.")
+    parser.add_argument("--origem", default=DATA_XLSX_PATH, help="Planilha de dados (padrão: DATA_XLSX_PATH)")
+    parser.add_argument("--destino", default=DATA_SQL_PATH, help="Arquivo do banco (padrão: DATA_SQL_PATH)")
+    parser.add_argument("--engine", choices=("sqlite", "duckdb"), default="sqlite")
+    args = parser.parse_args()
+    enable_copy_on_write()
+
+    inicio = time.perf_counter()
+    linhas = migrar(args.origem, args.destino, args.engine)
+    for sheet_name, n in linhas.items():
+        print(f"  {sheet_name:<16} {n:>10,} linhas")
+    print(f"{sum(linhas.values()):,} linhas migradas para {args.destino} ({args.engine}) "
+          f"em {time.perf_counter() - inicio:.1f} s")
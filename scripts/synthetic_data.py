@@ -0,0 +1,256 @@
+# scripts/synthetic_data.py
+"""
+Dados sintéticos no formato de data/academia_maestro_dados.xlsx, para
+benchmarks. Acima do limite de linhas do Excel, use um banco SQLite/DuckDB.
+
+Uso (a partir da raiz do projeto):
+    python -m scripts.synthetic_data saida.xlsx --agenda 1000000
+    python -m scripts.synthetic_data saida.sqlite --agenda 10000000
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from config.settings import (
+    SHEET_ALUNOS, SHEET_PROFESSORES, SHEET_INSTRUMENTOS,
+    SHEET_AULAS_OFERTADAS, SHEET_MATRICULAS, SHEET_AGENDA, SHEET_PAGAMENTOS
+)
+
+INSTRUMENTOS = ["Violão", "Teclado", "Guitarra", "Bateria", "Canto", "Violino", "Contrabaixo"]
+PROFESSORES = [
+    "Ana Souza", "Bruno Lima", "Carla Mendes", "Diego Rocha", "Eduarda Pires",
+    "Felipe Nunes", "Gabriela Reis", "Henrique Alves", "Isabela Costa", "João Martins",
+]
+STATUS_AULA = ["Concluída", "Cancelada", "Agendada"]
+METODOS_PAGAMENTO = ["Cartão de Crédito", "Pix", "Boleto"]
+GENEROS = ["Feminino", "Masculino", "Outro"]
+OBSERVACOES = [None, "Turma individual", "Preparação para recital", "Comprovante anexado"]
+DIAS_SEMANA = ["Segunda-feira", "Terça-feira", "Quarta-feira", "Quinta-feira", "Sexta-feira", "Sábado"]
+STATUS_OFERTA = ["Ativa", "Encerrada"]
+STATUS_MATRICULA = ["Ativa", "Trancada", "Cancelada"]
+
+# Entra no nome dos arquivos gerados: mude quando o formato mudar
+GERADOR_VERSAO = 2
+# Uma aba do Excel comporta 1.048.576 linhas (uma delas é o cabeçalho)
+LINHAS_POR_ABA_XLSX = 1_048_575
+
+DATA_INICIO = np.datetime64("2021-01-01")
+DATA_FIM = np.datetime64("2025-12-31")
+
+
+def _datas(rng, n, inicio=DATA_INICIO, fim=DATA_FIM):
+    dias = (fim - inicio).astype(int) + 1
+    return inicio + rng.integers(0, dias, size=n).astype("timedelta64[D]")
+
+
+def _como_texto(datas):
+    # O arquivo real guarda as datas como texto 'AAAA-MM-DD'
+    return pd.Series(np.datetime_as_string(datas, unit="D"), dtype=object)
+
+
+def _como_datetime(datas):
+    return pd.Series(datas.astype("datetime64[ns]"))
+
+
+def _horarios(horas, texto):
+    if texto:
+        return pd.Series([f"{h:02d}:00:00" for h in range(25)], dtype=object)[horas].to_numpy()
+    return (horas * 3600).astype("timedelta64[s]").astype("timedelta64[ns]")
+
+
+def generate_frames(n_agenda=10_000, seed=42, texto=True):
+    """
+    {aba: DataFrame}, determinístico para o seed. Com texto=False datas e
+    horários já saem como datetime64/timedelta64 (o que o banco SQL recebe).
+    """
+    rng = np.random.default_rng(seed)
+    datas = _como_texto if texto else _como_datetime
+    n_alunos = max(80, n_agenda // 50)
+
+    instrumentos = pd.DataFrame({
+        "id": np.arange(1, len(INSTRUMENTOS) + 1),
+        "nome_instrumento": INSTRUMENTOS,
+    })
+
+    n_prof = len(PROFESSORES)
+    professores = pd.DataFrame({
+        "id": np.arange(1, n_prof + 1),
+        "nome": PROFESSORES,
+        "email": [f"{n.lower().replace(' ', '.')}@academiamaestro.com" for n in PROFESSORES],
+        "telefone": [f"(11) 9{rng.integers(1000, 9999)}-{rng.integers(1000, 9999)}" for _ in PROFESSORES],
+        "data_contratacao": datas(_datas(rng, n_prof, np.datetime64("2015-01-01"), np.datetime64("2020-12-31"))),
+        "especializacao": [INSTRUMENTOS[i % len(INSTRUMENTOS)] for i in range(n_prof)],
+        "status": np.where(rng.random(n_prof) < 0.9, "Ativo", "Inativo").astype(object),
+    })
+
+    ids_alunos = np.arange(1, n_alunos + 1)
+    alunos = pd.DataFrame({
+        "id": ids_alunos,
+        "nome": [f"Aluno {i}" for i in ids_alunos],
+        "data_nascimento": datas(_datas(rng, n_alunos, np.datetime64("1960-01-01"), np.datetime64("2015-12-31"))),
+        "genero": np.array(GENEROS, dtype=object)[rng.integers(0, len(GENEROS), n_alunos)],
+        "email": [f"aluno.{i:07d}@aluno.maestro.com" for i in ids_alunos],
+        "telefone": [f"(11) 9{i % 10000:04d}-{(i * 7) % 10000:04d}" for i in ids_alunos],
+        "data_cadastro": datas(np.sort(_datas(rng, n_alunos))),
+        "status": np.where(rng.random(n_alunos) < 0.75, "Ativo", "Inativo").astype(object),
+    })
+
+    # Agenda em ordem cronológica, como no arquivo real
+    datas_aula = np.sort(_datas(rng, n_agenda))
+    horas = rng.integers(8, 21, size=n_agenda)
+    status_aula = np.array(STATUS_AULA, dtype=object)[rng.choice(3, size=n_agenda, p=[0.7, 0.1, 0.2])]
+    agenda = pd.DataFrame({
+        "id": np.arange(1, n_agenda + 1),
+        "aluno_id": rng.integers(1, n_alunos + 1, size=n_agenda),
+        "professor_id": rng.integers(1, n_prof + 1, size=n_agenda),
+        "instrumento_id": rng.integers(1, len(INSTRUMENTOS) + 1, size=n_agenda),
+        "data_aula": datas(datas_aula),
+        "hora_inicio": _horarios(horas, texto),
+        "hora_fim": _horarios(horas + 1, texto),
+        "valor_aula": rng.choice([250.0, 280.0, 300.0], size=n_agenda),
+        "status": status_aula,
+        "observacoes": np.array(OBSERVACOES, dtype=object)[rng.integers(0, len(OBSERVACOES), n_agenda)],
+    })
+
+    # Um pagamento por aula concluída, alguns dias depois da aula
+    pagas = agenda[agenda["status"] == "Concluída"]
+    n_pag = len(pagas)
+    datas_pag = datas_aula[pagas.index.to_numpy()] + rng.integers(0, 8, n_pag).astype("timedelta64[D]")
+    pagamentos = pd.DataFrame({
+        "id": np.arange(1, n_pag + 1),
+        "aluno_id": pagas["aluno_id"].to_numpy(),
+        "data_pagamento": datas(datas_pag),
+        "valor_pago": pagas["valor_aula"].to_numpy(),
+        "metodo_pagamento": np.array(METODOS_PAGAMENTO, dtype=object)[rng.integers(0, 3, n_pag)],
+        "referencia_aula_id": pagas["id"].to_numpy(),
+        "status": "Pago",
+        "observacoes": np.array(OBSERVACOES, dtype=object)[rng.integers(0, len(OBSERVACOES), n_pag)],
+    })
+
+    # Turmas e matrículas usam outro gerador: as abas acima não mudam com elas
+    ofertadas, matriculas = _turmas_e_matriculas(np.random.default_rng([seed, 1]), alunos, datas)
+
+    return {
+        SHEET_INSTRUMENTOS: instrumentos,
+        SHEET_PROFESSORES: professores,
+        SHEET_ALUNOS: alunos,
+        SHEET_AULAS_OFERTADAS: ofertadas,
+        SHEET_MATRICULAS: matriculas,
+        SHEET_AGENDA: agenda,
+        SHEET_PAGAMENTOS: pagamentos,
+    }
+
+
+def _turmas_e_matriculas(rng, alunos, datas):
+    """Turmas (professor x instrumento x horário) e as matrículas dos alunos nelas."""
+    n_prof, n_instr = len(PROFESSORES), len(INSTRUMENTOS)
+    # Seis turmas por professor, em instrumentos próximos da sua especialização
+    n_turmas = n_prof * 6
+    professor_id = np.repeat(np.arange(1, n_prof + 1), 6)
+    instrumento_id = (professor_id - 1 + rng.integers(0, 3, n_turmas)) % n_instr + 1
+    hora = rng.integers(8, 21, n_turmas)
+    ofertadas = pd.DataFrame({
+        "id": np.arange(1, n_turmas + 1),
+        "professor_id": professor_id,
+        "instrumento_id": instrumento_id,
+        "dia_semana": np.array(DIAS_SEMANA, dtype=object)[rng.integers(0, len(DIAS_SEMANA), n_turmas)],
+        "horario": np.array([f"{h:02d}:00" for h in range(24)], dtype=object)[hora],
+        "vagas": rng.integers(1, 9, n_turmas),
+        "status": np.array(STATUS_OFERTA, dtype=object)[(rng.random(n_turmas) < 0.15).astype(int)],
+    })
+
+    # De 1 a 3 matrículas por aluno, a partir do cadastro
+    n_alunos = len(alunos)
+    por_aluno = rng.choice([1, 2, 3], size=n_alunos, p=[0.6, 0.3, 0.1])
+    aluno_pos = np.repeat(np.arange(n_alunos), por_aluno)
+    n_mat = len(aluno_pos)
+    cadastro = pd.to_datetime(alunos["data_cadastro"]).to_numpy().astype("datetime64[D]")[aluno_pos]
+    data_matricula = np.minimum(cadastro + rng.integers(0, 180, n_mat).astype("timedelta64[D]"), DATA_FIM)
+    ordem = np.argsort(data_matricula, kind="stable")
+    matriculas = pd.DataFrame({
+        "id": np.arange(1, n_mat + 1),
+        "aluno_id": alunos["id"].to_numpy()[aluno_pos][ordem],
+        "aula_ofertada_id": rng.integers(1, n_turmas + 1, n_mat)[ordem],
+        "data_matricula": datas(data_matricula[ordem]),
+        "status": np.array(STATUS_MATRICULA, dtype=object)[rng.choice(3, size=n_mat, p=[0.7, 0.1, 0.2])][ordem],
+    })
+    return ofertadas, matriculas
+
+
+def write_workbook(path, frames):
+    """Grava as abas geradas em um arquivo .xlsx."""
+    grandes = [name for name, df in frames.items() if len(df) > LINHAS_POR_ABA_XLSX]
+    if grandes:
+        raise ValueError(
+            f"Abas com mais linhas do que o Excel comporta ({', '.join(grandes)}): "
+            f"gere um banco SQLite (.sqlite) em vez de .xlsx."
+        )
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for sheet_name, df in frames.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+
+def write_database(path, frames, engine="sqlite"):
+    """Grava as abas geradas num banco novo, no formato do backend SQL (utils/sql_storage.py)."""
+    from utils.sql_storage import SqlStorage, remove_database
+
+    remove_database(path)
+    storage = SqlStorage(path, engine=engine)
+    try:
+        storage.import_sheets(frames)
+    finally:
+        storage.close()
+
+
+def _bench_dir(directory):
+    directory = directory or os.path.join(tempfile.gettempdir(), "academia_maestro_bench")
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def ensure_workbook(n_agenda, seed=42, directory=None):
+    """Caminho de uma planilha sintética com esse tamanho e seed, gerada só na primeira vez."""
+    path = os.path.join(_bench_dir(directory), f"sintetico_v{GERADOR_VERSAO}_{n_agenda}_{seed}.xlsx")
+    if not os.path.exists(path):
+        print(f"Gerando planilha sintética com {n_agenda:,} aulas em {path}...")
+        tmp_path = f"{path[:-5]}.tmp.xlsx"
+        write_workbook(tmp_path, generate_frames(n_agenda, seed))
+        os.replace(tmp_path, path)
+    return path
+
+
+def ensure_database(n_agenda, seed=42, engine="sqlite", directory=None):
+    """Como ensure_workbook, mas num banco SQLite/DuckDB (sem o limite de linhas do Excel)."""
+    path = os.path.join(_bench_dir(directory), f"sintetico_v{GERADOR_VERSAO}_{n_agenda}_{seed}.{engine}")
+    if not os.path.exists(path):
+        print(f"Gerando banco sintético com {n_agenda:,} aulas em {path}...")
+        tmp_path = f"{path}.tmp"
+        write_database(tmp_path, generate_frames(n_agenda, seed, texto=False), engine)
+        os.replace(tmp_path, path)
+    return path
+
+
+def ensure_dataset(n_agenda, seed=42, backend="excel", directory=None):
+    """Caminho dos dados sintéticos no formato do backend ('excel', 'sqlite' ou 'duckdb')."""
+    if backend == "excel":
+        return ensure_workbook(n_agenda, seed, directory)
+    return ensure_database(n_agenda, seed, backend, directory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos da Academia Maestro (.xlsx, .sqlite ou .duckdb).")
+    parser.add_argument("saida", help="Caminho do arquivo a ser criado; a extensão define o formato")
+    parser.add_argument("--agenda", type=int, default=10_000, help="Número de linhas em agenda_aulas")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    extensao = os.path.splitext(args.saida)[1].lower()
+    frames = generate_frames(args.agenda, args.seed, texto=extensao == ".xlsx")
+    if extensao == ".xlsx":
+        write_workbook(args.saida, frames)
+    else:
+        write_database(args.saida, frames, "duckdb" if extensao == ".duckdb" else "sqlite")
+    print(f"Dados gerados em {args.saida}: " + ", ".join(f"{k}={len(v)}" for k, v in frames.items()))
@@ -0,0 +1,18 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from utils.data_handler import DataHandler
+
+AMOSTRA = Path(__file__).resolve().parent.parent / "data" / "academia_maestro_dados.xlsx"
+
+
+@pytest.fixture
+def handler(tmp_path):
+    """DataHandler sobre uma cópia da planilha de exemplo (cache e journal ficam no tmp_path)."""
+    path = tmp_path / AMOSTRA.name
+    shutil.copy2(AMOSTRA, path)
+    handler = DataHandler(str(path), use_cache=False, backend="excel")
+    yield handler
+    handler.storage.close()
@@ -0,0 +1,60 @@
+from matplotlib.colors import to_rgba
+
+from analysis.kpi_query import KpiQuery
+from ui.chart_cache import BitmapCache
+from ui.charts import CachedChartPanel, ChartPanel, faturamento_mensal_chart, popularidade_chart
+
+PERIODO = ('2024-01-01', '2024-12-31')
+
+
+def test_barras_reaproveitadas_trocam_de_cor():
+    panel = ChartPanel()
+    panel.bar(['a', 'b'], [1, 2], color='#1A3A7D', title='t', ylabel='y')
+    artistas = panel._artists
+    panel.bar(['a', 'b'], [3, 4], color='#00a152', title='t', ylabel='y')
+    assert panel._artists is artistas
+    assert [rect.get_height() for rect in artistas] == [3, 4]
+    assert all(rect.get_facecolor() == to_rgba('#00a152') for rect in artistas)
+
+
+def test_linha_reaproveitada_troca_de_cor():
+    panel = ChartPanel()
+    panel.line(['a', 'b'], [1, 2], color='#1A3A7D', title='t', ylabel='y')
+    linha = panel._artists
+    panel.line(['a', 'b'], [3, 4], color='#00a152', title='t', ylabel='y')
+    assert panel._artists is linha
+    assert to_rgba(linha.get_color()) == to_rgba('#00a152')
+
+
+class _Label:
+    def winfo_width(self):
+        return 1000
+
+    def winfo_height(self):
+        return 500
+
+    def configure(self, image):
+        self.shown = image
+
+
+def _painel_sem_tk(cache, desenhados):
+    panel = CachedChartPanel.__new__(CachedChartPanel)
+    panel.figsize, panel.dpi, panel.cache, panel.widget = (10, 5), 100, cache, _Label()
+    panel._rasterize = lambda method, args, kwargs, size: desenhados.append(method) or object()
+    return panel
+
+
+def test_visao_geral_e_outras_telas_dividem_o_bitmap(handler):
+    cache, desenhados, kpis = BitmapCache(2**30), [], KpiQuery(handler)
+    carregar = lambda nome: kpis.compute(PERIODO, [nome])[nome]
+
+    # Visão Geral e depois Financeiro / Aulas, com o mesmo período
+    faturamento_mensal_chart(_painel_sem_tk(cache, desenhados), carregar('faturamento_por_mes'))
+    popularidade_chart(_painel_sem_tk(cache, desenhados), carregar('popularidade_instrumentos'))
+    financeiro, aulas = _painel_sem_tk(cache, desenhados), _painel_sem_tk(cache, desenhados)
+    faturamento_mensal_chart(financeiro, carregar('faturamento_por_mes'))
+    popularidade_chart(aulas, carregar('popularidade_instrumentos'))
+
+    assert desenhados == ['bar', 'bar']
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert financeiro.widget.shown is not aulas.widget.shown
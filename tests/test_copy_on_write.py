@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.mark.parametrize("copy_on_write", [True, False])
+def test_escrita_do_chamador_nao_altera_a_aba(handler, copy_on_write):
+    with pd.option_context("mode.copy_on_write", copy_on_write):
+        original = handler.get_data('alunos').copy(deep=True)
+        df = handler.get_data('alunos')
+        df['nome'] = 'x'
+        df.loc[df.index[0], 'status'] = 'Inativo'
+        df['id'] += 1000
+        pd.testing.assert_frame_equal(handler.get_data('alunos'), original)
+
+
+def test_get_data_nao_copia_com_copy_on_write(handler):
+    with pd.option_context("mode.copy_on_write", True):
+        df = handler.get_data('agenda_aulas')
+        assert np.shares_memory(df['id'].to_numpy(), handler.dataframes['agenda_aulas']['id'].to_numpy())
+
+
+def test_recorte_do_periodo_nao_altera_a_aba(handler):
+    with pd.option_context("mode.copy_on_write", True):
+        original = handler.get_data('pagamentos').copy(deep=True)
+        df = handler.slice_by_period('pagamentos', '2024-01-01', '2024-06-30')
+        df['valor_pago'] = 0
+        pd.testing.assert_frame_equal(handler.get_data('pagamentos'), original)
@@ -0,0 +1,32 @@
+from datetime import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.formatters import format_currency, format_currency_series, format_time, format_time_series
+
+
+@pytest.mark.parametrize("valores", [
+    [1234.5, -0.5, 1e7, 0.005, np.nan, np.inf, -np.inf],
+    [250, 0, -3, 10**17 + 1],
+    [1234.5, None, "12", "abc", float("inf")],
+])
+def test_moeda_em_series_igual_a_escalar(valores):
+    serie = pd.Series(valores)
+    assert format_currency_series(serie).tolist() == [format_currency(v) for v in serie]
+
+
+@pytest.mark.parametrize("valores", [
+    [time(14, 30), time(9, 5, 59), None, time(14, 30)],
+    ["14:30", "09:05", "25:00", "abc", None],
+    pd.to_datetime(["2024-03-01 14:30:10", None, "2024-03-02 09:05:00"]),
+])
+def test_hora_em_series_igual_a_escalar(valores):
+    serie = pd.Series(valores)
+    assert format_time_series(serie).tolist() == [format_time(v) for v in serie]
+
+
+def test_hora_em_series_de_timedelta_e_texto_com_segundos():
+    assert format_time_series(pd.Series(pd.to_timedelta(["14:30:00", None, "09:05:59"]))).tolist() == ["14:30", "", "09:05"]
+    assert format_time_series(pd.Series(["14:30:00", "9:05:00"])).tolist() == ["14:30", "09:05"]
@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from analysis.alunos_analysis import AlunosAnalysis
+from analysis.kpi_query import KpiQuery
+from analysis.professores_analysis import ProfessoresAnalysis
+from utils.result_cache import ResultCache, reads
+
+PERIODO = ('2020-01-01', '2030-12-31')
+
+
+@pytest.mark.parametrize("copy_on_write", [True, False])
+def test_resultado_em_dicionario_nao_e_alterado_pelo_chamador(copy_on_write):
+    cache = ResultCache(2**20)
+    calcular = lambda: {"generos": pd.Series([3, 2], index=["F", "M"]), "tabela": pd.DataFrame({"x": [1, 2]})}
+    with pd.option_context("mode.copy_on_write", copy_on_write):
+        entregue = cache.get_or_compute("demografia", calcular)
+        entregue["tabela"]["x"] = 0
+        entregue["tabela"].loc[0, "x"] = -1
+        entregue["generos"].iloc[0] = 99
+        entregue["novo"] = 1
+
+        de_novo = cache.get_or_compute("demografia", calcular)
+    assert cache.hits == 1
+    assert set(de_novo) == {"generos", "tabela"}
+    assert de_novo["tabela"]["x"].tolist() == [1, 2]
+    assert de_novo["generos"].tolist() == [3, 2]
+
+
+def test_aba_alterada_durante_o_calculo_nao_fica_no_cache():
+    cache = ResultCache(2**20)
+
+    def calcular():
+        reads("agenda_aulas")
+        cache.invalidate(["agenda_aulas"])
+        return 1
+
+    cache.get_or_compute("aulas", calcular)
+    assert cache.stats()["entradas"] == 0
+
+
+def test_insercao_descarta_so_os_resultados_que_leram_a_aba(handler):
+    alunos, professores, kpis = AlunosAnalysis(handler), ProfessoresAnalysis(handler), KpiQuery(handler)
+    total = alunos.get_total_alunos()
+    carga = professores.get_carga_horaria_professor(*PERIODO)
+    faturamento = kpis.compute(PERIODO, ['faturamento_total'])['faturamento_total']
+
+    handler.insert_data('alunos', pd.DataFrame([{
+        "id": 900001, "nome": "Aluno Novo", "data_nascimento": "2000-01-01", "genero": "Feminino",
+        "email": "novo@aluno.maestro.com", "telefone": "", "data_cadastro": "2025-06-01", "status": "Ativo",
+    }]))
+    hits = handler.result_cache.hits
+    pd.testing.assert_frame_equal(professores.get_carga_horaria_professor(*PERIODO), carga)
+    assert kpis.compute(PERIODO, ['faturamento_total'])['faturamento_total'] == faturamento
+    assert handler.result_cache.hits == hits + 2
+    assert alunos.get_total_alunos() == total + 1
+    assert handler.result_cache.hits == hits + 2
+
+    handler.insert_data('pagamentos', pd.DataFrame([{
+        "id": 900001, "aluno_id": 1, "data_pagamento": "2025-06-02", "valor_pago": 100.0,
+        "metodo_pagamento": "Pix", "referencia_aula_id": 1, "status": "Pago",
+    }]))
+    assert kpis.compute(PERIODO, ['faturamento_total'])['faturamento_total'] == faturamento + 100
+    assert handler.result_cache.hits == hits + 2
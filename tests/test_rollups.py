@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from analysis.aulas_analysis import AulasAnalysis
+from analysis.kpi_query import KpiQuery
+from scripts.migrar_para_sql import migrar
+from utils.data_handler import DataHandler
+
+PERIODO = ('2020-01-01', '2030-12-31')
+
+SEM_DIMENSAO = [
+    {"id": 900001, "aluno_id": 1, "professor_id": 1, "instrumento_id": None, "data_aula": "2025-06-02",
+     "hora_inicio": "10:00:00", "hora_fim": "11:00:00", "valor_aula": 250.0, "status": "Concluída"},
+    {"id": 900002, "aluno_id": 2, "professor_id": None, "instrumento_id": 2, "data_aula": "2025-06-02",
+     "hora_inicio": "11:00:00", "hora_fim": "12:00:00", "valor_aula": 250.0, "status": "Concluída"},
+    {"id": 900003, "aluno_id": 3, "professor_id": None, "instrumento_id": None, "data_aula": "2025-06-03",
+     "hora_inicio": "09:00:00", "hora_fim": "10:00:00", "valor_aula": 250.0, "status": "Cancelada"},
+]
+
+
+def contagem_base(handler):
+    """Aulas por status como o código original contava: groupby('status') nas linhas da agenda."""
+    agenda = handler.slice_by_period('agenda_aulas', *PERIODO)
+    return agenda.groupby('status', observed=True).size().rename('total_aulas')
+
+
+def contagem_cubo(handler):
+    return AulasAnalysis(handler).get_total_aulas_por_status(*PERIODO).set_index('status')['total_aulas']
+
+
+def confere(handler):
+    base = contagem_base(handler)
+    pd.testing.assert_series_equal(contagem_cubo(handler).sort_index(), base.sort_index(), check_dtype=False, check_names=False)
+    kpis = KpiQuery(handler).compute(PERIODO, ['total_aulas', 'aulas_concluidas'])
+    assert kpis['total_aulas'] == base.sum()
+    assert kpis['aulas_concluidas'] == base.get('Concluída', 0)
+
+
+def test_aulas_sem_instrumento_ou_professor_entram_no_cubo(handler):
+    handler.rollups.aulas(*PERIODO)  # cubo já montado: as linhas novas entram como delta
+    handler.insert_many('agenda_aulas', SEM_DIMENSAO)
+    agenda = handler.get_data('agenda_aulas')
+    assert agenda['instrumento_id'].isna().sum() >= 2
+    confere(handler)
+
+    # Recarregado do arquivo (journal), o cubo é montado do zero
+    relido = DataHandler(handler.file_path, use_cache=False, backend="excel")
+    confere(relido)
+    relido.storage.close()
+
+
+def test_cubo_do_banco_conta_aulas_sem_dimensao(handler, tmp_path):
+    handler.insert_many('agenda_aulas', SEM_DIMENSAO)
+    handler.compact()
+    destino = str(tmp_path / "dados.sqlite")
+    migrar(handler.file_path, destino)
+    banco = DataHandler(destino, backend="sqlite")
+    try:
+        assert banco.storage.pushdown
+        confere(banco)
+    finally:
+        banco.storage.close()
+
+
+def test_insercao_e_consulta_ao_cubo_ao_mesmo_tempo(handler, monkeypatch):
+    handler.rollups.aulas(*PERIODO)
+    handler.rollups.version = None  # cubos desatualizados: a consulta os refaz
+    append = handler.storage.append
+
+    def append_lento(*args):
+        time.sleep(0.5)
+        return append(*args)
+
+    monkeypatch.setattr(handler.storage, "append", append_lento)
+    insercao = threading.Thread(target=handler.insert_many, args=('agenda_aulas', SEM_DIMENSAO[:1]), daemon=True)
+    consulta = threading.Thread(target=handler.rollups.aulas, args=PERIODO, daemon=True)
+    insercao.start()
+    time.sleep(0.1)
+    consulta.start()
+    insercao.join(5)
+    consulta.join(5)
+    assert not insercao.is_alive() and not consulta.is_alive()
+    confere(handler)
+
+
+def test_pagamento_de_aula_inserida_depois_do_cubo(handler):
+    handler.rollups.pagamentos(*PERIODO)
+    handler.insert_many('agenda_aulas', SEM_DIMENSAO)
+    handler.insert_many('pagamentos', [
+        {"id": 900101, "aluno_id": 2, "data_pagamento": "2025-06-02", "valor_pago": 250.0,
+         "metodo_pagamento": "Pix", "referencia_aula_id": 900002, "status": "Pago"},
+    ])
+    incremental = handler.rollups.pagamentos(*PERIODO).reset_index(drop=True)
+    handler.rollups.version = None
+    pd.testing.assert_frame_equal(incremental, handler.rollups.pagamentos(*PERIODO).reset_index(drop=True), check_dtype=False)
+    nova = incremental[incremental['dia'] == pd.Timestamp('2025-06-02')]
+    assert (nova['instrumento_id'] == 2).any()
@@ -0,0 +1,92 @@
+import re
+import shutil
+import zipfile
+
+import pytest
+
+from tests.conftest import AMOSTRA
+from utils.data_handler import DataHandler
+
+PROFESSORES = "xl/worksheets/sheet2.xml"
+STRINGS = "xl/sharedStrings.xml"
+
+
+def reescrever(path, partes):
+    """Regrava o .xlsx trocando o conteúdo das partes: {parte: função(bytes) -> bytes}."""
+    tmp = f"{path}.novo"
+    with zipfile.ZipFile(path) as origem, zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as destino:
+        for info in origem.infolist():
+            dados = origem.read(info.filename)
+            if info.filename in partes:
+                dados = partes[info.filename](dados)
+            destino.writestr(info.filename, dados)
+    shutil.move(tmp, path)
+
+
+def acrescentar_string(texto):
+    def editar(xml):
+        return xml.replace(b"</sst>", f"<si><t>{texto}</t></si></sst>".encode())
+    return editar
+
+
+def contar_strings(path):
+    with zipfile.ZipFile(path) as zf:
+        return zf.read(STRINGS).count(b"<si>")
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / AMOSTRA.name
+    shutil.copy2(AMOSTRA, path)
+    return str(path)
+
+
+@pytest.fixture
+def handler(workbook, tmp_path):
+    handler = DataHandler(workbook, cache_dir=str(tmp_path / "cache"), backend="excel")
+    yield handler
+    handler.storage.close()
+
+
+def espiar_leituras(handler, monkeypatch):
+    lidas = []
+    ler = handler.storage._read_excel_sheets
+
+    def espiao(sheet_names):
+        lidas.append(sorted(sheet_names))
+        return ler(sheet_names)
+
+    monkeypatch.setattr(handler.storage, "_read_excel_sheets", espiao)
+    return lidas
+
+
+def test_texto_novo_numa_aba_rele_so_essa_aba(handler, workbook, tmp_path, monkeypatch):
+    lidas = espiar_leituras(handler, monkeypatch)
+    nova = contar_strings(workbook)
+    # Como o Excel faz: a string nova vai para o fim da tabela e só a aba alterada aponta para ela
+    reescrever(workbook, {
+        STRINGS: acrescentar_string("Nome Novo"),
+        PROFESSORES: lambda xml: re.sub(rb'(<c r="B2" t="s"><v>)\d+(</v>)', rb"\g<1>%d\g<2>" % nova, xml),
+    })
+
+    assert handler.reload_changed_sheets() == ["professores"]
+    assert lidas == [["professores"]]
+    assert handler.get_data("professores")["nome"].iloc[0] == "Nome Novo"
+
+    # O cache colunar ficou coerente: uma carga nova não relê nada do Excel
+    relido = DataHandler(workbook, cache_dir=str(tmp_path / "cache"), backend="excel")
+    assert relido.get_data("professores")["nome"].iloc[0] == "Nome Novo"
+    assert relido.storage.changed_sheets() == []
+    relido.storage.close()
+
+
+def test_string_alterada_no_lugar_rele_todas_as_abas(handler, workbook):
+    reescrever(workbook, {STRINGS: lambda xml: xml.replace(b"<t>Teclado</t>", b"<t>Piano</t>", 1)})
+    assert sorted(handler.storage.changed_sheets()) == sorted(handler.dataframes)
+
+
+def test_sem_alteracao_nao_rele_nada(handler, workbook, monkeypatch):
+    lidas = espiar_leituras(handler, monkeypatch)
+    reescrever(workbook, {})
+    assert handler.reload_changed_sheets() == []
+    assert lidas == []
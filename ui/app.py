@@ -1,68 +1,141 @@
 # ui/app.py
 
+import importlib
+from contextlib import nullcontext
+
 import customtkinter as ctk
 from tkinter import ttk
 from PIL import Image
 from tkcalendar import DateEntry # --- IMPORTAÇÃO DA NOVA BIBLIOTECA ---
 
-# Importa as classes de cada tela
-from .overview_view import OverviewView
-from .finance_view import FinanceView
-from .students_view import StudentsView
-from .teachers_view import TeachersView
-from .classes_view import ClassesView
+from .refresh_scheduler import RefreshScheduler
+
+# Importa a lógica de dados. pandas, as análises e o matplotlib ficam de fora:
+# são importados na carga em segundo plano e na primeira tela aberta.
+from config.settings import DATA_WATCH_ENABLED, DATA_WATCH_INTERVAL_MS, DATA_WATCH_DEBOUNCE_MS, DEBUG_PANEL
+from utils.file_watcher import FileWatcher
+from utils.instrumentation import recorder
 
-# Importa a lógica de dados
-from utils.data_handler import DataHandler
-from analysis.alunos_analysis import AlunosAnalysis
-from analysis.aulas_analysis import AulasAnalysis
-from analysis.financeiro_analysis import FinanceiroAnalysis
-from analysis.professores_analysis import ProfessoresAnalysis
+# Telas: (módulo em ui/, classe). Cada uma é importada e montada na primeira vez que é aberta
+VIEWS = {
+    "overview": ("overview_view", "OverviewView"),
+    "finance": ("finance_view", "FinanceView"),
+    "students": ("students_view", "StudentsView"),
+    "teachers": ("teachers_view", "TeachersView"),
+    "classes": ("classes_view", "ClassesView"),
+    "debug": ("debug_view", "DebugView"),
+}
 
 class App(ctk.CTk):
-    def __init__(self):
+    def __init__(self, profiler=None):
         super().__init__()
+        # Linha do tempo da inicialização (main.py --profile-startup)
+        self.profiler = profiler
 
-        self.title("Academia Maestro - Dashboard")
-        self.geometry("1400x850")
-        ctk.set_appearance_mode("Light")
-        
-        self.APP_COLOR = "#1A3A7D"
-        self.BG_COLOR = "#FFFFFF"
-
-        self.data_handler = DataHandler()
-        self.analyzers = {
-            "alunos": AlunosAnalysis(self.data_handler),
-            "aulas": AulasAnalysis(self.data_handler),
-            "financeiro": FinanceiroAnalysis(self.data_handler),
-            "professores": ProfessoresAnalysis(self.data_handler)
-        }
+        with self._etapa("janela (sidebar e cabeçalho)"):
+            self.title("Academia Maestro - Dashboard")
+            self.geometry("1400x850")
+            ctk.set_appearance_mode("Light")
+
+            self.APP_COLOR = "#1A3A7D"
+            self.BG_COLOR = "#FFFFFF"
+
+            # Preenchidos quando a carga em segundo plano terminar (on_data_loaded)
+            self.data_handler = None
+            self.analyzers = None
+
+            # O painel de desempenho mostra as medidas do recorder: com ele, a gravação já começa ligada
+            if DEBUG_PANEL:
+                recorder.set_enabled(True)
+
+            # As análises rodam em threads de trabalho; o Tk só desenha o resultado
+            self.refresh_scheduler = RefreshScheduler(self)
+            self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+            self.grid_columnconfigure(1, weight=1)
+            self.grid_rowconfigure(1, weight=1)
+
+            self.create_sidebar()
+            self.create_header()
+
+            self.main_frame = ctk.CTkFrame(self, corner_radius=0, fg_color=self.BG_COLOR)
+            self.main_frame.grid(row=1, column=1, sticky="nsew", padx=20, pady=20)
+            self.main_frame.grid_rowconfigure(0, weight=1)
+            self.main_frame.grid_columnconfigure(0, weight=1)
+
+            style = ttk.Style()
+            style.theme_use("default")
+            style.configure("Treeview", background="white", foreground="black", fieldbackground="white", borderwidth=0)
+            style.configure("Treeview.Heading", background="#E1E1E1", foreground="black", font=("Calibri", 10, "bold"))
+            style.map('Treeview', background=[('selected', self.APP_COLOR)])
+
+            self.current_frame_name = "overview" # --- NOVA LINHA: para saber qual tela está ativa ---
+            self.frames = {}
+            self.file_watcher = None
 
-        self.grid_columnconfigure(1, weight=1)
-        self.grid_rowconfigure(1, weight=1)
+            self.status_label = ctk.CTkLabel(self.main_frame, text="⏳ Carregando dados...", font=ctk.CTkFont(size=16))
+            self.status_label.grid(row=0, column=0)
 
-        self.create_sidebar()
-        self.create_header()
+        # A janela aparece já; as abas são lidas no pool e a tela inicial é montada depois
+        self.after_idle(self._marco, "janela desenhada")
+        self.refresh_scheduler.submit("carga-dados", self.load_data, self.on_data_loaded, on_error=self.on_data_error)
 
-        self.main_frame = ctk.CTkFrame(self, corner_radius=0, fg_color=self.BG_COLOR)
-        self.main_frame.grid(row=1, column=1, sticky="nsew", padx=20, pady=20)
-        self.main_frame.grid_rowconfigure(0, weight=1)
-        self.main_frame.grid_columnconfigure(0, weight=1)
+    def _etapa(self, nome):
+        return self.profiler.etapa(nome) if self.profiler else nullcontext()
 
-        self.current_frame_name = None # --- NOVA LINHA: para saber qual tela está ativa ---
-        self.frames = {}
-        self.setup_frames()
-        self.show_frame("overview")
+    def _marco(self, nome):
+        if self.profiler:
+            self.profiler.marco(nome)
 
-        style = ttk.Style()
-        style.theme_use("default")
-        style.configure("Treeview", background="white", foreground="black", fieldbackground="white", borderwidth=0)
-        style.configure("Treeview.Heading", background="#E1E1E1", foreground="black", font=("Calibri", 10, "bold"))
-        style.map('Treeview', background=[('selected', self.APP_COLOR)])
+    def load_data(self):
+        """Roda no pool: importa pandas e as análises e lê as abas, sem tocar no Tk."""
+        with self._etapa("carga dos dados (DataHandler)"):
+            from utils.copy_on_write import enable_copy_on_write
+            from utils.data_handler import DataHandler
+            enable_copy_on_write()
+            data_handler = DataHandler()
+        with self._etapa("análises"):
+            from analysis.alunos_analysis import AlunosAnalysis
+            from analysis.aulas_analysis import AulasAnalysis
+            from analysis.financeiro_analysis import FinanceiroAnalysis
+            from analysis.kpi_query import KpiQuery
+            from analysis.professores_analysis import ProfessoresAnalysis
+            analyzers = {
+                "alunos": AlunosAnalysis(data_handler),
+                "aulas": AulasAnalysis(data_handler),
+                "financeiro": FinanceiroAnalysis(data_handler),
+                "professores": ProfessoresAnalysis(data_handler),
+                # KPIs de várias análises calculados juntos (um recorte por fonte)
+                "kpis": KpiQuery(data_handler),
+            }
+        return data_handler, analyzers
 
-        self.frames = {}
-        self.setup_frames()
-        self.show_frame("overview")
+    def on_data_loaded(self, resultado):
+        self.data_handler, self.analyzers = resultado
+        self._marco("dados carregados")
+        self.status_label.destroy()
+
+        # Modo de observação: a planilha editada fora do dashboard é relida sem reiniciar
+        if DATA_WATCH_ENABLED and self.data_handler.storage.name == "excel":
+            self.file_watcher = FileWatcher(self.data_handler.file_path, DATA_WATCH_DEBOUNCE_MS / 1000)
+            self.after(DATA_WATCH_INTERVAL_MS, self.watch_data_file)
+
+        self.show_frame(self.current_frame_name)
+        if self.profiler:
+            self.after(self.refresh_scheduler.poll_ms, self._report_startup, self.frames[self.current_frame_name])
+
+    def on_data_error(self, erro):
+        print(f"❌ Erro ao carregar os dados: {erro}")
+        self.status_label.configure(text=f"❌ Erro ao carregar os dados:\n{erro}")
+
+    def _report_startup(self, frame):
+        """Espera a primeira tela terminar de desenhar e imprime a linha do tempo da inicialização."""
+        if self.refresh_scheduler.is_pending(frame) or self.refresh_scheduler.is_pending((frame, "aba")):
+            self.after(self.refresh_scheduler.poll_ms, self._report_startup, frame)
+            return
+        self._marco(f"primeira tela desenhada ({self.current_frame_name})")
+        self.profiler.desinstalar()
+        print(self.profiler.relatorio())
 
     def create_sidebar(self):
         sidebar_frame = ctk.CTkFrame(self, width=200, corner_radius=0, fg_color="#F5F5F5")
@@ -77,6 +150,8 @@ class App(ctk.CTk):
             "Visão Geral": "overview", "Finanças": "finance", "Alunos": "students",
             "Professores": "teachers", "Aulas": "classes"
         }
+        if DEBUG_PANEL:
+            buttons["Desempenho"] = "debug"
         for i, (text, name) in enumerate(buttons.items(), 1):
             button = ctk.CTkButton(
                 sidebar_frame, text=text, height=40,
@@ -126,29 +201,57 @@ class App(ctk.CTk):
         start_date = self.start_date_entry.get()
         end_date = self.end_date_entry.get()
         print(f"Filtro aplicado: de {start_date} a {end_date}")
-        # Futuramente, aqui chamaremos a atualização dos gráficos
-        
+
         if self.current_frame_name:
-            current_frame = self.frames[self.current_frame_name]
-            # Verifica se a tela tem um método de atualização antes de chamar
-            if hasattr(current_frame, 'update_view'):
-                current_frame.update_view(start_date, end_date)
-
-    def setup_frames(self):
-        views = {
-            "overview": OverviewView, "finance": FinanceView, "students": StudentsView,
-            "teachers": TeachersView, "classes": ClassesView
-        }
-        for name, ViewClass in views.items():
-            frame = ViewClass(self.main_frame, self.analyzers, self.data_handler)
-            self.frames[name] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
+            # Um novo clique em "Aplicar" substitui a atualização que ainda estiver pendente
+            self.refresh_view(self.current_frame_name)
+
+    def refresh_view(self, page_name):
+        """Atualiza a tela: análises no pool, desenho na thread do Tk, só a aba visível."""
+        frame = self.frames.get(page_name)
+        if frame is None:
+            return
+        # Verifica se a tela sabe se atualizar antes de chamar
+        if hasattr(frame, 'refresh'):
+            frame.refresh(self.start_date_entry.get(), self.end_date_entry.get())
+
+    def watch_data_file(self):
+        """Verifica a planilha (só um os.stat) e, se ela mudou, relê as abas alteradas no pool."""
+        if self.file_watcher.poll():
+            if self.refresh_scheduler.is_pending("recarga-dados"):
+                # Ainda relendo a alteração anterior: verifica de novo depois do debounce
+                self.file_watcher.rearm()
+            else:
+                self.refresh_scheduler.submit("recarga-dados", self.data_handler.reload_changed_sheets, self.on_data_reloaded)
+        self.after(DATA_WATCH_INTERVAL_MS, self.watch_data_file)
+
+    def on_data_reloaded(self, abas):
+        """Só a tela visível é refeita agora; as outras se atualizam ao serem abertas (show_frame)."""
+        if abas and self.current_frame_name:
+            self.refresh_view(self.current_frame_name)
+
+    def on_close(self):
+        self.refresh_scheduler.shutdown()
+        self.destroy()
+
+    def get_frame(self, page_name):
+        """A tela `page_name`, importada e montada na primeira vez em que é aberta."""
+        frame = self.frames.get(page_name)
+        if frame is None:
+            module_name, class_name = VIEWS[page_name]
+            with self._etapa(f"tela {page_name} (import e montagem)"):
+                ViewClass = getattr(importlib.import_module(f".{module_name}", __package__), class_name)
+                frame = ViewClass(self.main_frame, self.analyzers, self.data_handler, self.refresh_scheduler)
+                frame.grid(row=0, column=0, sticky="nsew")
+            self.frames[page_name] = frame
+        return frame
 
     def show_frame(self, page_name):
         """Mostra a tela solicitada e atualiza o seu estado."""
         self.current_frame_name = page_name # --- NOVA LINHA: atualiza a tela ativa ---
-        frame = self.frames[page_name]
+        if self.data_handler is None:
+            return  # Ainda carregando: a tela escolhida é aberta quando os dados chegarem
+        frame = self.get_frame(page_name)
+        frame.tkraise()
         # Atualiza a view com os filtros atuais sempre que trocamos de tela
-        if hasattr(frame, 'update_view'):
-             frame.update_view(self.start_date_entry.get(), self.end_date_entry.get())
-        frame.tkraise()
\ No newline at end of file
+        self.refresh_view(page_name)
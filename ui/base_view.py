@@ -0,0 +1,151 @@
+# ui/base_view.py
+
+import customtkinter as ctk
+
+from .charts import CachedChartPanel, ChartPanel
+from config.settings import CHART_CACHE_ENABLED
+from utils.instrumentation import recorder
+
+class DashboardView(ctk.CTkFrame):
+    """
+    Base das telas do dashboard. load_data(start_date, end_date) só chama as
+    análises e pode rodar numa thread de trabalho; render(data) monta os
+    widgets na thread do Tk. As abas (add_tab) seguem o mesmo esquema, mas só
+    são calculadas quando ficam visíveis.
+    """
+
+    def __init__(self, master, analyzers, data_handler, scheduler=None):
+        super().__init__(master, fg_color="transparent")
+        self.analyzers = analyzers
+        self.data_handler = data_handler
+        self.scheduler = scheduler
+        self.loading_label = ctk.CTkLabel(
+            self, text="⏳ Carregando...", font=ctk.CTkFont(size=14),
+            fg_color="#F5F5F5", corner_radius=8
+        )
+        self._tabs = {}       # nome -> (frame da aba, load(start, end), render(frame, data))
+        self._dirty = set()   # abas que precisam ser refeitas para o período atual
+        self._period = None
+        self._charts = {}     # chave -> ChartPanel
+
+    def create_tab_view(self, **kwargs):
+        """Cria o CTkTabview da tela já ligado à renderização sob demanda."""
+        self.tab_view = ctk.CTkTabview(self, command=self._on_tab_change, **kwargs)
+        return self.tab_view
+
+    def add_tab(self, name, load, render):
+        """
+        Registra uma aba. `load(start_date, end_date)` roda fora da thread do Tk;
+        `render(tab, data)` desenha o resultado dentro do frame da aba.
+        """
+        tab = self.tab_view.add(name)
+        self._tabs[name] = (tab, load, render)
+        self._dirty.add(name)
+        return tab
+
+    def chart_panel(self, key, master, grid=None, **figure_kwargs):
+        """ChartPanel do espaço `key`, criado em `master` na primeira chamada (grid() com `grid`, senão pack())."""
+        panel = self._charts.get(key)
+        if panel is None:
+            panel_class = CachedChartPanel if CHART_CACHE_ENABLED else ChartPanel
+            panel = panel_class(master, **figure_kwargs)
+            if grid is not None:
+                panel.widget.grid(**grid)
+            else:
+                panel.widget.pack(fill="both", expand=True)
+            self._charts[key] = panel
+        return panel
+
+    # --- KPIs (cabeçalho da tela) ---
+
+    def load_data(self, start_date, end_date):
+        raise NotImplementedError
+
+    def render(self, data):
+        raise NotImplementedError
+
+    # --- Atualização ---
+
+    def refresh(self, start_date, end_date):
+        """Atualiza KPIs e a aba visível para o período; as demais ficam sujas."""
+        self._period = (start_date, end_date)
+        self._dirty = set(self._tabs)
+        if self.scheduler is not None:
+            # Uma aba ainda carregando é do período anterior
+            self.scheduler.cancel((self, "aba"))
+        visible = self._visible_tab()
+
+        nome = type(self).__name__
+
+        def load():
+            with recorder.measure("tela", f"{nome}.load_data"):
+                kpis = self.load_data(start_date, end_date)
+            return kpis, self._load_tab(visible, start_date, end_date)
+
+        def render(result):
+            kpis, tab_data = result
+            with recorder.measure("render", f"{nome}.render"):
+                self.render(kpis)
+            self._render_tab(visible, tab_data)
+
+        self._run(self, load, render)
+
+    def update_view(self, start_date, end_date):
+        """Atualização síncrona: carrega e desenha na thread atual."""
+        scheduler, self.scheduler = self.scheduler, None
+        try:
+            self.refresh(start_date, end_date)
+        finally:
+            self.scheduler = scheduler
+
+    def _on_tab_change(self):
+        name = self._visible_tab()
+        if self._period is None or name not in self._dirty:
+            return
+        start_date, end_date = period = self._period
+
+        def render(tab_data):
+            # Descarta o resultado se o período mudou enquanto a aba carregava
+            if self._period == period:
+                self._render_tab(name, tab_data)
+
+        self._run((self, "aba"), lambda: self._load_tab(name, start_date, end_date), render)
+
+    def _visible_tab(self):
+        name = self.tab_view.get() if hasattr(self, "tab_view") else None
+        return name if name in self._tabs else None
+
+    def _load_tab(self, name, start_date, end_date):
+        if name is None:
+            return None
+        with recorder.measure("tela", f"{type(self).__name__}[{name}].load"):
+            return self._tabs[name][1](start_date, end_date)
+
+    def _render_tab(self, name, data):
+        if name is None:
+            return
+        tab, _, render = self._tabs[name]
+        with recorder.measure("render", f"{type(self).__name__}[{name}].render"):
+            render(tab, data)
+        self._dirty.discard(name)
+
+    def _run(self, key, load, render):
+        if self.scheduler is None:
+            render(load())
+            return
+        self.scheduler.submit(
+            key, load, render,
+            on_start=lambda: self.set_loading(True),
+            on_done=lambda: self.set_loading(self._is_loading()),
+        )
+
+    def _is_loading(self):
+        return self.scheduler.is_pending(self) or self.scheduler.is_pending((self, "aba"))
+
+    def set_loading(self, loading):
+        """Mostra ou esconde o aviso de carregamento no canto da tela."""
+        if loading:
+            self.loading_label.place(relx=1.0, rely=0.0, anchor="ne", x=-10, y=5)
+            self.loading_label.lift()
+        else:
+            self.loading_label.place_forget()
@@ -0,0 +1,92 @@
+# ui/chart_cache.py
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from config.settings import CHART_CACHE_MAX_MB
+
+
+def fingerprint(*values):
+    """Hash do conteúdo dos argumentos de um gráfico (Series, DataFrames, arrays, listas, textos...)."""
+    h = hashlib.blake2b(digest_size=16)
+    _feed(h, values)
+    return h.hexdigest()
+
+
+def _feed(h, value):
+    if isinstance(value, pd.DataFrame):
+        h.update(b"D")
+        _feed(h, value.columns)
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, (pd.Series, pd.Index)):
+        # Nos gráficos de barra/linha só os valores contam, não o índice da Series
+        h.update(b"S" + str(value.dtype).encode())
+        h.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(b"A" + str(value.dtype).encode() + str(value.shape).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(b"L%d" % len(value))
+        for item in value:
+            _feed(h, item)
+    elif isinstance(value, dict):
+        h.update(b"M%d" % len(value))
+        for key in sorted(value):
+            _feed(h, key)
+            _feed(h, value[key])
+    else:
+        h.update(b"V" + repr(value).encode())
+
+
+class BitmapCache:
+    """Cache LRU dos gráficos já desenhados, limitado por bytes; só usado na thread do Tk (sem lock)."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # chave -> (imagem, bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, image, size):
+        if size > self.max_bytes or key in self._entries:
+            return
+        self._entries[key] = (image, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        """Contadores do cache, para depuração e benchmarks."""
+        total = self.hits + self.misses
+        return {
+            "entradas": len(self._entries),
+            "bytes": self.bytes,
+            "limite_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "taxa_acerto": (self.hits / total) if total else 0.0,
+        }
+
+
+bitmap_cache = BitmapCache(int(CHART_CACHE_MAX_MB * 2**20))
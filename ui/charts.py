@@ -0,0 +1,266 @@
+# ui/charts.py
+
+import numpy as np
+
+from .chart_cache import bitmap_cache, fingerprint
+from utils.instrumentation import instrumented, recorder
+
+class ChartPanel:
+    """
+    Espaço de gráfico reaproveitado entre atualizações: Figure e canvas são
+    criados uma vez e cada atualização só troca os dados dos artistas. O eixo
+    só é refeito quando a estrutura muda. Sem `master`, o canvas é Agg (sem Tk).
+    """
+
+    def __init__(self, master=None, figsize=(10, 5), dpi=100):
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.ax = self.figure.add_subplot(111)
+        if master is None:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.canvas = FigureCanvasAgg(self.figure)
+            self.widget = None
+        else:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+            self.widget = self.canvas.get_tk_widget()
+        self._kind = None       # estrutura desenhada: ('bar', n), ('line', n), ('image', shape)...
+        self._artists = None
+        self._colorbar = None
+        self._labels = None
+
+    # --- Tipos de gráfico ---
+
+    @instrumented("grafico")
+    def bar(self, labels, values, color, title, ylabel, rotation=45):
+        values = np.asarray(values, dtype=float)
+        kind = ('bar', len(values))
+        relayout = self._kind != kind
+        if relayout:
+            self._reset(kind)
+            self._artists = self.ax.bar(np.arange(len(values)), values, color=color)
+            self._decorate(title, ylabel)
+        else:
+            for rect, value in zip(self._artists, values):
+                rect.set_height(value)
+                rect.set_facecolor(color)
+            self._decorate(title, ylabel)
+        relayout |= self._set_xlabels(labels, rotation)
+        self._rescale()
+        self._draw(relayout)
+
+    @instrumented("grafico")
+    def line(self, labels, values, color, title, ylabel, rotation=45, marker='o'):
+        values = np.asarray(values, dtype=float)
+        kind = ('line', len(values))
+        relayout = self._kind != kind
+        if relayout:
+            self._reset(kind)
+            self._artists, = self.ax.plot(np.arange(len(values)), values, marker=marker, color=color)
+            self._decorate(title, ylabel)
+        else:
+            self._artists.set_data(np.arange(len(values)), values)
+            self._artists.set_color(color)
+            self._decorate(title, ylabel)
+        relayout |= self._set_xlabels(labels, rotation)
+        self._rescale()
+        self._draw(relayout)
+
+    @instrumented("grafico")
+    def pie(self, values, labels, title, colors=None):
+        """Rosca (pie com círculo central). Fatias não têm como ser atualizadas no lugar: o eixo é refeito."""
+        from matplotlib.patches import Circle
+
+        labels = [str(label) for label in labels]
+        relayout = self._kind != ('pie', len(labels)) or self._labels != labels
+        self._reset(('pie', len(labels)))
+        _, texts, autotexts = self.ax.pie(
+            values, labels=labels, autopct='%1.1f%%', startangle=90, pctdistance=0.85, colors=colors
+        )
+        self.ax.add_artist(Circle((0, 0), 0.70, fc='white'))
+        self.ax.axis('equal')
+        self.ax.set_title(title, color='black')
+        for text in texts: text.set_color('black')
+        for autotext in autotexts: autotext.set_color('white')
+        self._labels = labels
+        self._draw(relayout)
+
+    @instrumented("grafico")
+    def image(self, data, title, xlabel, ylabel, cbar_label, cmap="viridis"):
+        """Mapa de calor de um DataFrame (linhas x colunas)."""
+        values = data.to_numpy(dtype=float)
+        kind = ('image', values.shape)
+        relayout = self._kind != kind
+        if relayout:
+            self._reset(kind)
+            self._artists = self.ax.imshow(values, cmap=cmap, aspect="auto")
+            self._colorbar = self.figure.colorbar(self._artists, ax=self.ax, label=cbar_label)
+            self.ax.set_xlabel(xlabel)
+            self.ax.set_ylabel(ylabel)
+            self.ax.set_title(title)
+        else:
+            self._artists.set_data(values)
+            self._artists.set_clim(np.nanmin(values), np.nanmax(values))
+            self.ax.set_title(title)
+        labels = (list(data.columns), list(data.index))
+        if labels != self._labels:
+            self.ax.set_xticks(range(values.shape[1]))
+            self.ax.set_xticklabels(data.columns)
+            self.ax.set_yticks(range(values.shape[0]))
+            self.ax.set_yticklabels(data.index)
+            self._labels = labels
+            relayout = True
+        self._draw(relayout)
+
+    @instrumented("grafico")
+    def message(self, text, **text_kwargs):
+        """Estado vazio: só um texto no centro do eixo."""
+        kind = ('message', text)
+        if self._kind != kind:
+            self._reset(kind)
+            self.ax.text(0.5, 0.5, text, ha='center', va='center', transform=self.ax.transAxes, **text_kwargs)
+            self._draw(True)
+
+    # --- Internos ---
+
+    def _reset(self, kind):
+        if self._colorbar is not None:
+            self._colorbar.remove()
+            self._colorbar = None
+        self.ax.clear()
+        self._kind = kind
+        self._artists = None
+        self._labels = None
+
+    def _decorate(self, title, ylabel):
+        self.ax.set_title(title, color='black')
+        self.ax.set_ylabel(ylabel, color='black')
+        self.ax.tick_params(axis='y', colors='black')
+
+    def _set_xlabels(self, labels, rotation):
+        """Atualiza os rótulos do eixo x; devolve True se mudaram."""
+        labels = [str(label) for label in labels]
+        if labels == self._labels:
+            return False
+        self.ax.set_xticks(np.arange(len(labels)))
+        self.ax.set_xticklabels(labels)
+        self.ax.tick_params(axis='x', colors='black', rotation=rotation)
+        self._labels = labels
+        return True
+
+    def _rescale(self):
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+    def resize(self, width, height):
+        """Muda o tamanho da figura (em pixels); o próximo gráfico refaz eixo e layout."""
+        dpi = self.figure.dpi
+        if tuple(np.round(self.figure.get_size_inches() * dpi)) != (width, height):
+            self.figure.set_size_inches(width / dpi, height / dpi, forward=False)
+            self._kind = None
+
+    def _draw(self, relayout):
+        if relayout:
+            self.figure.tight_layout()
+        self.canvas.draw_idle()
+
+
+class CachedChartPanel:
+    """
+    Mesma interface do ChartPanel, mas o gráfico é desenhado num canvas Agg e
+    mostrado como imagem num Label do Tk. Os bitmaps ficam no bitmap_cache,
+    chaveados por tipo, dados, opções e tamanho.
+    """
+
+    RESIZE_DELAY_MS = 100
+    MIN_SIZE = 50  # px; abaixo disso o widget ainda não foi posicionado
+
+    def __init__(self, master, figsize=(10, 5), dpi=100, cache=None):
+        import tkinter as tk
+
+        self.figsize = figsize
+        self.dpi = dpi
+        self.cache = cache if cache is not None else bitmap_cache
+        self.widget = tk.Label(master, bg="white", bd=0, highlightthickness=0, padx=0, pady=0)
+        self.widget.bind("<Configure>", self._on_configure)
+        self._panel = None        # ChartPanel Agg (criado no primeiro desenho fora do cache)
+        self._last = None         # (método, args, kwargs) do gráfico mostrado
+        self._size = None         # tamanho (px) do bitmap mostrado
+        self._resize_job = None
+
+    def bar(self, *args, **kwargs):
+        self._show("bar", args, kwargs)
+
+    def line(self, *args, **kwargs):
+        self._show("line", args, kwargs)
+
+    def pie(self, *args, **kwargs):
+        self._show("pie", args, kwargs)
+
+    def image(self, *args, **kwargs):
+        self._show("image", args, kwargs)
+
+    def message(self, *args, **kwargs):
+        self._show("message", args, kwargs)
+
+    # --- Internos ---
+
+    def _show(self, method, args, kwargs):
+        self._last = (method, args, kwargs)
+        size = self._widget_size()
+        with recorder.measure("grafico", f"CachedChartPanel.{method}"):
+            key = (method, fingerprint(args, kwargs), size, self.dpi)
+            photo = self.cache.get(key)
+            if photo is None:
+                photo = self._rasterize(method, args, kwargs, size)
+                self.cache.put(key, photo, size[0] * size[1] * 4)
+            self.widget.configure(image=photo)
+            self.widget.image = photo  # o Tk não guarda referência à imagem
+        self._size = size
+
+    def _rasterize(self, method, args, kwargs, size):
+        from PIL import Image, ImageTk
+
+        if self._panel is None:
+            self._panel = ChartPanel(figsize=self.figsize, dpi=self.dpi)
+        self._panel.resize(*size)
+        # Com canvas Agg o draw_idle() do ChartPanel já desenha
+        getattr(self._panel, method)(*args, **kwargs)
+        buffer = self._panel.canvas.buffer_rgba()
+        image = Image.frombuffer("RGBA", (buffer.shape[1], buffer.shape[0]), buffer, "raw", "RGBA", 0, 1)
+        return ImageTk.PhotoImage(image, master=self.widget)
+
+    def _widget_size(self):
+        width, height = self.widget.winfo_width(), self.widget.winfo_height()
+        if width < self.MIN_SIZE or height < self.MIN_SIZE:
+            # Ainda não posicionado: usa o tamanho pedido da figura
+            return (round(self.figsize[0] * self.dpi), round(self.figsize[1] * self.dpi))
+        return (width, height)
+
+    def _on_configure(self, event):
+        if self._last is None or min(event.width, event.height) < self.MIN_SIZE or (event.width, event.height) == self._size:
+            return
+        if self._resize_job is not None:
+            self.widget.after_cancel(self._resize_job)
+        self._resize_job = self.widget.after(self.RESIZE_DELAY_MS, self._on_resized)
+
+    def _on_resized(self):
+        self._resize_job = None
+        if self._last is not None and self._widget_size() != self._size:
+            self._show(*self._last)
+
+
+# --- Gráficos de mais de uma tela (mesmos argumentos, mesma entrada no bitmap_cache) ---
+
+def faturamento_mensal_chart(panel, df_faturamento):
+    panel.bar(
+        df_faturamento['mes'], df_faturamento['faturamento_mensal'], color='#1A3A7D',
+        title='Evolução do Faturamento no Período', ylabel='Valor (R$)'
+    )
+
+def popularidade_chart(panel, df_popularidade):
+    panel.bar(
+        df_popularidade['nome_instrumento'], df_popularidade['total_aulas_agendadas'], color='#1A3A7D',
+        title='Aulas por Instrumento no Período', ylabel='Nº de Aulas Agendadas'
+    )
@@ -1,17 +1,14 @@
 # ui/classes_view.py
 
 import customtkinter as ctk
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.patches as patches
 import pandas as pd
 
-class ClassesView(ctk.CTkFrame):
-    def __init__(self, master, analyzers, data_handler):
-        super().__init__(master, fg_color="transparent")
-        
-        self.analyzers = analyzers
-        self.data_handler = data_handler
+from .base_view import DashboardView
+from .charts import popularidade_chart
+
+class ClassesView(DashboardView):
+    def __init__(self, master, analyzers, data_handler, scheduler=None):
+        super().__init__(master, analyzers, data_handler, scheduler)
 
         title_label = ctk.CTkLabel(self, text="Dashboard de Aulas", font=ctk.CTkFont(size=28, weight="bold"))
         title_label.pack(anchor="w", pady=(0, 20), padx=10)
@@ -20,97 +17,64 @@ class ClassesView(ctk.CTkFrame):
         self.kpi_container.pack(fill="x", padx=10, pady=10)
         self.kpi_container.grid_columnconfigure((0, 1, 2), weight=1)
 
-        self.tab_view = ctk.CTkTabview(self, height=500, fg_color="#F5F5F5")
+        self.create_tab_view(height=500, fg_color="#F5F5F5")
         self.tab_view.pack(fill="both", expand=True, padx=10, pady=20)
         
-        self.tab_status = self.tab_view.add("Distribuição por Status")
-        self.tab_popularidade = self.tab_view.add("Aulas por Instrumento")
-        self.tab_pico = self.tab_view.add("Horários de Pico")
+        self.tab_status = self.add_tab("Distribuição por Status", self.load_status, self.create_status_chart)
+        self.tab_popularidade = self.add_tab("Aulas por Instrumento", self.load_popularidade, self.create_popularity_chart)
+        self.tab_pico = self.add_tab("Horários de Pico", self.load_heatmap, self.create_heatmap_chart)
+
+    def load_data(self, start_date, end_date):
+        """Roda fora da thread do Tk: só consultas às análises."""
+        # A aba de status sai do mesmo groupby do cubo de aulas que os KPIs
+        kpis = self.analyzers["kpis"].compute(
+            (start_date, end_date), ["total_aulas", "aulas_concluidas", "taxa_conclusao", "aulas_por_status"]
+        )
+        return {
+            "total_aulas": kpis["total_aulas"],
+            "concluidas": kpis["aulas_concluidas"],
+            "taxa_conclusao": kpis["taxa_conclusao"],
+        }
 
-    def update_view(self, start_date, end_date):
-        """Atualiza todos os componentes da tela com base no período."""
+    def render(self, data):
+        """Atualiza os KPIs da tela com os dados do período."""
         for widget in self.kpi_container.winfo_children():
             widget.destroy()
 
-        # --- CORREÇÃO APLICADA AQUI ---
-        # Agora passamos o start_date e end_date para a função de análise
-        df_status = self.analyzers["aulas"].get_total_aulas_por_status(start_date, end_date)
-        heatmap_data = self.analyzers["aulas"].get_peak_hours_data(start_date, end_date)
-        
-        total_aulas = df_status['total_aulas'].sum()
-        concluidas_series = df_status.query("status == 'Concluída'")['total_aulas']
-        concluidas = concluidas_series.iloc[0] if not concluidas_series.empty else 0
-        taxa_conclusao = (concluidas / total_aulas) * 100 if total_aulas > 0 else 0
-
         kpi_font = ctk.CTkFont(size=20)
-        ctk.CTkLabel(self.kpi_container, text=f"Total de Aulas no Período\n{total_aulas}", font=kpi_font).grid(row=0, column=0, padx=10, sticky="ew")
-        ctk.CTkLabel(self.kpi_container, text=f"Aulas Concluídas\n{concluidas}", font=kpi_font).grid(row=0, column=1, padx=10, sticky="ew")
-        ctk.CTkLabel(self.kpi_container, text=f"Taxa de Conclusão\n{taxa_conclusao:.1f}%", font=kpi_font).grid(row=0, column=2, padx=10, sticky="ew")
-        
-        self.update_tabs_content(start_date, end_date, df_status, heatmap_data)
+        ctk.CTkLabel(self.kpi_container, text=f"Total de Aulas no Período\n{data['total_aulas']}", font=kpi_font).grid(row=0, column=0, padx=10, sticky="ew")
+        ctk.CTkLabel(self.kpi_container, text=f"Aulas Concluídas\n{data['concluidas']}", font=kpi_font).grid(row=0, column=1, padx=10, sticky="ew")
+        ctk.CTkLabel(self.kpi_container, text=f"Taxa de Conclusão\n{data['taxa_conclusao']:.1f}%", font=kpi_font).grid(row=0, column=2, padx=10, sticky="ew")
 
-    def update_tabs_content(self, start_date, end_date, df_status, heatmap_data):
-        for tab in [self.tab_status, self.tab_popularidade, self.tab_pico]:
-            for widget in tab.winfo_children():
-                widget.destroy()
-        
-        self.create_status_chart(self.tab_status, df_status)
-        # Passando as datas para a popularidade também
-        df_popularidade = self.analyzers["aulas"].get_popularidade_instrumentos(start_date, end_date)
-        self.create_popularity_chart(self.tab_popularidade, df_popularidade)
-        self.create_heatmap_chart(self.tab_pico, heatmap_data)
+    # --- Carga das abas (fora da thread do Tk) ---
+
+    def load_status(self, start_date, end_date):
+        return self.analyzers["kpis"].compute((start_date, end_date), ["aulas_por_status"])["aulas_por_status"]
+
+    def load_popularidade(self, start_date, end_date):
+        return self.analyzers["kpis"].compute((start_date, end_date), ["popularidade_instrumentos"])["popularidade_instrumentos"]
+
+    def load_heatmap(self, start_date, end_date):
+        return self.analyzers["kpis"].compute((start_date, end_date), ["horarios_pico"])["horarios_pico"]
 
     def create_status_chart(self, tab, df_status):
-        fig = Figure(figsize=(5, 5), dpi=100)
-        ax = fig.add_subplot(111)
-        
+        chart = self.chart_panel("status", tab, figsize=(5, 5))
         if not df_status.empty:
             colors = ['#2E7D32', '#F47A20', '#1A3A7D']
-            wedges, texts, autotexts = ax.pie(
-                df_status['total_aulas'], labels=df_status['status'], autopct='%1.1f%%',
-                startangle=90, pctdistance=0.85, colors=colors
-            )
-            centre_circle = patches.Circle((0, 0), 0.70, fc='white')
-            ax.add_artist(centre_circle)
-            ax.axis('equal')
-            ax.set_title('Distribuição de Status no Período', color='black')
-            for text in texts: text.set_color('black')
-            for autotext in autotexts: autotext.set_color('white')
-        
-        canvas = FigureCanvasTkAgg(fig, master=tab)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+            chart.pie(df_status['total_aulas'], df_status['status'], 'Distribuição de Status no Período', colors=colors)
+        else:
+            chart.message('Nenhuma aula no período selecionado', color='gray')
 
     def create_popularity_chart(self, tab, df_popularidade):
-        fig = Figure(figsize=(10, 5), dpi=100)
-        ax = fig.add_subplot(111)
-        ax.bar(df_popularidade['nome_instrumento'], df_popularidade['total_aulas_agendadas'], color='#1A3A7D')
-        ax.set_title('Popularidade dos Instrumentos no Período', color='black')
-        ax.set_ylabel('Nº de Aulas Agendadas', color='black')
-        ax.tick_params(axis='x', colors='black', rotation=45)
-        ax.tick_params(axis='y', colors='black')
-        fig.tight_layout()
-        canvas = FigureCanvasTkAgg(fig, master=tab)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        popularidade_chart(self.chart_panel("popularidade", tab), df_popularidade)
 
     def create_heatmap_chart(self, tab, data):
-        fig = Figure(figsize=(10, 6), dpi=100)
-        ax = fig.add_subplot(111)
-
+        chart = self.chart_panel("pico", tab, figsize=(10, 6))
         if not data.empty:
-            im = ax.imshow(data, cmap="viridis", aspect="auto")
-            fig.colorbar(im, ax=ax, label="Nº de Aulas")
-            ax.set_xticks(range(len(data.columns)))
-            ax.set_xticklabels(data.columns.astype(int))
-            ax.set_yticks(range(len(data.index)))
-            ax.set_yticklabels(data.index)
-            ax.set_xlabel("Hora do Dia")
-            ax.set_ylabel("Dia da Semana")
-            ax.set_title("Concentração de Aulas por Dia e Hora")
+            data = data.set_axis(data.columns.astype(int), axis=1)
+            chart.image(
+                data, title="Concentração de Aulas por Dia e Hora",
+                xlabel="Hora do Dia", ylabel="Dia da Semana", cbar_label="Nº de Aulas"
+            )
         else:
-            ax.text(0.5, 0.5, 'Nenhuma aula no período selecionado', ha='center', va='center', transform=ax.transAxes, color='gray')
-
-        canvas = FigureCanvasTkAgg(fig, master=tab)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
\ No newline at end of file
+            chart.message('Nenhuma aula no período selecionado', color='gray')
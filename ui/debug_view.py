@@ -0,0 +1,78 @@
+# ui/debug_view.py
+
+from tkinter import filedialog
+
+import customtkinter as ctk
+import pandas as pd
+
+from .chart_cache import bitmap_cache
+from .virtual_table import VirtualTable
+from utils.instrumentation import recorder
+
+def _ms(series):
+    return series.map("{:.2f}".format)
+
+def _kb(series):
+    return series.map(lambda v: "" if pd.isna(v) else f"{v:,.0f}")
+
+class DebugView(ctk.CTkFrame):
+    """Painel "Desempenho" (DEBUG_PANEL=1): resumo das medidas do recorder, exportável em JSON/CSV."""
+
+    COLUMNS = ['categoria', 'nome', 'chamadas', 'total_ms', 'media_ms', 'max_ms', 'linhas', 'alocado_kb']
+
+    def __init__(self, master, analyzers, data_handler, scheduler=None):
+        super().__init__(master, fg_color="transparent")
+
+        title_label = ctk.CTkLabel(self, text="Desempenho", font=ctk.CTkFont(size=28, weight="bold"))
+        title_label.pack(anchor="w", pady=(0, 20), padx=10)
+
+        toolbar = ctk.CTkFrame(self, fg_color="transparent")
+        toolbar.pack(fill="x", padx=10, pady=(0, 10))
+        self.enabled_switch = ctk.CTkSwitch(toolbar, text="Gravar medidas", command=self.toggle_recording)
+        self.enabled_switch.pack(side="left", padx=(0, 20))
+        if recorder.enabled:
+            self.enabled_switch.select()
+        for text, command in (
+            ("Atualizar", self.update_summary), ("Limpar", self.clear),
+            ("Exportar JSON", lambda: self.export(".json")), ("Exportar CSV", lambda: self.export(".csv")),
+        ):
+            ctk.CTkButton(toolbar, text=text, width=120, command=command).pack(side="left", padx=5)
+        self.info_label = ctk.CTkLabel(toolbar, text="")
+        self.info_label.pack(side="right", padx=5)
+
+        self.summary_table = VirtualTable(
+            self, columns=self.COLUMNS,
+            formatters={'total_ms': _ms, 'media_ms': _ms, 'max_ms': _ms, 'alocado_kb': _kb},
+        )
+        self.summary_table.pack(fill="both", expand=True, padx=10, pady=10)
+
+    def refresh(self, start_date, end_date):
+        """O período não se aplica: só relê o buffer."""
+        self.update_summary()
+
+    def update_summary(self):
+        summary = pd.DataFrame(recorder.summary(), columns=self.COLUMNS)
+        self.summary_table.set_data(summary)
+        estado = "gravando" if recorder.enabled else "desligada"
+        graficos = bitmap_cache.stats()
+        self.info_label.configure(text=(
+            f"{len(recorder.snapshot())} medidas ({estado}) · gráficos em cache: {graficos['entradas']} "
+            f"({graficos['bytes'] / 2**20:.1f} MB, acertos {graficos['taxa_acerto']:.0%})"
+        ))
+
+    def toggle_recording(self):
+        recorder.set_enabled(bool(self.enabled_switch.get()))
+        self.update_summary()
+
+    def clear(self):
+        recorder.clear()
+        self.update_summary()
+
+    def export(self, extension):
+        path = filedialog.asksaveasfilename(
+            defaultextension=extension, initialfile=f"desempenho{extension}",
+            filetypes=[("JSON", "*.json"), ("CSV", "*.csv")],
+        )
+        if path:
+            recorder.dump(path)
+            self.info_label.configure(text=f"Exportado: {path}")
@@ -1,15 +1,15 @@
 # ui/finance_view.py
 import customtkinter as ctk
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from tkinter import ttk
 
-class FinanceView(ctk.CTkFrame):
-    def __init__(self, master, analyzers, data_handler):
-        super().__init__(master, fg_color="transparent")
-        self.analyzers = analyzers
-        self.data_handler = data_handler
-        
+from .base_view import DashboardView
+from .charts import faturamento_mensal_chart
+from .virtual_table import VirtualTable
+from utils.formatters import display_status_series, format_currency, format_currency_series, format_date_series
+
+class FinanceView(DashboardView):
+    def __init__(self, master, analyzers, data_handler, scheduler=None):
+        super().__init__(master, analyzers, data_handler, scheduler)
+
         title_label = ctk.CTkLabel(self, text="Dashboard Financeiro", font=ctk.CTkFont(size=28, weight="bold"))
         title_label.pack(anchor="w", pady=(0, 20), padx=10)
 
@@ -17,60 +17,62 @@ class FinanceView(ctk.CTkFrame):
         self.kpi_container.pack(fill="x", padx=10, pady=10)
         self.kpi_container.grid_columnconfigure((0, 1, 2), weight=1)
 
-        self.tab_view = ctk.CTkTabview(self, height=500, fg_color="#F5F5F5")
+        self.create_tab_view(height=500, fg_color="#F5F5F5")
         self.tab_view.pack(fill="both", expand=True, padx=10, pady=20)
         
-        self.tab_evolucao = self.tab_view.add("Evolução Mensal")
-        self.tab_por_instrumento = self.tab_view.add("Faturamento por Instrumento")
-        self.tab_extrato = self.tab_view.add("Extrato Detalhado")
+        self.tab_evolucao = self.add_tab("Evolução Mensal", self.load_evolucao, self.create_evolution_chart)
+        self.tab_por_instrumento = self.add_tab("Faturamento por Instrumento", self.load_por_instrumento, self.create_instrument_chart)
+        self.tab_extrato = self.add_tab("Extrato Detalhado", self.load_extrato, self.create_statement_table)
+        self.statement_table = VirtualTable(
+            self.tab_extrato, columns=['id', 'aluno_id', 'data_pagamento', 'valor_pago', 'metodo_pagamento', 'status'],
+            formatters={
+                'data_pagamento': format_date_series,
+                'valor_pago': format_currency_series,
+                'status': display_status_series,
+            }
+        )
+        self.statement_table.pack(fill="both", expand=True)
 
-    def update_view(self, start_date, end_date):
+    def load_data(self, start_date, end_date):
+        """Roda fora da thread do Tk: só consultas às análises."""
+        # Os três KPIs saem de um único recorte do cubo de pagamentos
+        kpis = self.analyzers["kpis"].compute((start_date, end_date), ["faturamento_total", "aulas_pagas", "ticket_medio"])
+        return {
+            "receita_total": kpis["faturamento_total"],
+            "aulas_pagas": kpis["aulas_pagas"],
+            "ticket_medio": kpis["ticket_medio"],
+        }
+
+    def render(self, data):
         for widget in self.kpi_container.winfo_children(): widget.destroy()
 
-        df_faturamento = self.analyzers["financeiro"].get_faturamento_total_por_mes(start_date, end_date)
-        receita_total = df_faturamento['faturamento_mensal'].sum()
-        
-        pagamentos_periodo = self.analyzers["financeiro"]._filter_pagamentos_by_date(start_date, end_date)
-        aulas_pagas = len(pagamentos_periodo)
-        ticket_medio = (receita_total / aulas_pagas) if aulas_pagas > 0 else 0
+        ctk.CTkLabel(self.kpi_container, text=f"Receita no Período\n{format_currency(data['receita_total'])}", font=ctk.CTkFont(size=20)).grid(row=0, column=0, padx=10, sticky="ew")
+        ctk.CTkLabel(self.kpi_container, text=f"Aulas Pagas no Período\n{data['aulas_pagas']}", font=ctk.CTkFont(size=20)).grid(row=0, column=1, padx=10, sticky="ew")
+        ctk.CTkLabel(self.kpi_container, text=f"Ticket Médio\n{format_currency(data['ticket_medio'])}", font=ctk.CTkFont(size=20)).grid(row=0, column=2, padx=10, sticky="ew")
 
-        ctk.CTkLabel(self.kpi_container, text=f"Receita no Período\nR$ {receita_total:,.2f}", font=ctk.CTkFont(size=20)).grid(row=0, column=0, padx=10, sticky="ew")
-        ctk.CTkLabel(self.kpi_container, text=f"Aulas Pagas no Período\n{aulas_pagas}", font=ctk.CTkFont(size=20)).grid(row=0, column=1, padx=10, sticky="ew")
-        ctk.CTkLabel(self.kpi_container, text=f"Ticket Médio\nR$ {ticket_medio:,.2f}", font=ctk.CTkFont(size=20)).grid(row=0, column=2, padx=10, sticky="ew")
+    # --- Abas (calculadas só quando ficam visíveis) ---
 
-        self.update_tabs_content(start_date, end_date, df_faturamento, pagamentos_periodo)
+    def load_evolucao(self, start_date, end_date):
+        return self.analyzers["kpis"].compute((start_date, end_date), ["faturamento_por_mes"])["faturamento_por_mes"]
 
-    def update_tabs_content(self, start_date, end_date, df_faturamento, pagamentos_periodo):
-        for tab in [self.tab_evolucao, self.tab_por_instrumento, self.tab_extrato]:
-            for widget in tab.winfo_children(): widget.destroy()
-        
+    def load_por_instrumento(self, start_date, end_date):
+        return self.analyzers["kpis"].compute((start_date, end_date), ["faturamento_por_instrumento"])["faturamento_por_instrumento"]
+
+    def load_extrato(self, start_date, end_date):
+        # Sem formatar: a tabela só formata as linhas que estiverem na tela
+        return self.analyzers["financeiro"]._filter_pagamentos_by_date(start_date, end_date)[self.statement_table.columns]
+
+    def create_evolution_chart(self, tab, df_faturamento):
         # Gráfico 1: Evolução Mensal
-        fig1 = Figure(figsize=(10, 5), dpi=100)
-        ax1 = fig1.add_subplot(111)
-        ax1.bar(df_faturamento['mes'], df_faturamento['faturamento_mensal'], color='#4a0072')
-        ax1.set_title('Evolução do Faturamento no Período', color='black')
-        ax1.set_ylabel('Valor (R$)', color='black')
-        fig1.tight_layout()
-        canvas1 = FigureCanvasTkAgg(fig1, master=self.tab_evolucao)
-        canvas1.draw()
-        canvas1.get_tk_widget().pack(fill="both", expand=True)
+        faturamento_mensal_chart(self.chart_panel("evolucao", tab), df_faturamento)
 
+    def create_instrument_chart(self, tab, df_instr):
         # Gráfico 2: Faturamento por Instrumento
-        df_instr = self.analyzers["financeiro"].get_faturamento_por_instrumento(start_date, end_date)
-        fig2 = Figure(figsize=(10, 5), dpi=100)
-        ax2 = fig2.add_subplot(111)
-        ax2.bar(df_instr['nome_instrumento'], df_instr['faturamento_instrumento'], color='#00a152')
-        ax2.set_title('Faturamento por Instrumento no Período', color='black')
-        ax2.set_ylabel('Valor (R$)', color='black')
-        fig2.tight_layout()
-        canvas2 = FigureCanvasTkAgg(fig2, master=self.tab_por_instrumento)
-        canvas2.draw()
-        canvas2.get_tk_widget().pack(fill="both", expand=True)
-        
+        self.chart_panel("por_instrumento", tab).bar(
+            df_instr['nome_instrumento'], df_instr['faturamento_instrumento'], color='#00a152',
+            title='Faturamento por Instrumento no Período', ylabel='Valor (R$)', rotation=0
+        )
+
+    def create_statement_table(self, tab, pagamentos_periodo):
         # Tabela 3: Extrato
-        cols = ['id', 'aluno_id', 'data_pagamento', 'valor_pago', 'metodo_pagamento', 'status']
-        tree = ttk.Treeview(self.tab_extrato, columns=cols, show='headings')
-        for col in cols: tree.heading(col, text=col.capitalize())
-        pagamentos_periodo['data_pagamento'] = pagamentos_periodo['data_pagamento'].dt.strftime('%Y-%m-%d')
-        for _, row in pagamentos_periodo.iterrows(): tree.insert("", "end", values=list(row[cols]))
-        tree.pack(fill="both", expand=True)
\ No newline at end of file
+        self.statement_table.set_data(pagamentos_periodo)
@@ -1,7 +1,9 @@
 # ui/overview_view.py
 import customtkinter as ctk
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from .base_view import DashboardView
+from .charts import faturamento_mensal_chart, popularidade_chart
+from utils.formatters import format_currency
 
 def create_kpi_card(master, title, value, icon):
     # ... (código existente)
@@ -14,12 +16,10 @@ def create_kpi_card(master, title, value, icon):
     card_value.pack(pady=(0, 10))
     return card
 
-class OverviewView(ctk.CTkFrame):
-    def __init__(self, master, analyzers, data_handler):
-        super().__init__(master, fg_color="transparent")
-        self.analyzers = analyzers
-        self.data_handler = data_handler
-        
+class OverviewView(DashboardView):
+    def __init__(self, master, analyzers, data_handler, scheduler=None):
+        super().__init__(master, analyzers, data_handler, scheduler)
+
         title_label = ctk.CTkLabel(self, text="Visão Geral do Negócio", font=ctk.CTkFont(size=28, weight="bold"))
         title_label.pack(anchor="w", pady=(0, 20), padx=10)
 
@@ -27,54 +27,40 @@ class OverviewView(ctk.CTkFrame):
         self.kpi_container.pack(fill="x", padx=10, pady=10)
         self.kpi_container.grid_columnconfigure((0, 1, 2), weight=1)
 
-        self.tab_view = ctk.CTkTabview(self, height=500, fg_color="#F5F5F5")
+        self.create_tab_view(height=500, fg_color="#F5F5F5")
         self.tab_view.pack(fill="both", expand=True, padx=10, pady=20)
         
-        self.tab_faturamento = self.tab_view.add("Evolução Mensal")
-        self.tab_instrumentos = self.tab_view.add("Popularidade de Instrumentos")
+        self.tab_faturamento = self.add_tab("Evolução Mensal", self.load_faturamento, self.create_faturamento_chart)
+        self.tab_instrumentos = self.add_tab("Popularidade de Instrumentos", self.load_popularidade, self.create_popularity_chart)
 
-    def update_view(self, start_date, end_date):
+    def load_data(self, start_date, end_date):
+        """Roda fora da thread do Tk: só consultas às análises."""
+        kpis = self.analyzers["kpis"].compute((start_date, end_date), ["alunos_ativos", "faturamento_total", "aulas_concluidas"])
+        return {
+            "total_ativos": kpis["alunos_ativos"],
+            "faturamento_periodo": kpis["faturamento_total"],
+            "aulas_concluidas": kpis["aulas_concluidas"],
+        }
+
+    def render(self, data):
         for widget in self.kpi_container.winfo_children(): widget.destroy()
 
-        total_ativos = self.analyzers["alunos"].get_total_alunos(status='Ativo')
-        df_faturamento = self.analyzers["financeiro"].get_faturamento_total_por_mes(start_date, end_date)
-        faturamento_periodo = df_faturamento['faturamento_mensal'].sum()
-        df_aulas = self.analyzers["aulas"].get_total_aulas_por_status(start_date, end_date)
-        aulas_concluidas = df_aulas.query("status == 'Concluída'")['total_aulas'].sum()
+        create_kpi_card(self.kpi_container, "Total de Alunos Ativos", str(data["total_ativos"]), "👥").grid(row=0, column=0, padx=10, pady=10, sticky="ew")
+        create_kpi_card(self.kpi_container, "Faturamento no Período", format_currency(data['faturamento_periodo']), "💰").grid(row=0, column=1, padx=10, pady=10, sticky="ew")
+        create_kpi_card(self.kpi_container, "Aulas Concluídas no Período", str(data["aulas_concluidas"]), "🎶").grid(row=0, column=2, padx=10, pady=10, sticky="ew")
 
-        create_kpi_card(self.kpi_container, "Total de Alunos Ativos", str(total_ativos), "👥").grid(row=0, column=0, padx=10, pady=10, sticky="ew")
-        create_kpi_card(self.kpi_container, "Faturamento no Período", f"R$ {faturamento_periodo:,.2f}", "💰").grid(row=0, column=1, padx=10, pady=10, sticky="ew")
-        create_kpi_card(self.kpi_container, "Aulas Concluídas no Período", str(aulas_concluidas), "🎶").grid(row=0, column=2, padx=10, pady=10, sticky="ew")
+    # --- Abas (calculadas só quando ficam visíveis) ---
 
-        self.update_tabs_content(start_date, end_date, df_faturamento)
+    def load_faturamento(self, start_date, end_date):
+        return self.analyzers["kpis"].compute((start_date, end_date), ["faturamento_por_mes"])["faturamento_por_mes"]
 
-    def update_tabs_content(self, start_date, end_date, df_faturamento):
-        for tab in [self.tab_faturamento, self.tab_instrumentos]:
-            for widget in tab.winfo_children(): widget.destroy()
-        
+    def load_popularidade(self, start_date, end_date):
+        return self.analyzers["kpis"].compute((start_date, end_date), ["popularidade_instrumentos"])["popularidade_instrumentos"]
+
+    def create_faturamento_chart(self, tab, df_faturamento):
         # Gráfico 1: Faturamento Mensal
-        fig1 = Figure(figsize=(10, 5), dpi=100)
-        ax1 = fig1.add_subplot(111)
-        ax1.bar(df_faturamento['mes'], df_faturamento['faturamento_mensal'], color='#1A3A7D')
-        ax1.set_title('Evolução do Faturamento no Período', color='black')
-        ax1.set_ylabel('Valor (R$)', color='black')
-        ax1.tick_params(axis='x', colors='black', rotation=45)
-        ax1.tick_params(axis='y', colors='black')
-        fig1.tight_layout()
-        canvas1 = FigureCanvasTkAgg(fig1, master=self.tab_faturamento)
-        canvas1.draw()
-        canvas1.get_tk_widget().pack(fill="both", expand=True)
+        faturamento_mensal_chart(self.chart_panel("faturamento", tab), df_faturamento)
 
+    def create_popularity_chart(self, tab, popularidade_df):
         # Gráfico 2: Popularidade
-        popularidade_df = self.analyzers["aulas"].get_popularidade_instrumentos(start_date, end_date)
-        fig2 = Figure(figsize=(10, 5), dpi=100)
-        ax2 = fig2.add_subplot(111)
-        ax2.bar(popularidade_df['nome_instrumento'], popularidade_df['total_aulas_agendadas'], color='#2E7D32')
-        ax2.set_title('Aulas por Instrumento no Período', color='black')
-        ax2.set_ylabel('Nº de Aulas Agendadas', color='black')
-        ax2.tick_params(axis='x', colors='black', rotation=45)
-        ax2.tick_params(axis='y', colors='black')
-        fig2.tight_layout()
-        canvas2 = FigureCanvasTkAgg(fig2, master=self.tab_instrumentos)
-        canvas2.draw()
-        canvas2.get_tk_widget().pack(fill="both", expand=True)
\ No newline at end of file
+        popularidade_chart(self.chart_panel("popularidade", tab), popularidade_df)
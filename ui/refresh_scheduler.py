@@ -0,0 +1,68 @@
+# ui/refresh_scheduler.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+class RefreshScheduler:
+    """
+    Executa as análises das telas em um pool de threads; a thread do Tk
+    verifica o future com after() e chama render(). Um novo pedido da mesma
+    chave cancela o anterior, e o resultado obsoleto é descartado.
+    """
+
+    def __init__(self, root, max_workers=2, poll_ms=30):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="atualizacao-tela")
+        self._current = {}  # chave -> (geração, future)
+        self._generation = 0
+
+    def submit(self, key, load, render, on_start=None, on_done=None, on_error=None):
+        """Agenda load() no pool e, quando terminar, render(resultado) na thread do Tk."""
+        self.cancel(key)
+        self._generation += 1
+        generation = self._generation
+        future = self.executor.submit(load)
+        self._current[key] = (generation, future)
+        if on_start:
+            on_start()
+        self.root.after(self.poll_ms, self._poll, key, generation, future, render, on_done, on_error)
+        return future
+
+    def cancel(self, key):
+        """Cancela a atualização pendente da chave, se houver."""
+        pendente = self._current.pop(key, None)
+        if pendente is not None:
+            # Se já estiver rodando, não há como interromper: o resultado será ignorado
+            pendente[1].cancel()
+
+    def is_pending(self, key):
+        return key in self._current
+
+    def _poll(self, key, generation, future, render, on_done, on_error):
+        atual = self._current.get(key)
+        if atual is None or atual[0] != generation:
+            return  # pedido obsoleto: outro já o substituiu
+        if not future.done():
+            self.root.after(self.poll_ms, self._poll, key, generation, future, render, on_done, on_error)
+            return
+
+        del self._current[key]
+        try:
+            resultado = future.result()
+        except Exception as e:
+            if on_done:
+                on_done()
+            if on_error:
+                on_error(e)
+            else:
+                print(f"❌ Erro ao atualizar a tela '{key}': {e}")
+            return
+        try:
+            render(resultado)
+        finally:
+            if on_done:
+                on_done()
+
+    def shutdown(self):
+        self._current.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,179 @@
+# ui/virtual_table.py
+
+import tkinter as tk
+from tkinter import ttk
+
+import customtkinter as ctk
+import numpy as np
+import pandas as pd
+
+class VirtualTable(ctk.CTkFrame):
+    """
+    Tabela virtualizada sobre um DataFrame: o Treeview tem só as linhas que
+    cabem na tela, e `formatters` (coluna -> função sobre a Series) só é
+    aplicado ao bloco visível. Busca e ordenação geram um vetor de posições.
+    """
+
+    def __init__(self, master, columns, formatters=None, buffer=100, searchable=True):
+        super().__init__(master, fg_color="transparent")
+        self.columns = list(columns)
+        self.formatters = formatters or {}
+        self.buffer = buffer
+
+        self._data = pd.DataFrame(columns=self.columns)
+        self._positions = np.arange(0)   # linhas visíveis (após busca/ordenação), em ordem de exibição
+        self._sort = None                # (coluna, crescente)
+        self._query = ""
+        self._first = 0                  # posição (em _positions) da primeira linha mostrada
+        self._visible = 20               # nº de linhas que cabem no Treeview
+        self._block = (0, [])            # (início, linhas já formatadas) do bloco em memória
+
+        if searchable:
+            search_bar = ctk.CTkFrame(self, fg_color="transparent")
+            search_bar.pack(fill="x", pady=(0, 5))
+            ctk.CTkLabel(search_bar, text="Buscar:").pack(side="left", padx=(0, 5))
+            self.search_var = tk.StringVar()
+            self.search_var.trace_add("write", lambda *_: self.set_filter(self.search_var.get()))
+            ctk.CTkEntry(search_bar, textvariable=self.search_var, width=250).pack(side="left")
+            self.count_label = ctk.CTkLabel(search_bar, text="")
+            self.count_label.pack(side="right", padx=5)
+        else:
+            self.count_label = None
+
+        body = ctk.CTkFrame(self, fg_color="transparent")
+        body.pack(fill="both", expand=True)
+        body.grid_rowconfigure(0, weight=1)
+        body.grid_columnconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(body, columns=self.columns, show='headings', selectmode="browse")
+        for col in self.columns:
+            self.tree.heading(col, text=col.capitalize(), command=lambda c=col: self.sort_by(c))
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ttk.Scrollbar(body, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", self._on_wheel)
+        self.tree.bind("<Button-5>", self._on_wheel)
+
+    # --- API ---
+
+    def set_data(self, df):
+        """Troca o DataFrame exibido, mantendo busca e ordenação atuais."""
+        self._data = df.reset_index(drop=True)
+        self._recompute()
+
+    def sort_by(self, column, ascending=None):
+        """Ordena pela coluna; sem `ascending`, alterna a cada chamada."""
+        if ascending is None:
+            ascending = not (self._sort is not None and self._sort == (column, True))
+        self._sort = (column, ascending)
+        for col in self.columns:
+            arrow = (" ▲" if ascending else " ▼") if col == column else ""
+            self.tree.heading(col, text=col.capitalize() + arrow)
+        self._recompute()
+
+    def set_filter(self, text):
+        """Mantém só as linhas em que alguma coluna de texto contém `text` (sem diferenciar maiúsculas)."""
+        self._query = text.strip()
+        self._recompute()
+
+    def __len__(self):
+        return len(self._positions)
+
+    # --- Busca e ordenação no DataFrame ---
+
+    def _recompute(self):
+        data = self._data
+        positions = np.arange(len(data))
+        if self._query and len(data):
+            mask = np.zeros(len(data), dtype=bool)
+            for col in self.columns:
+                serie = data[col]
+                if serie.dtype == object or isinstance(serie.dtype, pd.CategoricalDtype):
+                    mask |= serie.astype(str).str.contains(self._query, case=False, regex=False).to_numpy()
+            positions = np.flatnonzero(mask)
+        if self._sort is not None and len(positions):
+            column, ascending = self._sort
+            valores = data[column].take(positions)
+            if isinstance(valores.dtype, pd.CategoricalDtype):
+                valores = valores.astype(object)
+            ordem = valores.reset_index(drop=True).sort_values(
+                ascending=ascending, kind="stable", na_position="last"
+            ).index.to_numpy()
+            positions = positions[ordem]
+        self._positions = positions
+        self._block = (0, [])
+        if self.count_label is not None:
+            self.count_label.configure(text=f"{len(positions):,} de {len(data):,} linhas".replace(",", "."))
+        self._scroll_to(0, force=True)
+
+    # --- Janela visível ---
+
+    def _rows(self, start, stop):
+        """Linhas formatadas [start, stop) de _positions, buscando um bloco novo se preciso."""
+        block_start, block = self._block
+        if start < block_start or stop > block_start + len(block):
+            block_start = max(0, start - self.buffer)
+            block_stop = min(len(self._positions), stop + self.buffer)
+            frame = self._data.take(self._positions[block_start:block_stop])[self.columns]
+            for col, formatter in self.formatters.items():
+                if col in frame:
+                    frame[col] = formatter(frame[col])
+            frame = frame.astype(object)
+            block = frame.where(frame.notna(), "").to_numpy().tolist()
+            self._block = (block_start, block)
+        return block[start - block_start:stop - block_start]
+
+    def _scroll_to(self, first, force=False):
+        total = len(self._positions)
+        first = max(0, min(first, total - self._visible))
+        if first == self._first and not force:
+            return
+        self._first = first
+        self._render()
+
+    def _render(self):
+        rows = self._rows(self._first, self._first + self._visible)
+        items = list(self.tree.get_children())
+        for _ in range(len(rows) - len(items)):
+            items.append(self.tree.insert("", "end"))
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+            items = items[:len(rows)]
+        for iid, row in zip(items, rows):
+            self.tree.item(iid, values=row)
+        self.tree.selection_remove(self.tree.selection())
+        total = len(self._positions)
+        if total:
+            self.scrollbar.set(self._first / total, (self._first + len(rows)) / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # --- Eventos ---
+
+    def _on_resize(self, event):
+        items = self.tree.get_children()
+        bbox = self.tree.bbox(items[0]) if items else None
+        if bbox:
+            header, row_height = bbox[1], bbox[3]
+        else:
+            header, row_height = 25, int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        visible = max(1, (event.height - header) // max(1, row_height))
+        if visible != self._visible:
+            self._visible = visible
+            self._scroll_to(self._first, force=True)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            first = int(float(value) * len(self._positions))
+        else:
+            step = int(value) * (self._visible if unit == "pages" else 1)
+            first = self._first + step
+        self._scroll_to(first)
+
+    def _on_wheel(self, event):
+        direction = -1 if (event.num == 4 or getattr(event, "delta", 0) > 0) else 1
+        self._scroll_to(self._first + 3 * direction)
+        return "break"
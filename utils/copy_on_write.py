@@ -0,0 +1,11 @@
+import pandas as pd
+
+
+def enable_copy_on_write():
+    """Liga o copy-on-write do pandas (chamado pelos pontos de entrada)."""
+    pd.set_option("mode.copy_on_write", True)
+
+
+def share(df):
+    """Cópia de `df` para quem chamou: rasa com o copy-on-write ligado, completa sem ele."""
+    return df.copy(deep=not pd.get_option("mode.copy_on_write"))
@@ -1,13 +1,23 @@
+import numpy as np
 import pandas as pd
-import os
+import threading
+from contextlib import contextmanager
 from config.settings import (
-    DATA_XLSX_PATH, SHEET_ALUNOS, SHEET_PROFESSORES, SHEET_INSTRUMENTOS,
+    DATA_BACKEND, DATA_CACHE_ENABLED, DATA_CACHE_DIR, ANALYSIS_CACHE_MAX_MB,
+    SHEET_ALUNOS, SHEET_PROFESSORES, SHEET_INSTRUMENTOS,
     SHEET_AULAS_OFERTADAS, SHEET_MATRICULAS, SHEET_AGENDA, SHEET_PAGAMENTOS
 )
+from config.schema import SHEET_SCHEMAS, SHEET_DATE_KEYS
+from utils.copy_on_write import share
+from utils.dtypes import apply_schema, concat_typed
+from utils.rollups import DailyRollups
+from utils.id_index import JoinIndexes
+from utils.instrumentation import instrumented, recorder
+from utils.result_cache import ResultCache, reads
+from utils.storage import ExcelStorage, create_storage, prepare_sheet
 
 class DataHandler:
-    def __init__(self):
-        self.file_path = DATA_XLSX_PATH
+    def __init__(self, file_path=None, use_cache=DATA_CACHE_ENABLED, cache_dir=DATA_CACHE_DIR, backend=None):
         self.sheet_names = {
             'alunos': SHEET_ALUNOS,
             'professores': SHEET_PROFESSORES,
@@ -17,56 +27,231 @@ class DataHandler:
             'agenda_aulas': SHEET_AGENDA,
             'pagamentos': SHEET_PAGAMENTOS,
         }
-        self.dataframes = self._load_all_sheets()
-        print(f"Gerenciador de dados Excel inicializado para o arquivo: {self.file_path}")
+        # Onde as abas ficam guardadas (config DATA_BACKEND): Excel + journal, ou banco SQL
+        self.storage = create_storage(backend or DATA_BACKEND, file_path, use_cache, cache_dir)
+        self.file_path = self.storage.path
+        self._lock = threading.RLock()
+        self._pending = {}      # aba -> lista de DataFrames inseridos ainda não concatenados
+        self._staged = None     # inserções da transação em andamento
+        self._transaction_depth = 0
+        self._compaction_thread = None
+        self._date_index = {}   # aba -> datas ordenadas (sem NaT) usadas por slice_by_period
+        self._insert_listeners = []
+        self._reload_listeners = []
+        self._reload_lock = threading.Lock()
+        # Incrementada a cada gravação ou recarga de abas; caches derivados comparam com ela
+        self.version = 0
+        # Os tipos do esquema são aplicados uma única vez, aqui; abas "lazy" ficam como None
+        with recorder.measure("dados", "DataHandler.carregar"):
+            self.dataframes = {
+                name: prepare_sheet(name, df)
+                for name, df in self.storage.load_sheets(list(self.sheet_names.values())).items()
+            }
+        for sheet_name in self.storage.lazy_sheets:
+            self.dataframes.setdefault(sheet_name, None)
+        for sheet_name, df in self.storage.pending_inserts(self.dataframes.keys()).items():
+            self._pending.setdefault(sheet_name, []).append(df)
+        self.rollups = DailyRollups(self)
+        # Índices por id, usados no lugar de pd.merge nas análises
+        self.indexes = JoinIndexes(self)
+        self.result_cache = ResultCache(int(ANALYSIS_CACHE_MAX_MB * 2**20))
+        print(f"Gerenciador de dados ({self.storage.name}) inicializado para o arquivo: {self.file_path}")
 
-    def _load_all_sheets(self):
-        """Carrega todas as abas do arquivo Excel para um dicionário de DataFrames."""
-        if not os.path.exists(self.file_path):
-            print("Arquivo Excel não encontrado. Criando um novo com abas vazias.")
-            self.initialize_excel_file()
-            return {name: pd.DataFrame() for name in self.sheet_names.values()}
+    def is_loaded(self, sheet_name):
+        """False para as abas que o backend ainda não trouxe para a memória (ver StorageBackend.lazy_sheets)."""
+        return self.dataframes.get(sheet_name) is not None
 
-        try:
-            # Carrega todas as abas de uma vez
-            return pd.read_excel(self.file_path, sheet_name=None)
-        except Exception as e:
-            print(f"❌ Erro ao ler o arquivo Excel: {e}")
-            return {name: pd.DataFrame() for name in self.sheet_names.values()}
-
-    def _save_all_sheets(self):
-        """Salva todos os DataFrames em memória de volta para o arquivo Excel."""
-        try:
-            with pd.ExcelWriter(self.file_path, engine='openpyxl') as writer:
-                for sheet_name, df in self.dataframes.items():
-                    df.to_excel(writer, sheet_name=sheet_name, index=False)
-            print("✅ Dados salvos no arquivo Excel com sucesso.")
-        except Exception as e:
-            print(f"❌ Erro ao salvar o arquivo Excel: {e}")
-
-    def initialize_excel_file(self):
-        """Cria um arquivo Excel vazio com todas as abas necessárias se ele não existir."""
-        if not os.path.exists(self.file_path):
-            with pd.ExcelWriter(self.file_path, engine='openpyxl') as writer:
-                for sheet_name in self.sheet_names.values():
-                    # Cria uma aba vazia para cada nome de sheet
-                    pd.DataFrame().to_excel(writer, sheet_name=sheet_name, index=False)
-            print(f"Arquivo '{self.file_path}' criado com as abas necessárias.")
+    def _materialize(self, sheet_name):
+        """Carrega a aba, se ainda não estiver em memória, e concatena de uma só vez as inserções pendentes."""
+        if self.dataframes[sheet_name] is None:
+            with recorder.measure("dados", f"DataHandler.ler_aba {sheet_name}"):
+                self.dataframes[sheet_name] = self.storage.read_sheet(sheet_name)
+            self._date_index.pop(sheet_name, None)
+        pendentes = self._pending.pop(sheet_name, None)
+        if pendentes:
+            self.dataframes[sheet_name] = prepare_sheet(sheet_name, concat_typed(
+                [self.dataframes[sheet_name], *pendentes], SHEET_SCHEMAS.get(sheet_name, {})
+            ))
+            self._date_index.pop(sheet_name, None)
+
+    @instrumented("dados")
+    def compact(self, background=False):
+        """Grava as inserções do journal no Excel (numa thread, com background=True). Nada a fazer no SQL."""
+        if not isinstance(self.storage, ExcelStorage):
+            return None
+        if background:
+            if self._compaction_thread is not None and self._compaction_thread.is_alive():
+                return self._compaction_thread
+            self._compaction_thread = threading.Thread(target=self.compact, name="compactacao-journal", daemon=True)
+            self._compaction_thread.start()
+            return self._compaction_thread
+
+        with self._lock:
+            for sheet_name in list(self._pending):
+                self._materialize(sheet_name)
+            # Os DataFrames nunca são alterados no lugar, então a cópia rasa do dicionário basta
+            snapshot = dict(self.dataframes)
+            line_counts = dict(self.storage.journal.line_counts)
 
+        sha = self.storage.write_snapshot(snapshot)
+        if sha is None:
+            return None
+        with self._lock:
+            self.storage.commit_snapshot(sha, line_counts, snapshot)
+        return None
+
+    @instrumented("dados")
+    def reload_changed_sheets(self):
+        """Relê do Excel só as abas alteradas fora do dashboard e devolve os nomes relidos."""
+        if not isinstance(self.storage, ExcelStorage):
+            return []
+        with self._reload_lock:
+            with self._lock:
+                alteradas = self.storage.changed_sheets()
+            if not alteradas:
+                return []
+            try:
+                # A leitura do Excel fica fora do lock
+                lidas = self.storage.reload_sheets(alteradas)
+            except Exception as e:
+                print(f"❌ Erro ao recarregar as abas {', '.join(alteradas)}: {e}")
+                return []
+            with self._lock:
+                pendentes = self.storage.pending_inserts(self.dataframes.keys() | lidas.keys())
+                for sheet_name, df in lidas.items():
+                    self.dataframes[sheet_name] = prepare_sheet(sheet_name, df)
+                    self._date_index.pop(sheet_name, None)
+                    self._pending.pop(sheet_name, None)
+                    if sheet_name in pendentes:
+                        self._pending[sheet_name] = [pendentes[sheet_name]]
+                self.version += 1
+                versao = self.version
+                self.result_cache.invalidate(lidas)
+            for callback in self._reload_listeners:
+                callback(list(lidas), versao)
+        print(f"Planilha alterada: abas recarregadas ({', '.join(lidas)}).")
+        return list(lidas)
+
+    @instrumented("dados", linhas=len)
     def get_data(self, table_name):
-        """Retorna uma cópia do DataFrame para uma 'tabela' (aba)."""
+        """Retorna o DataFrame de uma 'tabela' (aba), sem cópia com o copy-on-write ligado."""
         sheet_name = self.sheet_names.get(table_name)
         if sheet_name and sheet_name in self.dataframes:
-            return self.dataframes[sheet_name].copy()
+            reads(sheet_name)
+            with self._lock:
+                self._materialize(sheet_name)
+                return share(self.dataframes[sheet_name])
         print(f"Aviso: A aba '{sheet_name}' não foi encontrada.")
         return pd.DataFrame()
 
+    @instrumented("dados", linhas=len)
+    def slice_by_period(self, table_name, start_date, end_date):
+        """Linhas da 'tabela' com a data-chave entre start_date e end_date, por busca binária na aba ordenada."""
+        sheet_name = self.sheet_names.get(table_name)
+        if not sheet_name or sheet_name not in self.dataframes:
+            print(f"Aviso: A aba '{sheet_name}' não foi encontrada.")
+            return pd.DataFrame()
+        date_col = SHEET_DATE_KEYS.get(sheet_name)
+        reads(sheet_name)
+        with self._lock:
+            if not self.is_loaded(sheet_name) and self.storage.pushdown and date_col:
+                # Aba ainda fora da memória: o recorte vira uma consulta pelo índice da data
+                return self.storage.read_period(sheet_name, start_date, end_date)
+            self._materialize(sheet_name)
+            df = self.dataframes[sheet_name]
+            if df.empty or date_col not in df.columns:
+                return share(df)
+            datas = self._date_index.get(sheet_name)
+            if datas is None:
+                # As datas válidas formam o prefixo da aba (NaT ficam no fim)
+                datas = df[date_col].to_numpy()
+                datas = datas[:int((~np.isnat(datas)).sum())]
+                self._date_index[sheet_name] = datas
+        inicio = np.datetime64(pd.to_datetime(start_date), 'ns')
+        fim = np.datetime64(pd.to_datetime(end_date), 'ns')
+        lo = np.searchsorted(datas, inicio, side='left')
+        hi = np.searchsorted(datas, fim, side='right')
+        return share(df.iloc[lo:max(lo, hi)])
+
     def insert_data(self, table_name, data_df):
-        """Insere novas linhas em uma 'tabela' (aba) e salva o arquivo."""
+        """Insere novas linhas em uma 'tabela' (aba): no journal do Excel ou no banco."""
         sheet_name = self.sheet_names.get(table_name)
-        if sheet_name in self.dataframes:
-            # Concatena o dataframe existente com o novo
-            self.dataframes[sheet_name] = pd.concat([self.dataframes[sheet_name], data_df], ignore_index=True)
-            self._save_all_sheets()
-        else:
-            print(f"❌ Erro: A aba '{sheet_name}' não existe para inserção.")
\ No newline at end of file
+        if sheet_name not in self.dataframes:
+            print(f"❌ Erro: A aba '{sheet_name}' não existe para inserção.")
+            return
+        with self._lock:
+            if self._staged is not None:
+                self._staged.setdefault(sheet_name, []).append(data_df)
+                return
+            gravadas = self._flush({sheet_name: [data_df]})
+        self._notify_inserts(gravadas)
+
+    def insert_many(self, table_name, rows):
+        """Insere várias linhas (DataFrame ou lista de dicionários) com uma única gravação."""
+        data_df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame.from_records(rows)
+        with self.transaction():
+            self.insert_data(table_name, data_df)
+
+    @contextmanager
+    def transaction(self):
+        """Agrupa várias inserções em uma única gravação; com uma exceção no bloco, nada é gravado."""
+        with self._lock:
+            if self._transaction_depth == 0:
+                self._staged = {}
+            self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            with self._lock:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self._staged = None
+            raise
+        gravadas = []
+        with self._lock:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                staged, self._staged = self._staged, None
+                gravadas = self._flush(staged)
+        self._notify_inserts(gravadas)
+
+    def get_data_at_version(self, *table_names):
+        """As 'tabelas' pedidas e a versão dos dados em que foram lidas, sem gravações no meio."""
+        with self._lock:
+            return self.version, [self.get_data(table_name) for table_name in table_names]
+
+    def add_insert_listener(self, callback):
+        """Registra `callback(nome_da_aba, linhas_novas, versão)`, chamado a cada gravação."""
+        self._insert_listeners.append(callback)
+
+    def add_reload_listener(self, callback):
+        """Registra `callback(abas_recarregadas, versão)`, chamado quando abas são relidas do arquivo."""
+        self._reload_listeners.append(callback)
+
+    @instrumented("dados", nome="DataHandler.gravar")
+    def _flush(self, staged):
+        """Grava no backend e na memória as inserções agrupadas por aba; devolve (aba, linhas, versão) de cada gravação."""
+        gravadas = []
+        for sheet_name, frames in staged.items():
+            data_df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+            try:
+                self.storage.append(sheet_name, data_df)
+            except Exception as e:
+                print(f"❌ Erro ao gravar as inserções ({self.storage.name}): {e}")
+                continue
+            data_df = apply_schema(data_df, SHEET_SCHEMAS.get(sheet_name, {}))
+            # Abas fora da memória serão lidas já com as linhas novas
+            if self.is_loaded(sheet_name):
+                self._pending.setdefault(sheet_name, []).append(data_df)
+            self.version += 1
+            self.result_cache.invalidate([sheet_name])
+            gravadas.append((sheet_name, data_df, self.version))
+        if self.storage.needs_compaction():
+            self.compact(background=True)
+        return gravadas
+
+    def _notify_inserts(self, gravadas):
+        # Fora do self._lock, como os avisos de recarga: os ouvintes têm locks próprios
+        for sheet_name, data_df, versao in gravadas:
+            for callback in self._insert_listeners:
+                callback(sheet_name, data_df, versao)
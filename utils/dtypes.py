@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import (
+    union_categoricals, is_datetime64_any_dtype, is_timedelta64_dtype,
+    is_integer_dtype, is_float_dtype,
+)
+
+_INT32 = np.iinfo(np.int32)
+
+
+def _parse_uniques(series, parser):
+    """Converte só os valores distintos (datas e horários se repetem muito) e espalha pelos códigos."""
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    parsed = parser(pd.Series(uniques, dtype=object)).to_numpy()
+    # O código -1 (valor ausente) cai na posição extra, que fica NaT
+    parsed = np.append(parsed, np.array(["NaT"], dtype=parsed.dtype))
+    return pd.Series(parsed[codes], index=series.index, name=series.name)
+
+
+def _to_date(series):
+    if is_datetime64_any_dtype(series):
+        return series
+    return _parse_uniques(series, lambda u: pd.to_datetime(u, errors="coerce", format="ISO8601"))
+
+
+def _to_time(series):
+    if is_timedelta64_dtype(series):
+        return series
+    return _parse_uniques(series, lambda u: pd.to_timedelta(u.astype(str), errors="coerce"))
+
+
+def _to_id(series):
+    if is_integer_dtype(series) and series.dtype.itemsize <= 4:
+        return series
+    numeric = pd.to_numeric(series, errors="coerce")
+    if numeric.isna().any():
+        # Ids ausentes: mantém float para não perder as linhas
+        return numeric
+    if numeric.empty or (numeric.min() >= _INT32.min and numeric.max() <= _INT32.max):
+        return numeric.astype(np.int32)
+    return numeric.astype(np.int64)
+
+
+def _to_category(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    return series.astype("category")
+
+
+def _to_float(series):
+    if is_float_dtype(series):
+        return series
+    return pd.to_numeric(series, errors="coerce").astype(np.float64)
+
+
+CONVERTERS = {
+    'id': _to_id,
+    'date': _to_date,
+    'time': _to_time,
+    'category': _to_category,
+    'float': _to_float,
+}
+
+
+def apply_schema(df, schema):
+    """Converte as colunas para os tipos do esquema; colunas já no tipo certo não são tocadas."""
+    if df.empty and len(df.columns) == 0:
+        return df
+    converted = {}
+    for col, kind in schema.items():
+        if col in df.columns:
+            series = df[col]
+            new = CONVERTERS[kind](series)
+            if new is not series:
+                converted[col] = new
+    if not converted:
+        return df
+    return df.assign(**converted)
+
+
+def concat_typed(frames, schema):
+    """Concatena DataFrames já tipados preservando os tipos do esquema (categorias unidas)."""
+    frames = [apply_schema(df, schema) for df in frames if not (df.empty and len(df.columns) == 0)]
+    if not frames:
+        return pd.DataFrame()
+    result = pd.concat(frames, ignore_index=True)
+    for col, kind in schema.items():
+        if kind != 'category' or col not in result.columns:
+            continue
+        if isinstance(result[col].dtype, pd.CategoricalDtype):
+            continue
+        parts = [df[col] for df in frames if col in df.columns]
+        if len(parts) == len(frames) and all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            result[col] = pd.Series(union_categoricals(parts, ignore_order=True), index=result.index)
+    return apply_schema(result, schema)
+
+
+def _format_uniques(series, formatter):
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    formatted = np.append(np.asarray(formatter(uniques), dtype=object), None)
+    return pd.Series(formatted[codes], index=series.index, name=series.name)
+
+
+def _format_timedelta(values):
+    seconds = pd.TimedeltaIndex(values).total_seconds().astype(np.int64)
+    return [f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}" for s in seconds]
+
+
+def to_storage(df, schema):
+    """Inverso do apply_schema, para gravar no Excel como texto ('AAAA-MM-DD', 'HH:MM:SS')."""
+    converted = {}
+    for col, kind in schema.items():
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if kind == 'date' and is_datetime64_any_dtype(series):
+            converted[col] = _format_uniques(series, lambda u: pd.DatetimeIndex(u).strftime('%Y-%m-%d'))
+        elif kind == 'time' and is_timedelta64_dtype(series):
+            converted[col] = _format_uniques(series, _format_timedelta)
+        elif kind == 'category' and isinstance(series.dtype, pd.CategoricalDtype):
+            converted[col] = series.astype(object)
+    if not converted:
+        return df
+    return df.assign(**converted)
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+from config.schema import SHEET_SCHEMAS
+from config.settings import SHEET_ALUNOS, SHEET_AGENDA, SHEET_PAGAMENTOS
+from utils.dtypes import apply_schema, concat_typed
+from utils.rollups import HORAS_DIA, add_horarios, aggregate_horarios
+
+DEFAULT_CHUNK_ROWS = 50_000
+
+
+def _typed_chunk(rows, header, schema):
+    return apply_schema(pd.DataFrame.from_records(rows, columns=header), schema)
+
+
+def _iter_rows_chunks(ws, sheet_name, chunk_rows):
+    """Blocos tipados de até `chunk_rows` linhas de uma aba do openpyxl (read_only)."""
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        yield pd.DataFrame()
+        return
+    header = [str(h) if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+    n_cols = len(header)
+    schema = SHEET_SCHEMAS.get(sheet_name, {})
+    bloco, gerados = [], 0
+    for row in rows:
+        if all(value is None for value in row):
+            continue
+        if len(row) != n_cols:
+            row = tuple(row[:n_cols]) + (None,) * (n_cols - len(row))
+        bloco.append(row)
+        if len(bloco) >= chunk_rows:
+            yield _typed_chunk(bloco, header, schema)
+            gerados += 1
+            bloco = []
+    if bloco or not gerados:
+        yield _typed_chunk(bloco, header, schema)
+
+
+def iter_workbook_chunks(xlsx_path, sheet_names=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Gera (nome_da_aba, DataFrame tipado) em blocos, com o openpyxl em modo read_only."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(xlsx_path, read_only=True, data_only=True)
+    try:
+        for sheet_name in (sheet_names if sheet_names is not None else wb.sheetnames):
+            if sheet_name not in wb.sheetnames:
+                continue
+            for chunk in _iter_rows_chunks(wb[sheet_name], sheet_name, chunk_rows):
+                yield sheet_name, chunk
+    finally:
+        wb.close()
+
+
+def read_sheets_streaming(xlsx_path, sheet_names=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Lê as abas em blocos e junta os blocos já tipados (pico de memória perto do tamanho final)."""
+    blocos = {}
+    for sheet_name, chunk in iter_workbook_chunks(xlsx_path, sheet_names, chunk_rows):
+        blocos.setdefault(sheet_name, []).append(chunk)
+    return {name: _join_chunks(name, chunks) for name, chunks in blocos.items()}
+
+
+def _join_chunks(sheet_name, chunks):
+    if len(chunks) == 1:
+        return chunks[0]
+    df = concat_typed(chunks, SHEET_SCHEMAS.get(sheet_name, {}))
+    # Categorias na mesma ordem do astype('category') da leitura inteira
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.set_categories(sorted(df[col].cat.categories))
+    return df
+
+
+class ChunkAggregator:
+    """
+    KPIs calculados bloco a bloco, sem montar as abas: cada bloco é reduzido a
+    totais por dia e somado ao acumulado; `kpis` responde qualquer período.
+    """
+
+    SHEETS = (SHEET_ALUNOS, SHEET_AGENDA, SHEET_PAGAMENTOS)
+
+    def __init__(self):
+        self.linhas = 0
+        # (dia, status) -> nº de aulas
+        self._aulas = pd.Series(dtype='int64', index=pd.MultiIndex.from_arrays([[], []], names=['dia', 'status']))
+        self._faturamento = pd.Series(dtype='float64')  # dia -> valor pago
+        self._horarios = None
+        self._alunos_status = pd.Series(dtype='int64')
+        self._cadastros = pd.Series(dtype='int64')      # dia -> nº de cadastros
+
+    def add(self, sheet_name, chunk):
+        """Soma um bloco tipado de uma das abas de SHEETS (outras abas são ignoradas)."""
+        if chunk.empty:
+            return
+        self.linhas += len(chunk)
+        if sheet_name == SHEET_AGENDA:
+            aulas = chunk.groupby([
+                chunk['data_aula'].dt.normalize().rename('dia'), chunk['status'].astype(object),
+            ]).size()
+            self._aulas = self._aulas.add(aulas, fill_value=0)
+            self._horarios = add_horarios(self._horarios, *aggregate_horarios(chunk))
+        elif sheet_name == SHEET_PAGAMENTOS:
+            pagos = chunk.loc[chunk['status'] == 'Pago']
+            valor = pagos['valor_pago'].groupby(pagos['data_pagamento'].dt.normalize()).sum()
+            self._faturamento = self._faturamento.add(valor, fill_value=0)
+        elif sheet_name == SHEET_ALUNOS:
+            status = chunk['status'].astype(object).value_counts()
+            self._alunos_status = self._alunos_status.add(status, fill_value=0)
+            cadastros = chunk['data_cadastro'].dt.normalize().value_counts()
+            self._cadastros = self._cadastros.add(cadastros, fill_value=0)
+
+    def kpis(self, start_date, end_date):
+        """Os KPIs das telas de visão geral, financeiro e aulas para o período."""
+        inicio, fim = pd.to_datetime(start_date), pd.to_datetime(end_date)
+
+        faturamento = self._faturamento.sort_index().loc[inicio:fim]
+        por_mes = faturamento.groupby(faturamento.index.strftime('%Y-%m')).sum() if len(faturamento) else faturamento
+
+        por_status = pd.Series(dtype='int64')
+        if len(self._aulas):
+            dias = self._aulas.index.get_level_values(0)
+            por_status = self._aulas[(dias >= inicio) & (dias <= fim)].groupby(level=1).sum().astype('int64')
+
+        cadastros = self._cadastros.sort_index().loc[inicio:fim]
+        return {
+            "faturamento_total": float(faturamento.sum()),
+            "faturamento_por_mes": por_mes,
+            "total_aulas": int(por_status.sum()),
+            "aulas_por_status": por_status,
+            "alunos_ativos": int(self._alunos_status.get('Ativo', 0)),
+            "novas_matriculas": int(cadastros.sum()),
+            "horarios_pico": self._horarios_periodo(start_date, end_date),
+        }
+
+    def _horarios_periodo(self, start_date, end_date):
+        """Aulas por dia da semana x hora de início no período (7 x 24)."""
+        if self._horarios is None:
+            return np.zeros((7, HORAS_DIA), dtype=np.int64)
+        primeiro, contagens = self._horarios
+        dia = lambda data: int(np.datetime64(pd.to_datetime(data), 'D').astype(np.int64)) - primeiro
+        lo, hi = max(dia(start_date), 0), max(dia(end_date) + 1, 0)
+        return contagens[lo:hi].sum(axis=0, dtype=np.int64).reshape(7, HORAS_DIA)
+
+
+def stream_kpis(xlsx_path, start_date, end_date, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Lê alunos, agenda e pagamentos em blocos e devolve (KPIs do período, linhas lidas)."""
+    agregador = ChunkAggregator()
+    for sheet_name, chunk in iter_workbook_chunks(xlsx_path, ChunkAggregator.SHEETS, chunk_rows):
+        agregador.add(sheet_name, chunk)
+    return agregador.kpis(start_date, end_date), agregador.linhas
@@ -0,0 +1,40 @@
+import os
+import time
+
+
+class FileWatcher:
+    """
+    Observa um arquivo por polling de os.stat; poll() avisa uma vez por rajada
+    de alterações, quando o arquivo fica `debounce_s` segundos sem mudar.
+    """
+
+    def __init__(self, path, debounce_s=1.5, clock=time.monotonic):
+        self.path = path
+        self.debounce_s = debounce_s
+        self._clock = clock
+        self._stat = self._read_stat()
+        self._changed_at = None
+
+    def _read_stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self):
+        """True quando o arquivo mudou e já está estável há `debounce_s` segundos."""
+        stat = self._read_stat()
+        agora = self._clock()
+        if stat != self._stat:
+            self._stat = stat
+            self._changed_at = agora
+            return False
+        if self._changed_at is None or stat is None or agora - self._changed_at < self.debounce_s:
+            return False
+        self._changed_at = None
+        return True
+
+    def rearm(self):
+        """Faz poll() avisar de novo depois de mais um intervalo de debounce."""
+        self._changed_at = self._clock()
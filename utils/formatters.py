@@ -1,4 +1,6 @@
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_numeric_dtype
 from datetime import datetime
 
 def format_currency(value, currency_symbol="R$"):
@@ -63,22 +65,77 @@ def clean_phone_number(phone_number):
         return ""
     return ''.join(filter(str.isdigit, phone_number))
 
+STATUS_MAP = {
+    'Ativo': '🟢 Ativo',
+    'Inativo': '🔴 Inativo',
+    'Suspensa': '🟡 Suspensa',
+    'Agendada': '🗓️ Agendada',
+    'Concluída': '✅ Concluída',
+    'Cancelada': '❌ Cancelada',
+    'Pendente': '⏳ Pendente',
+    'Pago': '💰 Pago',
+    # Adicione outros status conforme necessário
+}
+
 def display_status(status_text):
     """
     Pode ser usado para mapear status para uma exibição mais amigável ou com ícones.
     """
-    status_map = {
-        'Ativo': '🟢 Ativo',
-        'Inativo': '🔴 Inativo',
-        'Suspensa': '🟡 Suspensa',
-        'Agendada': '🗓️ Agendada',
-        'Concluída': '✅ Concluída',
-        'Cancelada': '❌ Cancelada',
-        'Pendente': '⏳ Pendente',
-        'Pago': '💰 Pago',
-        # Adicione outros status conforme necessário
-    }
-    return status_map.get(status_text, status_text)
+    return STATUS_MAP.get(status_text, status_text)
+
+# --- Versões para Series inteiras (tabelas): cada valor distinto é formatado uma vez ---
+
+def _format_unique(series, format_uniques, missing=""):
+    """Aplica `format_uniques` (array de valores distintos -> array de textos) e espalha pelas linhas."""
+    series = pd.Series(series)
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    textos = np.append(np.asarray(format_uniques(uniques), dtype=object), missing)
+    return pd.Series(textos[codes], index=series.index, name=series.name, dtype=object)
+
+# Troca ',' <-> '.' do formato americano ('1,234.50') para o brasileiro ('1.234,50')
+_SEPARADORES_BR = str.maketrans(",.", ".,")
+
+def _brl(uniques, currency_symbol):
+    if not is_numeric_dtype(uniques.dtype):
+        return [format_currency(u, currency_symbol) for u in uniques]
+    textos = pd.Series([f"{v:,.2f}" for v in uniques.tolist()], dtype=object)
+    return (f"{currency_symbol} " + textos.str.translate(_SEPARADORES_BR)).to_numpy()
+
+def format_currency_series(values, currency_symbol="R$"):
+    """
+    format_currency para uma Series inteira.
+    Ex: [1234.5, None, inf] -> ['R$ 1.234,50', 'R$ 0,00', 'R$ inf']
+    """
+    return _format_unique(values, lambda uniques: _brl(uniques, currency_symbol), f"{currency_symbol} 0,00")
+
+def format_date_series(dates, fmt="%d/%m/%Y"):
+    """format_date para uma Series de datas (datetime64 ou texto)."""
+    def formatar(uniques):
+        datas = pd.DatetimeIndex(pd.to_datetime(uniques, errors='coerce'))
+        return np.where(datas.isna(), "", datas.strftime(fmt).to_numpy(dtype=object, na_value=""))
+    return _format_unique(dates, formatar)
+
+def _hora(value, fmt):
+    if isinstance(value, str) and value.count(':') == 2:
+        try:
+            return datetime.strptime(value, "%H:%M:%S").strftime(fmt)
+        except ValueError:
+            pass
+    return format_time(value, fmt)
+
+def format_time_series(times, fmt="%H:%M"):
+    """format_time para uma Series de horários (timedelta64 desde a meia-noite, datetime64, time ou 'HH:MM[:SS]')."""
+    def formatar(uniques):
+        if isinstance(uniques, pd.TimedeltaIndex):
+            uniques = pd.Timestamp(0) + uniques
+        if isinstance(uniques, pd.DatetimeIndex):
+            return uniques.strftime(fmt).to_numpy(dtype=object, na_value="")
+        return [_hora(u, fmt) for u in uniques]
+    return _format_unique(times, formatar)
+
+def display_status_series(status):
+    """display_status para uma Series; com categorias, o mapa é consultado uma vez por categoria."""
+    return _format_unique(status, lambda uniques: [display_status(u) for u in uniques])
 
 # Exemplo de uso:
 if __name__ == "__main__":
@@ -120,4 +177,10 @@ if __name__ == "__main__":
     print(f"Status 'Ativo': {display_status('Ativo')}")
     print(f"Status 'Agendada': {display_status('Agendada')}")
     print(f"Status 'Concluída': {display_status('Concluída')}")
-    print(f"Status 'Desconhecido': {display_status('Desconhecido')}")
\ No newline at end of file
+    print(f"Status 'Desconhecido': {display_status('Desconhecido')}")
+
+    # Teste das versões para Series
+    print(f"Moeda (Series): {format_currency_series(pd.Series([1234.5, -0.5, None, 1e7])).tolist()}")
+    print(f"Data (Series): {format_date_series(pd.Series(['2023-01-15', None])).tolist()}")
+    print(f"Hora (Series): {format_time_series(pd.Series(pd.to_timedelta(['14:30:00', None]))).tolist()}")
+    print(f"Status (Series): {display_status_series(pd.Series(['Pago', 'Outro', None], dtype='category')).tolist()}")
\ No newline at end of file
@@ -0,0 +1,121 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.result_cache import reads
+
+# Acima desta razão (maior id / nº de linhas) o índice usa busca binária em vez da tabela direta
+_DENSIDADE_MAXIMA = 4
+
+
+class IdIndex:
+    """Índice posicional de uma coluna de ids (id -> linha; -1 se não existir, a primeira se repetido)."""
+
+    def __init__(self, frame, column='id'):
+        self.frame = frame
+        self.column = column
+        ids = frame[column].to_numpy() if column in frame else np.array([], dtype=np.int64)
+        validos = ~pd.isna(ids)
+        ids = ids[validos].astype(np.int64)
+        posicoes = np.flatnonzero(validos)
+        self._table = None
+        if len(ids) and ids.min() >= 0 and ids.max() <= _DENSIDADE_MAXIMA * len(ids) + 1024:
+            table = np.full(int(ids.max()) + 1, -1, dtype=np.int64)
+            # Atribuição de trás para frente: em ids repetidos, a primeira linha prevalece
+            table[ids[::-1]] = posicoes[::-1]
+            self._table = table
+        else:
+            ordem = np.argsort(ids, kind='stable')
+            self._sorted_ids = ids[ordem]
+            self._sorted_pos = posicoes[ordem]
+        self._codes = {}
+
+    def positions(self, keys):
+        """Posição de cada id de `keys` na aba (-1 se não existir)."""
+        keys = np.asarray(keys)
+        result = np.full(len(keys), -1, dtype=np.int64)
+        validos = ~pd.isna(keys)
+        if not validos.any():
+            return result
+        chaves = keys[validos].astype(np.int64)
+        if self._table is not None:
+            dentro = (chaves >= 0) & (chaves < len(self._table))
+            encontrados = np.full(len(chaves), -1, dtype=np.int64)
+            encontrados[dentro] = self._table[chaves[dentro]]
+        elif len(self._sorted_ids):
+            i = np.searchsorted(self._sorted_ids, chaves, side='left')
+            i = np.minimum(i, len(self._sorted_ids) - 1)
+            encontrados = np.where(self._sorted_ids[i] == chaves, self._sorted_pos[i], -1)
+        else:
+            return result
+        result[validos] = encontrados
+        return result
+
+    def values(self, column, positions):
+        """Valores de `column` nas posições dadas (posições -1 devem ser filtradas antes)."""
+        return self.frame[column].to_numpy()[positions]
+
+    def name_codes(self, keys, name_column):
+        """Código do nome de cada id de `keys` (-1 se não existir) e a lista de nomes."""
+        if name_column not in self._codes:
+            codes, nomes = pd.factorize(self.frame[name_column], use_na_sentinel=True)
+            self._codes[name_column] = (codes.astype(np.int64), np.asarray(nomes, dtype=object))
+        row_codes, nomes = self._codes[name_column]
+        pos = self.positions(keys)
+        codes = np.full(len(pos), -1, dtype=np.int64)
+        codes[pos >= 0] = row_codes[pos[pos >= 0]]
+        return codes, nomes
+
+
+def totals_by_code(codes, n_codes, weights=None):
+    """Contagem e soma (opcional) por código, ignorando códigos -1."""
+    validos = codes >= 0
+    counts = np.bincount(codes[validos], minlength=n_codes)
+    if weights is None:
+        return counts, None
+    pesos = np.nan_to_num(np.asarray(weights, dtype=float)[validos])
+    return counts, np.bincount(codes[validos], weights=pesos, minlength=n_codes)
+
+
+def frame_by_name(nomes, counts, name_column, **colunas):
+    """Uma linha por nome com contagem > 0, em ordem alfabética (como um groupby pelo nome)."""
+    presentes = counts > 0
+    frame = pd.DataFrame({name_column: nomes[presentes], **{k: v[presentes] for k, v in colunas.items()}})
+    return frame.sort_values(name_column, ignore_index=True)
+
+
+class JoinIndexes:
+    """Índices por id das abas, montados uma vez por versão dos dados, no lugar dos pd.merge."""
+
+    def __init__(self, data_handler):
+        self.handler = data_handler
+        self.version = None
+        self._lock = threading.Lock()
+        self._indexes = {}
+        data_handler.add_reload_listener(self._on_reload)
+
+    def _on_reload(self, sheet_names, version):
+        """Abas relidas do arquivo: descarta só os índices delas."""
+        with self._lock:
+            if self.version != version - 1:
+                return
+            sheet_of = self.handler.sheet_names
+            self._indexes = {
+                key: index for key, index in self._indexes.items()
+                if sheet_of.get(key[0], key[0]) not in sheet_names
+            }
+            self.version = version
+
+    def get(self, sheet_name, column='id'):
+        """IdIndex da coluna `column` da aba, para a versão atual dos dados."""
+        reads(self.handler.sheet_names.get(sheet_name, sheet_name))
+        with self._lock:
+            if self.version != self.handler.version:
+                self._indexes = {}
+                self.version = self.handler.version
+            index = self._indexes.get((sheet_name, column))
+            if index is None:
+                index = IdIndex(self.handler.get_data(sheet_name), column)
+                self._indexes[(sheet_name, column)] = index
+            return index
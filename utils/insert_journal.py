@@ -0,0 +1,106 @@
+import json
+import os
+import re
+
+import pandas as pd
+
+STATE_NAME = "compactacao.json"
+
+
+class InsertJournal:
+    """
+    Journal append-only das inserções, com um arquivo JSONL por aba.
+
+    O estado da compactação (SHA-256 do .xlsx novo e quantas linhas de cada
+    journal já estão nele) é gravado antes de o .xlsx ser substituído, para
+    que uma compactação interrompida não duplique linhas.
+    """
+
+    def __init__(self, xlsx_path, journal_dir=None):
+        self.xlsx_path = xlsx_path
+        if not journal_dir:
+            base = os.path.splitext(os.path.basename(xlsx_path))[0]
+            journal_dir = os.path.join(os.path.dirname(os.path.abspath(xlsx_path)), f".{base}.journal")
+        self.journal_dir = journal_dir
+        self.state_path = os.path.join(journal_dir, STATE_NAME)
+        self.line_counts = {}
+
+    def _path(self, sheet_name):
+        stem = re.sub(r"\W", "_", sheet_name)
+        return os.path.join(self.journal_dir, f"{stem}.jsonl")
+
+    # --- Escrita ---
+
+    def append(self, sheet_name, df):
+        """Acrescenta as linhas do DataFrame ao journal da aba (uma única escrita)."""
+        if df.empty:
+            return
+        os.makedirs(self.journal_dir, exist_ok=True)
+        payload = df.to_json(orient="records", lines=True, date_format="iso", force_ascii=False)
+        if not payload.endswith("\n"):
+            payload += "\n"
+        with open(self._path(sheet_name), "a", encoding="utf-8") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        self.line_counts[sheet_name] = self.line_counts.get(sheet_name, 0) + len(df)
+
+    @property
+    def pending_rows(self):
+        """Total de linhas no journal ainda não compactadas no .xlsx."""
+        return sum(self.line_counts.values())
+
+    # --- Leitura ---
+
+    def replay(self, sheet_names, xlsx_sha256):
+        """{aba: DataFrame} das linhas ainda fora do .xlsx. `xlsx_sha256` só é chamada se houver compactação pendente."""
+        self._finish_interrupted_compaction(xlsx_sha256)
+        pendentes = {}
+        self.line_counts = {}
+        for sheet_name in sheet_names:
+            path = self._path(sheet_name)
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                continue
+            df = pd.read_json(path, lines=True, dtype=False, convert_dates=False, encoding="utf-8")
+            self.line_counts[sheet_name] = len(df)
+            pendentes[sheet_name] = df
+        return pendentes
+
+    # --- Compactação ---
+
+    def mark_compacted(self, xlsx_sha256, line_counts):
+        """Registra que as primeiras `line_counts[aba]` linhas estão no .xlsx com esse SHA."""
+        os.makedirs(self.journal_dir, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"sha256": xlsx_sha256, "linhas": line_counts}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def drop_compacted(self, line_counts):
+        """Descarta do início de cada journal as linhas que já foram compactadas."""
+        for sheet_name, n in line_counts.items():
+            path = self._path(sheet_name)
+            if n <= 0 or not os.path.exists(path):
+                continue
+            with open(path, encoding="utf-8") as f:
+                restantes = f.readlines()[n:]
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(restantes)
+            os.replace(tmp_path, path)
+            self.line_counts[sheet_name] = max(self.line_counts.get(sheet_name, 0) - n, 0)
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    def _finish_interrupted_compaction(self, xlsx_sha256):
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if os.path.exists(self.xlsx_path) and xlsx_sha256() == state.get("sha256"):
+            # O .xlsx novo chegou a ser gravado: o prefixo do journal já está nele
+            self.drop_compacted(state.get("linhas", {}))
+        else:
+            # A compactação parou antes de substituir o .xlsx: o journal continua valendo
+            os.remove(self.state_path)
@@ -0,0 +1,152 @@
+import csv
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
+from config.settings import INSTRUMENTATION_BUFFER, INSTRUMENTATION_ENABLED, INSTRUMENTATION_MEMORY
+
+# `alocado_kb` é None com INSTRUMENTATION_MEMORY=0
+Medida = namedtuple("Medida", "inicio categoria nome duracao_ms linhas alocado_kb thread")
+
+
+class _Aberta:
+    """Medida em andamento (uma por nível da pilha da thread)."""
+
+    __slots__ = ("linhas",)
+
+    def __init__(self):
+        self.linhas = 0
+
+
+class Recorder:
+    """
+    Buffer circular com as últimas medidas das análises, telas, gráficos e do
+    DataHandler. Desligado, cada ponto instrumentado só verifica `enabled`.
+    """
+
+    def __init__(self, capacidade=INSTRUMENTATION_BUFFER, enabled=INSTRUMENTATION_ENABLED, memoria=INSTRUMENTATION_MEMORY):
+        self.enabled = enabled
+        self.memoria = memoria
+        self._medidas = deque(maxlen=capacidade)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        if enabled and self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    # --- Gravação ---
+
+    @contextmanager
+    def measure(self, categoria, nome):
+        """Mede o bloco: `with recorder.measure("tela", "FinanceView.render"): ...`"""
+        if not self.enabled:
+            yield None
+            return
+        pilha = self._pilha()
+        aberta = _Aberta()
+        pilha.append(aberta)
+        memoria = self.memoria and tracemalloc.is_tracing()
+        antes = tracemalloc.get_traced_memory()[0] if memoria else 0
+        inicio_wall = time.time()
+        inicio = time.perf_counter()
+        try:
+            yield aberta
+        finally:
+            duracao = time.perf_counter() - inicio
+            pilha.pop()
+            if pilha:
+                pilha[-1].linhas += aberta.linhas
+            alocado = (tracemalloc.get_traced_memory()[0] - antes) / 1024 if memoria else None
+            with self._lock:
+                self._medidas.append(Medida(
+                    inicio_wall, categoria, nome, duracao * 1000, aberta.linhas, alocado,
+                    threading.current_thread().name,
+                ))
+
+    def _pilha(self):
+        pilha = getattr(self._local, "pilha", None)
+        if pilha is None:
+            pilha = self._local.pilha = []
+        return pilha
+
+    def clear(self):
+        with self._lock:
+            self._medidas.clear()
+
+    # --- Consulta e exportação ---
+
+    def snapshot(self):
+        """Cópia das medidas do buffer, da mais antiga para a mais recente."""
+        with self._lock:
+            return list(self._medidas)
+
+    def summary(self):
+        """Uma linha por (categoria, nome): chamadas, tempos (total, médio, máximo), linhas e alocação."""
+        grupos = {}
+        for m in self.snapshot():
+            g = grupos.setdefault((m.categoria, m.nome), [0, 0.0, 0.0, 0, None])
+            g[0] += 1
+            g[1] += m.duracao_ms
+            g[2] = max(g[2], m.duracao_ms)
+            g[3] += m.linhas
+            if m.alocado_kb is not None:
+                g[4] = (g[4] or 0.0) + m.alocado_kb
+        linhas = [
+            {
+                "categoria": categoria, "nome": nome, "chamadas": n, "total_ms": total,
+                "media_ms": total / n, "max_ms": maximo, "linhas": n_linhas, "alocado_kb": alocado,
+            }
+            for (categoria, nome), (n, total, maximo, n_linhas, alocado) in grupos.items()
+        ]
+        return sorted(linhas, key=lambda linha: linha["total_ms"], reverse=True)
+
+    def dump_json(self, path):
+        """Grava as medidas e o resumo em JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "medidas": [m._asdict() for m in self.snapshot()],
+                "resumo": self.summary(),
+            }, f, ensure_ascii=False, indent=2)
+
+    def dump_csv(self, path):
+        """Grava as medidas (uma por linha) em CSV."""
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(Medida._fields)
+            writer.writerows(self.snapshot())
+
+    def dump(self, path):
+        """JSON ou CSV, conforme a extensão de `path`."""
+        if path.lower().endswith(".csv"):
+            self.dump_csv(path)
+        else:
+            self.dump_json(path)
+
+
+recorder = Recorder()
+if recorder.enabled:
+    recorder.set_enabled(True)
+
+
+def instrumented(categoria, nome=None, linhas=None):
+    """Mede cada chamada com `recorder.measure`; `linhas(resultado)` conta as linhas entregues."""
+    def decorator(func):
+        rotulo = nome or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not recorder.enabled:
+                return func(*args, **kwargs)
+            with recorder.measure(categoria, rotulo) as aberta:
+                resultado = func(*args, **kwargs)
+                if linhas is not None and aberta is not None:
+                    aberta.linhas += linhas(resultado)
+                return resultado
+        return wrapper
+    return decorator
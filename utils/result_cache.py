@@ -0,0 +1,155 @@
+import contextlib
+import functools
+import inspect
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from utils.copy_on_write import share
+
+
+def _size_of(value):
+    """Estimativa do tamanho em bytes de um resultado de análise."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True, index=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(k) + _size_of(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+def _detach(value):
+    """Cópia do resultado guardado que o chamador pode alterar sem mexer no cache."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return share(value)
+    if isinstance(value, dict):
+        return {k: _detach(v) for k, v in value.items()}
+    return value
+
+
+_calculos = threading.local()
+
+
+def reads(*sheet_names):
+    """Anota as abas lidas pelos cálculos memorizados em andamento nesta thread."""
+    for abas in getattr(_calculos, "pilha", ()):
+        abas.update(sheet_names)
+
+
+class ResultCache:
+    """
+    Cache LRU dos resultados das análises, limitado por bytes.
+
+    Cada entrada guarda as abas que o cálculo leu (ver `reads`); quando uma
+    aba muda, invalidate() descarta só as entradas que dependem dela.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # chave -> (resultado, bytes, abas)
+        self._lock = threading.Lock()
+        self._geracao = 0
+        self._alterada_em = {}  # aba -> geração da última alteração
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        found, value = self.lookup(key)
+        if found:
+            return value
+        with self.recording() as calculo:
+            value = compute()
+        return self.store(key, value, calculo)
+
+    def lookup(self, key):
+        """(True, resultado) se a chave está no cache; senão (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is None:
+            return False, None
+        reads(*entry[2])
+        return True, _detach(entry[0])
+
+    @contextlib.contextmanager
+    def recording(self):
+        """Registra as abas lidas dentro do bloco, para passar a store()."""
+        with self._lock:
+            calculo = (self._geracao, set())
+        pilha = _calculos.__dict__.setdefault("pilha", [])
+        pilha.append(calculo[1])
+        try:
+            yield calculo
+        finally:
+            pilha.pop()
+
+    def store(self, key, value, calculo):
+        """Guarda um resultado calculado dentro de recording() e devolve a cópia que vai para o chamador."""
+        inicio, abas = calculo
+        size = _size_of(value)
+        with self._lock:
+            # Só guarda se nenhuma aba lida mudou durante o cálculo e se o resultado cabe no limite
+            atual = all(self._alterada_em.get(aba, -1) < inicio for aba in abas)
+            if atual and size <= self.max_bytes and key not in self._entries:
+                self._entries[key] = (value, size, frozenset(abas))
+                self.bytes += size
+                while self.bytes > self.max_bytes:
+                    _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                    self.bytes -= evicted_size
+                    self.evictions += 1
+        return _detach(value)
+
+    def invalidate(self, sheet_names):
+        """Descarta os resultados que leram alguma das abas alteradas."""
+        sheet_names = set(sheet_names)
+        with self._lock:
+            for aba in sheet_names:
+                self._alterada_em[aba] = self._geracao
+            self._geracao += 1
+            for key in [k for k, entry in self._entries.items() if entry[2] & sheet_names]:
+                self.bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Contadores do cache, para depuração e benchmarks."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entradas": len(self._entries),
+                "bytes": self.bytes,
+                "limite_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "taxa_acerto": (self.hits / total) if total else 0.0,
+            }
+
+
+def memoized(method):
+    """
+    Memoriza um método de análise pelo par (método, argumentos) até que uma
+    das abas que ele leu mude. A classe precisa ter `self.handler.result_cache`.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        # Normaliza a chamada: f('Ativo') e f(status='Ativo') caem na mesma entrada
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        argumentos = tuple(bound.arguments.items())[1:]
+        key = (type(self).__name__, method.__name__, argumentos)
+        return self.handler.result_cache.get_or_compute(key, lambda: method(self, *args, **kwargs))
+    return wrapper
@@ -0,0 +1,281 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config.settings import SHEET_AGENDA, SHEET_PAGAMENTOS
+from utils.result_cache import reads
+
+DIMENSOES = ['dia', 'status', 'instrumento_id', 'professor_id']
+# Aulas sem instrumento/professor e pagamentos sem aula de referência ficam nesta célula
+SEM_REFERENCIA = -1
+# Grade de horários: 7 x 24 células (dia da semana x hora) por dia do calendário
+HORAS_DIA = 24
+CELULAS_SEMANA = 7 * HORAS_DIA
+
+
+def _aggregate_aulas(agenda):
+    """Agrega linhas da agenda em células diárias: nº de aulas e horas."""
+    if agenda.empty:
+        return pd.DataFrame(columns=DIMENSOES + ['aulas', 'horas'])
+    duracao = (agenda['hora_fim'] - agenda['hora_inicio']).dt.total_seconds() / 3600
+    linhas = pd.DataFrame({
+        'dia': agenda['data_aula'].dt.normalize(),
+        'status': agenda['status'],
+        'instrumento_id': agenda['instrumento_id'].fillna(SEM_REFERENCIA),
+        'professor_id': agenda['professor_id'].fillna(SEM_REFERENCIA),
+        'aulas': np.ones(len(agenda), dtype=np.int64),
+        'horas': duracao,
+    })
+    return linhas.groupby(DIMENSOES, observed=True).sum().reset_index()
+
+
+def _aggregate_pagamentos(pagamentos, dims_aula):
+    """Agrega pagamentos em células diárias, com instrumento e professor da aula de referência."""
+    if pagamentos.empty:
+        return pd.DataFrame(columns=DIMENSOES + ['valor', 'pagamentos'])
+    ref = dims_aula.reindex(pagamentos['referencia_aula_id'].to_numpy())
+    ref = ref.fillna(SEM_REFERENCIA).astype(np.int32)
+    linhas = pd.DataFrame({
+        'dia': pagamentos['data_pagamento'].dt.normalize().to_numpy(),
+        'status': pagamentos['status'].to_numpy(),
+        'instrumento_id': ref['instrumento_id'].to_numpy(),
+        'professor_id': ref['professor_id'].to_numpy(),
+        'valor': pagamentos['valor_pago'].to_numpy(),
+        'pagamentos': np.ones(len(pagamentos), dtype=np.int64),
+    })
+    linhas['status'] = linhas['status'].astype(pagamentos['status'].dtype)
+    return linhas.groupby(DIMENSOES, observed=True).sum().reset_index()
+
+
+def aggregate_horarios(agenda):
+    """(dias, células) das aulas de `agenda`: dia como inteiro e célula `dia_semana * 24 + hora`."""
+    if agenda.empty:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    dias = agenda['data_aula'].to_numpy().astype('datetime64[D]')
+    segundos = agenda['hora_inicio'].dt.total_seconds().to_numpy()
+    validos = ~np.isnat(dias) & ~np.isnan(segundos)
+    dias = dias[validos].astype(np.int64)
+    horas = (segundos[validos] // 3600).astype(np.int64) % HORAS_DIA
+    # 1970-01-01 foi uma quinta-feira: (dia + 3) % 7 dá 0 para segunda-feira
+    return dias, ((dias + 3) % 7) * HORAS_DIA + horas
+
+
+def add_horarios(grade, dias, celulas, pesos=None):
+    """
+    Soma aulas à grade (primeiro dia, contagens n_dias x 168), alargando-a se
+    preciso, e devolve a grade nova. Com `pesos`, cada (dia, célula) vale esse nº de aulas.
+    """
+    primeiro, contagens = grade if grade is not None else (0, np.zeros((0, CELULAS_SEMANA), dtype=np.int32))
+    if not len(dias):
+        return primeiro, contagens
+    if len(contagens):
+        inicio, fim = min(primeiro, int(dias.min())), max(primeiro + len(contagens) - 1, int(dias.max()))
+    else:
+        inicio, fim = int(dias.min()), int(dias.max())
+    if (inicio, fim) != (primeiro, primeiro + len(contagens) - 1):
+        nova = np.zeros((fim - inicio + 1, CELULAS_SEMANA), dtype=np.int32)
+        nova[primeiro - inicio:primeiro - inicio + len(contagens)] = contagens
+        primeiro, contagens = inicio, nova
+    contagens += np.bincount(
+        (dias - primeiro) * CELULAS_SEMANA + celulas, weights=pesos, minlength=contagens.size
+    ).reshape(contagens.shape).astype(np.int32)
+    return primeiro, contagens
+
+
+def _consolidate(cubo, delta):
+    """Soma um delta de células ao cubo, mantendo-o ordenado por dia."""
+    if cubo.empty:
+        return delta.sort_values(DIMENSOES, ignore_index=True)
+    if delta.empty:
+        return cubo
+    juntos = pd.concat([cubo, delta], ignore_index=True)
+    if isinstance(cubo['status'].dtype, pd.CategoricalDtype):
+        juntos['status'] = juntos['status'].astype('category')
+    return juntos.groupby(DIMENSOES, observed=True).sum().reset_index()
+
+
+def _slice_days(cubo, start_date, end_date):
+    if cubo.empty:
+        return cubo
+    dias = cubo['dia'].to_numpy()
+    lo = np.searchsorted(dias, np.datetime64(pd.to_datetime(start_date), 'ns'), side='left')
+    hi = np.searchsorted(dias, np.datetime64(pd.to_datetime(end_date), 'ns'), side='right')
+    return cubo.iloc[lo:max(lo, hi)]
+
+
+def by_month(cubo, coluna):
+    """Soma `coluna` do cubo por mês ('AAAA-MM')."""
+    if cubo.empty:
+        return pd.Series(dtype=float, name=coluna)
+    meses = cubo['dia'].to_numpy().astype('datetime64[M]')
+    soma = cubo[coluna].groupby(meses).sum()
+    soma.index = pd.DatetimeIndex(soma.index).strftime('%Y-%m')
+    return soma
+
+
+class DailyRollups:
+    """
+    Cubos diários pré-agregados da agenda e dos pagamentos, atualizados de
+    forma incremental a cada inserção. Um período é um recorte do cubo por dia;
+    o mapa de calor sai das somas prefixas da grade de horários.
+    """
+
+    def __init__(self, data_handler):
+        self.handler = data_handler
+        self.version = None
+        self._lock = threading.RLock()
+        self._aulas = None
+        self._pagamentos = None
+        self._dims_aula = None
+        self._deltas_dims = []
+        self._deltas_aulas = []
+        self._deltas_pagamentos = []
+        self._horarios = None
+        self._prefixo_horarios = None
+        self._deltas_horarios = []
+        data_handler.add_insert_listener(self._on_insert)
+        data_handler.add_reload_listener(self._on_reload)
+
+    # --- Consultas ---
+
+    def aulas(self, start_date, end_date):
+        """Células do cubo de aulas (aulas, horas) com dia dentro do período."""
+        reads(SHEET_AGENDA)
+        with self._lock:
+            self._ensure_current()
+            if self._deltas_aulas:
+                self._aulas = _consolidate(self._aulas, pd.concat(self._deltas_aulas, ignore_index=True))
+                self._deltas_aulas = []
+            cubo = self._aulas
+        return _slice_days(cubo, start_date, end_date)
+
+    def pagamentos(self, start_date, end_date):
+        """Células do cubo de pagamentos (valor, pagamentos) com dia dentro do período."""
+        reads(SHEET_PAGAMENTOS, SHEET_AGENDA)
+        with self._lock:
+            self._ensure_current()
+            if self._deltas_dims:
+                self._dims_aula = self._first_dims(pd.concat([self._dims_aula, *self._deltas_dims]))
+                self._deltas_dims = []
+            if self._deltas_pagamentos:
+                self._pagamentos = _consolidate(self._pagamentos, pd.concat(self._deltas_pagamentos, ignore_index=True))
+                self._deltas_pagamentos = []
+            cubo = self._pagamentos
+        return _slice_days(cubo, start_date, end_date)
+
+    def horarios(self, start_date, end_date):
+        """Aulas do período por dia da semana (linhas, 0 = segunda) e hora de início (colunas): matriz 7 x 24."""
+        reads(SHEET_AGENDA)
+        with self._lock:
+            self._ensure_current()
+            if self._deltas_horarios:
+                for dias, celulas in self._deltas_horarios:
+                    self._horarios = add_horarios(self._horarios, dias, celulas)
+                self._deltas_horarios = []
+                self._prefixo_horarios = None
+            primeiro, contagens = self._horarios
+            if self._prefixo_horarios is None:
+                prefixo = np.zeros((len(contagens) + 1, CELULAS_SEMANA), dtype=np.int64)
+                np.cumsum(contagens, axis=0, out=prefixo[1:])
+                self._prefixo_horarios = prefixo
+            prefixo = self._prefixo_horarios
+        n_dias = len(prefixo) - 1
+        dia = lambda data: int(np.datetime64(pd.to_datetime(data), 'D').astype(np.int64)) - primeiro
+        lo = min(max(dia(start_date), 0), n_dias)
+        hi = min(max(dia(end_date) + 1, lo), n_dias)
+        return (prefixo[hi] - prefixo[lo]).reshape(7, HORAS_DIA)
+
+    # --- Construção e manutenção ---
+
+    def _ensure_current(self):
+        if self.version != self.handler.version:
+            self._build()
+
+    def _build(self):
+        if self.handler.storage.pushdown:
+            self._build_from_storage()
+            return
+        versao, (agenda, pagamentos) = self.handler.get_data_at_version('agenda_aulas', 'pagamentos')
+        if not agenda.empty:
+            self._dims_aula = self._aula_dims(agenda)
+        else:
+            self._dims_aula = pd.DataFrame(columns=['instrumento_id', 'professor_id'], index=pd.Index([], name='id'))
+        self._aulas = _consolidate(pd.DataFrame(), _aggregate_aulas(agenda))
+        self._pagamentos = _consolidate(pd.DataFrame(), _aggregate_pagamentos(pagamentos, self._dims_aula))
+        self._deltas_dims = []
+        self._deltas_aulas = []
+        self._deltas_pagamentos = []
+        self._horarios = add_horarios(None, *aggregate_horarios(agenda))
+        self._prefixo_horarios = None
+        self._deltas_horarios = []
+        self.version = versao
+
+    def _build_from_storage(self):
+        """Os mesmos cubos, agregados pelo banco."""
+        storage = self.handler.storage
+        self._dims_aula = None
+        self._deltas_dims = []
+        self._aulas = storage.cube_aulas(SEM_REFERENCIA)
+        self._pagamentos = storage.cube_pagamentos(SEM_REFERENCIA)
+        self._deltas_aulas = []
+        self._deltas_pagamentos = []
+        horas = storage.hour_counts()
+        dias = horas['dia'].to_numpy().astype('datetime64[D]').astype(np.int64)
+        celulas = ((dias + 3) % 7) * HORAS_DIA + horas['hora'].to_numpy(dtype=np.int64)
+        self._horarios = add_horarios(None, dias, celulas, horas['aulas'].to_numpy())
+        self._prefixo_horarios = None
+        self._deltas_horarios = []
+        self.version = self.handler.version
+
+    def _on_insert(self, sheet_name, data_df, version):
+        """Chamado pelo DataHandler a cada gravação de linhas novas (já tipadas)."""
+        with self._lock:
+            if self.version is None or self.version != version - 1:
+                self.version = None
+                return
+            try:
+                if sheet_name == SHEET_AGENDA:
+                    if self._dims_aula is not None:
+                        dims = self._aula_dims(data_df)
+                        self._deltas_dims.append(dims[self._dims_aula.index.get_indexer(dims.index) < 0])
+                    self._deltas_aulas.append(_aggregate_aulas(data_df))
+                    self._deltas_horarios.append(aggregate_horarios(data_df))
+                elif sheet_name == SHEET_PAGAMENTOS:
+                    if self._dims_aula is None:
+                        dims = self.handler.storage.aula_dims(data_df['referencia_aula_id'])
+                    else:
+                        dims = self._dims_of(data_df['referencia_aula_id'])
+                    self._deltas_pagamentos.append(_aggregate_pagamentos(data_df, dims))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Aviso: cubos serão recalculados ({e}).")
+                self.version = None
+                return
+            self.version = version
+
+    def _on_reload(self, sheet_names, version):
+        """Abas relidas do arquivo: os cubos só são refeitos se a agenda ou os pagamentos mudaram."""
+        with self._lock:
+            if self.version == version:
+                return  # já refeitos para esta versão
+            if self.version == version - 1 and not {SHEET_AGENDA, SHEET_PAGAMENTOS} & set(sheet_names):
+                self.version = version
+            else:
+                self.version = None
+
+    def _dims_of(self, aula_ids):
+        """Dimensões só das aulas `aula_ids`, sem juntar os deltas ao índice inteiro."""
+        if not self._deltas_dims:
+            return self._dims_aula
+        ids = pd.unique(aula_ids.dropna())
+        posicoes = self._dims_aula.index.get_indexer(ids)
+        return self._first_dims(pd.concat([self._dims_aula.iloc[posicoes[posicoes >= 0]], *self._deltas_dims]))
+
+    @staticmethod
+    def _aula_dims(agenda):
+        """Instrumento e professor de cada aula, indexados pelo id da aula (sem ids repetidos)."""
+        return DailyRollups._first_dims(agenda.set_index('id')[['instrumento_id', 'professor_id']])
+
+    @staticmethod
+    def _first_dims(dims):
+        return dims[~dims.index.duplicated(keep='first')]
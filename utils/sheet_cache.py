@@ -0,0 +1,291 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+
+# O Parquet depende do pyarrow, que é opcional. Sem ele, o cache usa pickle.
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_DISPONIVEL = True
+except ImportError:
+    PARQUET_DISPONIVEL = False
+
+MANIFEST_VERSION = 2
+MANIFEST_NAME = "manifest.json"
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_DOC_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+# Partes compartilhadas por todas as abas e as entradas que as abas referenciam por posição
+_SHARED_PARTS = ("xl/sharedStrings.xml", "xl/styles.xml")
+_SHARED_ENTRIES = {f"{_NS_MAIN}si", f"{_NS_MAIN}xf", f"{_NS_MAIN}numFmt"}
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Calcula o SHA-256 do arquivo lendo em blocos."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sheet_part_crcs(xlsx_path):
+    """{aba: CRC32 da parte XML} na ordem do workbook, lido do diretório do zip (sem descompactar)."""
+    with zipfile.ZipFile(xlsx_path) as zf:
+        infos = {info.filename: info for info in zf.infolist()}
+        workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+        rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+
+    targets = {}
+    for rel in rels.iter(f"{_NS_PKG_REL}Relationship"):
+        target = rel.get("Target", "").lstrip("/")
+        if not target.startswith("xl/"):
+            target = f"xl/{target}"
+        targets[rel.get("Id")] = target
+
+    crcs = {}
+    for sheet in workbook.iter(f"{_NS_MAIN}sheet"):
+        part = targets.get(sheet.get(f"{_NS_DOC_REL}id"))
+        info = infos.get(part)
+        crcs[sheet.get("name")] = info.CRC if info is not None else None
+
+    shared = {part: infos[part].CRC for part in _SHARED_PARTS if part in infos}
+    return crcs, shared
+
+
+def _shared_entries(zf, part, limite=None):
+    """(nº de entradas da parte, hash das primeiras `limite` entradas, ou de todas)."""
+    digest = hashlib.sha1()
+    n = 0
+    with zf.open(part) as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag in _SHARED_ENTRIES:
+                if limite is None or n < limite:
+                    digest.update(repr((elem.tag, sorted(elem.attrib.items()), "".join(elem.itertext()))).encode())
+                n += 1
+                elem.clear()
+    return n, digest.hexdigest()
+
+
+def sheet_fingerprints(xlsx_path):
+    """({aba: CRC}, {parte compartilhada: CRC, nº de entradas e hash delas}). Ver stale_sheets."""
+    crcs, shared = sheet_part_crcs(xlsx_path)
+    compartilhadas = {}
+    with zipfile.ZipFile(xlsx_path) as zf:
+        for part, crc in shared.items():
+            n, digest = _shared_entries(zf, part)
+            compartilhadas[part] = {"crc": f"{crc:08x}", "entradas": n, "hash": digest}
+    por_aba = {name: (f"{crc:08x}" if crc is not None else None) for name, crc in crcs.items()}
+    return por_aba, compartilhadas
+
+
+def stale_sheets(xlsx_path, anterior, atual):
+    """
+    Abas alteradas entre duas impressões digitais do workbook. Strings e
+    estilos só acrescentados no fim não mudam as abas antigas; se uma entrada
+    existente mudou, todas as abas são dadas como alteradas.
+    """
+    por_aba, compartilhadas = atual
+    por_aba_antes, compartilhadas_antes = anterior or ({}, {})
+    alteradas = [name for name, fp in por_aba.items() if fp is None or por_aba_antes.get(name) != fp]
+    for part, info in compartilhadas.items():
+        antes = compartilhadas_antes.get(part)
+        if antes is None:
+            if por_aba_antes:
+                return list(por_aba)
+            continue
+        if antes["crc"] == info["crc"]:
+            continue
+        if info["entradas"] < antes["entradas"]:
+            return list(por_aba)
+        with zipfile.ZipFile(xlsx_path) as zf:
+            _, digest = _shared_entries(zf, part, antes["entradas"])
+        if digest != antes["hash"]:
+            return list(por_aba)
+    if set(compartilhadas_antes) - set(compartilhadas):
+        return list(por_aba)
+    return alteradas
+
+
+class SheetCache:
+    """
+    Cache em disco das abas do Excel (Parquet, ou pickle), ao lado do .xlsx.
+    O manifest guarda mtime, tamanho e SHA-256 do workbook e uma impressão
+    digital por aba: só as abas alteradas são relidas do Excel.
+    """
+
+    def __init__(self, xlsx_path, cache_dir=None, schema_key=None):
+        self.xlsx_path = xlsx_path
+        self.schema_key = schema_key
+        if not cache_dir:
+            base = os.path.splitext(os.path.basename(xlsx_path))[0]
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(xlsx_path)), f".{base}.cache")
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+
+    # --- Leitura ---
+
+    def load(self, read_sheets, only=None):
+        """
+        {aba: DataFrame}, do cache quando ele vale. `read_sheets(nomes)` lê do
+        Excel as abas ausentes ou desatualizadas. Com `only`, só essas abas.
+        """
+        manifest = self._read_manifest()
+        stat = os.stat(self.xlsx_path)
+        pedidas = lambda names: [name for name in names if only is None or name in only]
+
+        if manifest and self._source_matches_stat(manifest, stat) and self._files_present(manifest):
+            return self._read_cached(manifest, pedidas(manifest["sheets"]))
+
+        sha = file_sha256(self.xlsx_path)
+        if manifest and manifest["source"].get("sha256") == sha and self._files_present(manifest):
+            # Conteúdo idêntico (ex.: arquivo copiado ou "tocado"): só atualiza o mtime
+            manifest["source"] = self._source_info(stat, sha)
+            self._write_manifest(manifest)
+            return self._read_cached(manifest, pedidas(manifest["sheets"]))
+
+        fingerprints, shared = atual = sheet_fingerprints(self.xlsx_path)
+        old_sheets = manifest["sheets"] if manifest else {}
+        anterior = ({name: entry["fingerprint"] for name, entry in old_sheets.items()}, manifest["shared"]) if manifest else None
+        stale = set(stale_sheets(self.xlsx_path, anterior, atual)) | {
+            name for name in fingerprints
+            if name in old_sheets and not os.path.exists(os.path.join(self.cache_dir, old_sheets[name]["file"]))
+        }
+        fresh = [name for name in fingerprints if name not in stale]
+        lidas_do_excel = pedidas(name for name in fingerprints if name in stale)
+
+        new_manifest = {
+            "version": MANIFEST_VERSION,
+            "schema": self.schema_key,
+            # Sem a origem, a próxima carga confere de novo as abas que ficaram de fora
+            "source": self._source_info(stat, sha) if len(lidas_do_excel) == len(stale) else {},
+            "shared": shared,
+            "sheets": {},
+        }
+        dataframes = {}
+        if lidas_do_excel:
+            print(f"Atualizando cache das abas: {', '.join(lidas_do_excel)}")
+            lidas = read_sheets(lidas_do_excel)
+            for name in lidas_do_excel:
+                df = lidas[name]
+                new_manifest["sheets"][name] = self._write_sheet(name, df, fingerprints[name])
+                dataframes[name] = df
+        for name in fresh:
+            new_manifest["sheets"][name] = old_sheets[name]
+        dataframes.update(self._read_cached(new_manifest, pedidas(fresh)))
+
+        self._remove_orphans(new_manifest)
+        self._write_manifest(new_manifest)
+        # Mantém a ordem original das abas do workbook
+        return {name: dataframes[name] for name in pedidas(fingerprints)}
+
+    def _read_cached(self, manifest, names):
+        dataframes = {}
+        for name in names:
+            entry = manifest["sheets"][name]
+            path = os.path.join(self.cache_dir, entry["file"])
+            if entry["format"] == "parquet":
+                dataframes[name] = pd.read_parquet(path)
+            else:
+                with open(path, "rb") as f:
+                    dataframes[name] = pickle.load(f)
+        return dataframes
+
+    # --- Escrita ---
+
+    def store(self, dataframes):
+        """Grava no cache os DataFrames que acabaram de ser salvos no .xlsx."""
+        stat = os.stat(self.xlsx_path)
+        fingerprints, shared = sheet_fingerprints(self.xlsx_path)
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "schema": self.schema_key,
+            "source": self._source_info(stat, file_sha256(self.xlsx_path)),
+            "shared": shared,
+            "sheets": {},
+        }
+        for name, df in dataframes.items():
+            manifest["sheets"][name] = self._write_sheet(name, df, fingerprints.get(name))
+        self._remove_orphans(manifest)
+        self._write_manifest(manifest)
+
+    def clear(self):
+        """Remove todos os arquivos do cache."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for filename in os.listdir(self.cache_dir):
+            os.remove(os.path.join(self.cache_dir, filename))
+
+    def _write_sheet(self, name, df, fingerprint):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        stem = re.sub(r"\W", "_", name)
+        if PARQUET_DISPONIVEL:
+            filename = f"{stem}.parquet"
+            try:
+                self._atomic_write(filename, lambda path: df.to_parquet(path, index=False))
+                return {"file": filename, "format": "parquet", "fingerprint": fingerprint}
+            except Exception as e:
+                # Ex.: colunas 'object' com tipos misturados, que o Arrow não aceita
+                print(f"Aviso: aba '{name}' não pôde ser gravada em Parquet ({e}); usando pickle.")
+        filename = f"{stem}.pkl"
+
+        def dump(path):
+            with open(path, "wb") as f:
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._atomic_write(filename, dump)
+        return {"file": filename, "format": "pickle", "fingerprint": fingerprint}
+
+    def _atomic_write(self, filename, write):
+        final_path = os.path.join(self.cache_dir, filename)
+        tmp_path = f"{final_path}.tmp"
+        write(tmp_path)
+        os.replace(tmp_path, final_path)
+
+    def _remove_orphans(self, manifest):
+        in_use = {entry["file"] for entry in manifest["sheets"].values()} | {MANIFEST_NAME}
+        for filename in os.listdir(self.cache_dir):
+            if filename not in in_use:
+                os.remove(os.path.join(self.cache_dir, filename))
+
+    # --- Manifest ---
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("schema") != self.schema_key:
+            return None
+        return manifest
+
+    def _write_manifest(self, manifest):
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        def dump(path):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        self._atomic_write(MANIFEST_NAME, dump)
+
+    def _files_present(self, manifest):
+        return all(
+            os.path.exists(os.path.join(self.cache_dir, entry["file"]))
+            for entry in manifest["sheets"].values()
+        )
+
+    @staticmethod
+    def _source_info(stat, sha):
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha}
+
+    @staticmethod
+    def _source_matches_stat(manifest, stat):
+        source = manifest["source"]
+        return source.get("mtime_ns") == stat.st_mtime_ns and source.get("size") == stat.st_size
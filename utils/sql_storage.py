@@ -0,0 +1,271 @@
+import datetime
+import os
+import re
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_float_dtype, is_integer_dtype, is_timedelta64_dtype
+
+from config.schema import SHEET_SCHEMAS, SHEET_DATE_KEYS
+from config.settings import SHEET_AGENDA, SHEET_PAGAMENTOS
+from utils.dtypes import apply_schema, to_storage
+from utils.result_cache import reads
+from utils.storage import StorageBackend, prepare_sheet
+
+# O DuckDB é opcional: sem ele, só o SQLite fica disponível
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Colunas de chave estrangeira que ganham índice (junções das análises)
+_FK_COLUMNS = ('aluno_id', 'professor_id', 'instrumento_id', 'referencia_aula_id')
+
+
+def _sql_date(value):
+    return f"{pd.Timestamp(value):%Y-%m-%d}"
+
+
+class SqlStorage(StorageBackend):
+    """
+    Abas em tabelas de um banco embutido (SQLite ou DuckDB), com datas como
+    texto 'AAAA-MM-DD' e horários em segundos. Agenda e pagamentos ficam no
+    banco: períodos, junções e agregações são consultas.
+    """
+
+    pushdown = True
+    lazy_sheets = frozenset({SHEET_AGENDA, SHEET_PAGAMENTOS})
+
+    def __init__(self, db_path, engine="sqlite"):
+        self.db_path = db_path
+        self.name = engine
+        self._lock = threading.RLock()
+        if engine == "duckdb":
+            if duckdb is None:
+                raise RuntimeError("DATA_BACKEND=duckdb, mas o pacote duckdb não está instalado (pip install duckdb).")
+            self._con = duckdb.connect(db_path)
+        else:
+            # As consultas rodam nas threads do RefreshScheduler; o lock serializa o acesso
+            self._con = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._con.execute("PRAGMA journal_mode=WAL")
+
+    @property
+    def path(self):
+        return self.db_path
+
+    # --- Consultas ---
+
+    def query(self, sql, params=()):
+        """Executa uma consulta e devolve o resultado como DataFrame (datas viram 'AAAA-MM-DD')."""
+        params = [_sql_date(p) if isinstance(p, datetime.date) else p for p in params]
+        reads(*(nome for nome in set(re.findall(r'"(\w+)"', sql)) if nome in SHEET_SCHEMAS))
+        with self._lock:
+            cursor = self._con.execute(sql, params)
+            colunas = [d[0] for d in cursor.description]
+            linhas = cursor.fetchall()
+        return pd.DataFrame.from_records(linhas, columns=colunas)
+
+    def tables(self):
+        if self.name == "duckdb":
+            nomes = self.query("SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'")
+        else:
+            nomes = self.query("SELECT name AS table_name FROM sqlite_master WHERE type = 'table'")
+        return set(nomes['table_name'])
+
+    def columns(self, sheet_name):
+        with self._lock:
+            cursor = self._con.execute(f'SELECT * FROM "{sheet_name}" LIMIT 0')
+            return [d[0] for d in cursor.description]
+
+    def _from_sql(self, sheet_name, df):
+        """Formato do banco -> DataFrame tipado e ordenado como as abas do Excel."""
+        schema = SHEET_SCHEMAS.get(sheet_name, {})
+        horarios = {
+            col: pd.to_timedelta(pd.to_numeric(df[col], errors="coerce"), unit="s")
+            for col, kind in schema.items() if kind == 'time' and col in df.columns
+        }
+        if horarios:
+            df = df.assign(**horarios)
+        return prepare_sheet(sheet_name, df)
+
+    def load_sheets(self, sheet_names):
+        existentes = self.tables()
+        faltando = [name for name in sheet_names if name not in existentes]
+        if faltando:
+            print(f"Aviso: tabelas ausentes no banco {self.db_path}: {', '.join(faltando)} "
+                  f"(rode scripts/migrar_para_sql.py).")
+        return {
+            name: self.read_sheet(name) if name in existentes else pd.DataFrame()
+            for name in sheet_names if name not in self.lazy_sheets
+        }
+
+    def read_sheet(self, sheet_name):
+        if sheet_name not in self.tables():
+            return pd.DataFrame()
+        return self._from_sql(sheet_name, self.query(f'SELECT * FROM "{sheet_name}"'))
+
+    def read_period(self, sheet_name, start_date, end_date):
+        """Linhas com a data-chave no período, pelo índice da data (sem ler a tabela inteira)."""
+        date_col = SHEET_DATE_KEYS[sheet_name]
+        df = self.query(
+            f'SELECT * FROM "{sheet_name}" WHERE "{date_col}" BETWEEN ? AND ? ORDER BY "{date_col}"',
+            (_sql_date(start_date), _sql_date(end_date)),
+        )
+        return self._from_sql(sheet_name, df)
+
+    # --- Agregações usadas pelos cubos diários (utils/rollups.py) ---
+
+    def cube_aulas(self, sem_referencia):
+        """Células do cubo de aulas: dia x status x instrumento x professor, com nº de aulas e horas."""
+        df = self.query(f'''
+            SELECT data_aula AS dia, status,
+                   COALESCE(instrumento_id, ?) AS instrumento_id, COALESCE(professor_id, ?) AS professor_id,
+                   COUNT(*) AS aulas, COALESCE(SUM(hora_fim - hora_inicio), 0) / 3600.0 AS horas
+            FROM "{SHEET_AGENDA}"
+            WHERE data_aula IS NOT NULL AND status IS NOT NULL
+            GROUP BY 1, 2, 3, 4
+        ''', (sem_referencia, sem_referencia))
+        return self._cube(df)
+
+    def cube_pagamentos(self, sem_referencia):
+        """Células do cubo de pagamentos, com instrumento e professor da aula de referência."""
+        df = self.query(f'''
+            SELECT p.data_pagamento AS dia, p.status,
+                   COALESCE(a.instrumento_id, ?) AS instrumento_id, COALESCE(a.professor_id, ?) AS professor_id,
+                   COALESCE(SUM(p.valor_pago), 0) AS valor, COUNT(*) AS pagamentos
+            FROM "{SHEET_PAGAMENTOS}" p LEFT JOIN "{SHEET_AGENDA}" a ON a.id = p.referencia_aula_id
+            WHERE p.data_pagamento IS NOT NULL AND p.status IS NOT NULL
+            GROUP BY 1, 2, 3, 4
+        ''', (sem_referencia, sem_referencia))
+        return self._cube(df)
+
+    def hour_counts(self):
+        """Aulas por dia e hora de início (0-23)."""
+        df = self.query(f'''
+            SELECT data_aula AS dia, CAST((hora_inicio - hora_inicio % 3600) / 3600 AS INTEGER) % 24 AS hora,
+                   COUNT(*) AS aulas
+            FROM "{SHEET_AGENDA}" WHERE data_aula IS NOT NULL AND hora_inicio IS NOT NULL
+            GROUP BY 1, 2
+        ''')
+        df['dia'] = pd.to_datetime(df['dia'], format="ISO8601")
+        return df
+
+    def aula_dims(self, ids):
+        """Instrumento e professor das aulas `ids`, indexados pelo id da aula (busca pelo índice do id)."""
+        ids = [int(i) for i in pd.unique(pd.Series(ids).dropna())]
+        frames = []
+        # Em lotes, para não passar do limite de parâmetros do SQLite
+        for inicio in range(0, len(ids), 900):
+            lote = ids[inicio:inicio + 900]
+            frames.append(self.query(
+                f'SELECT id, MIN(instrumento_id) AS instrumento_id, MIN(professor_id) AS professor_id '
+                f'FROM "{SHEET_AGENDA}" WHERE id IN ({", ".join("?" * len(lote))}) GROUP BY id',
+                lote,
+            ))
+        if not frames:
+            return pd.DataFrame(columns=['instrumento_id', 'professor_id'], index=pd.Index([], name='id'))
+        return pd.concat(frames, ignore_index=True).set_index('id')
+
+    @staticmethod
+    def _cube(df):
+        if df.empty:
+            return df
+        df['dia'] = pd.to_datetime(df['dia'], format="ISO8601")
+        df['status'] = df['status'].astype('category')
+        for col in ('instrumento_id', 'professor_id'):
+            df[col] = df[col].fillna(-1).astype(np.int32)
+        return df.sort_values(['dia', 'status', 'instrumento_id', 'professor_id'], ignore_index=True)
+
+    # --- Escrita ---
+
+    @staticmethod
+    def _to_sql(sheet_name, df):
+        """DataFrame (tipado ou não) -> formato do banco."""
+        schema = SHEET_SCHEMAS.get(sheet_name, {})
+        df = apply_schema(df, schema)
+        segundos = {
+            col: df[col].dt.total_seconds().round().astype("Int64")
+            for col, kind in schema.items() if kind == 'time' and col in df.columns and is_timedelta64_dtype(df[col])
+        }
+        return to_storage(df.assign(**segundos) if segundos else df, schema)
+
+    @staticmethod
+    def _sql_type(series):
+        if is_bool_dtype(series) or is_integer_dtype(series):
+            return "BIGINT"
+        if is_float_dtype(series):
+            return "DOUBLE"
+        return "TEXT"
+
+    @staticmethod
+    def _rows(df, chunk_rows=100_000):
+        """Linhas como tuplas (NaN -> NULL), convertidas em blocos."""
+        for inicio in range(0, len(df), chunk_rows):
+            bloco = df.iloc[inicio:inicio + chunk_rows].astype(object)
+            yield from bloco.where(bloco.notna(), None).itertuples(index=False, name=None)
+
+    def create_table(self, sheet_name, df, replace=False):
+        """Cria a tabela com as colunas do DataFrame (já no formato do banco) e os índices das análises."""
+        colunas = ", ".join(f'"{col}" {self._sql_type(df[col])}' for col in df.columns)
+        with self._lock:
+            if replace:
+                self._con.execute(f'DROP TABLE IF EXISTS "{sheet_name}"')
+            self._con.execute(f'CREATE TABLE IF NOT EXISTS "{sheet_name}" ({colunas})')
+            indexadas = [SHEET_DATE_KEYS.get(sheet_name), 'id', *_FK_COLUMNS]
+            for col in dict.fromkeys(c for c in indexadas if c in df.columns):
+                self._con.execute(f'CREATE INDEX IF NOT EXISTS "ix_{sheet_name}_{col}" ON "{sheet_name}" ("{col}")')
+
+    def append(self, sheet_name, data_df):
+        """Uma transação com um INSERT das linhas novas: o custo não depende do tamanho da tabela."""
+        if data_df.empty:
+            return
+        df = self._to_sql(sheet_name, data_df)
+        with self._lock:
+            if sheet_name not in self.tables():
+                self.create_table(sheet_name, df)
+            colunas = [col for col in self.columns(sheet_name) if col in df.columns]
+            self._insert(sheet_name, df[colunas])
+
+    def _insert(self, sheet_name, df):
+        nomes = ", ".join(f'"{col}"' for col in df.columns)
+        with self._lock:
+            self._con.execute("BEGIN")
+            try:
+                if self.name == "duckdb":
+                    # Inserção em massa direto do DataFrame
+                    self._con.register("_linhas_novas", df)
+                    self._con.execute(f'INSERT INTO "{sheet_name}" ({nomes}) SELECT {nomes} FROM _linhas_novas')
+                    self._con.unregister("_linhas_novas")
+                else:
+                    marcadores = ", ".join("?" * len(df.columns))
+                    self._con.executemany(f'INSERT INTO "{sheet_name}" ({nomes}) VALUES ({marcadores})', self._rows(df))
+                self._con.execute("COMMIT")
+            except BaseException:
+                self._con.execute("ROLLBACK")
+                raise
+
+    def import_sheets(self, dataframes):
+        """Recria as tabelas a partir de DataFrames tipados (usado pelo migrador)."""
+        for sheet_name, df in dataframes.items():
+            if df.empty and len(df.columns) == 0:
+                continue
+            sql_df = self._to_sql(sheet_name, df)
+            self.create_table(sheet_name, sql_df, replace=True)
+            if not sql_df.empty:
+                self._insert(sheet_name, sql_df)
+        if self.name != "duckdb":
+            with self._lock:
+                self._con.execute("ANALYZE")
+
+    def close(self):
+        with self._lock:
+            self._con.close()
+
+
+def remove_database(db_path):
+    """Apaga o arquivo do banco (e os arquivos -wal/-shm do SQLite)."""
+    for sufixo in ("", "-wal", "-shm", ".wal"):
+        if os.path.exists(db_path + sufixo):
+            os.remove(db_path + sufixo)
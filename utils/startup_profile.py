@@ -0,0 +1,80 @@
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Linha do tempo da inicialização (main.py --profile-startup): etapas, marcos e, com instalar(), imports."""
+
+    def __init__(self, inicio=None, profundidade=2):
+        self.inicio = inicio if inicio is not None else time.perf_counter()
+        self.profundidade = profundidade
+        self.eventos = []  # (início em s, duração em s ou None, nome, thread)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._import_original = None
+
+    def _registrar(self, inicio, duracao, nome):
+        with self._lock:
+            self.eventos.append((inicio - self.inicio, duracao, nome, threading.current_thread().name))
+
+    @contextmanager
+    def etapa(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._registrar(inicio, time.perf_counter() - inicio, nome)
+
+    def marco(self, nome):
+        self._registrar(time.perf_counter(), None, nome)
+
+    # --- Imports ---
+
+    def instalar(self):
+        """Passa a medir os imports (troca builtins.__import__ até desinstalar())."""
+        if self._import_original is not None:
+            return
+        original = self._import_original = builtins.__import__
+        local = self._local
+
+        def importar(name, globals=None, locals=None, fromlist=(), level=0):
+            nivel = getattr(local, "nivel", 0)
+            if level or name in sys.modules or nivel >= self.profundidade:
+                return original(name, globals, locals, fromlist, level)
+            local.nivel = nivel + 1
+            inicio = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                local.nivel = nivel
+                self._registrar(inicio, time.perf_counter() - inicio, "  " * nivel + f"import {name}")
+
+        builtins.__import__ = importar
+
+    def desinstalar(self):
+        if self._import_original is not None:
+            builtins.__import__ = self._import_original
+            self._import_original = None
+
+    # --- Relatório ---
+
+    def relatorio(self, minimo_ms=1.0):
+        """Texto com as etapas em ordem de início; imports abaixo de `minimo_ms` ficam de fora."""
+        with self._lock:
+            eventos = sorted(self.eventos)
+        linhas = [f"{'Início (ms)':>11} {'Duração (ms)':>12}  {'Etapa':<52} Thread"]
+        imports = {}
+        for inicio, duracao, nome, thread in eventos:
+            if nome.lstrip().startswith("import "):
+                if not nome.startswith(" "):
+                    imports[thread] = imports.get(thread, 0.0) + duracao
+                if duracao * 1000 < minimo_ms:
+                    continue
+            texto = f"{duracao * 1000:>12.1f}" if duracao is not None else f"{'●':>12}"
+            linhas.append(f"{inicio * 1000:>11.1f} {texto}  {nome:<52} {thread}")
+        for thread, total in imports.items():
+            linhas.append(f"Total em imports ({thread}): {total * 1000:.1f} ms")
+        return "\n".join(linhas)
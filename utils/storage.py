@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+
+from config.schema import SHEET_SCHEMAS, SHEET_DATE_KEYS, SCHEMA_VERSION
+from config.settings import DATA_SQL_PATH, DATA_STREAM_CHUNK_ROWS, DATA_XLSX_PATH, JOURNAL_COMPACT_THRESHOLD
+from utils.dtypes import apply_schema, to_storage
+from utils.excel_stream import read_sheets_streaming
+from utils.insert_journal import InsertJournal
+from utils.sheet_cache import SheetCache, file_sha256, sheet_fingerprints, stale_sheets
+
+
+def prepare_sheet(sheet_name, df):
+    """Aplica o esquema da aba e a ordena pela data-chave (NaT no fim), se ainda não estiver."""
+    df = apply_schema(df, SHEET_SCHEMAS.get(sheet_name, {}))
+    date_col = SHEET_DATE_KEYS.get(sheet_name)
+    if date_col is None or date_col not in df.columns:
+        return df
+    datas = df[date_col]
+    n_validas = int(datas.notna().sum())
+    if datas.iloc[:n_validas].notna().all() and datas.iloc[:n_validas].is_monotonic_increasing:
+        return df
+    # Ordenação estável: linhas com a mesma data mantêm a ordem de inserção
+    return df.sort_values(date_col, kind='stable', na_position='last', ignore_index=True)
+
+
+class StorageBackend:
+    """
+    Onde o DataHandler guarda as abas: leitura inicial e gravação. Backends com
+    `pushdown` (SQL) também respondem consultas sem a aba em memória, e as abas
+    de `lazy_sheets` só são carregadas se alguém pedir a aba inteira.
+    """
+
+    name = None
+    pushdown = False
+    lazy_sheets = frozenset()
+
+    @property
+    def path(self):
+        raise NotImplementedError
+
+    def load_sheets(self, sheet_names):
+        """{aba: DataFrame} das abas carregadas na inicialização (fora as de `lazy_sheets`)."""
+        raise NotImplementedError
+
+    def read_sheet(self, sheet_name):
+        """Aba inteira (usado para as abas de `lazy_sheets`)."""
+        raise NotImplementedError
+
+    def pending_inserts(self, sheet_names):
+        """Inserções gravadas mas ainda fora das abas de `load_sheets` (ex.: journal)."""
+        return {}
+
+    def append(self, sheet_name, data_df):
+        """Grava as linhas novas de forma durável."""
+        raise NotImplementedError
+
+    def needs_compaction(self):
+        return False
+
+    def close(self):
+        pass
+
+
+class ExcelStorage(StorageBackend):
+    """.xlsx com cache colunar; as inserções vão para o journal até a compactação."""
+
+    name = "excel"
+
+    def __init__(self, file_path, use_cache=True, cache_dir=None):
+        self.file_path = file_path
+        self.cache = SheetCache(self.file_path, cache_dir, self._schema_key()) if use_cache else None
+        self.journal = InsertJournal(self.file_path)
+        self._fingerprints = None
+
+    @property
+    def path(self):
+        return self.file_path
+
+    @staticmethod
+    def _schema_key():
+        declarado = json.dumps(SHEET_SCHEMAS, sort_keys=True).encode("utf-8")
+        return f"v{SCHEMA_VERSION}-{hashlib.sha1(declarado).hexdigest()[:12]}"
+
+    # --- Leitura ---
+
+    def load_sheets(self, sheet_names):
+        """Carrega todas as abas do arquivo Excel para um dicionário de DataFrames."""
+        if not os.path.exists(self.file_path):
+            print("Arquivo Excel não encontrado. Criando um novo com abas vazias.")
+            self.initialize(sheet_names)
+            self._fingerprints = self._read_fingerprints()
+            return {name: pd.DataFrame() for name in sheet_names}
+
+        # Antes da leitura: uma gravação durante a leitura aparece como alteração depois
+        self._fingerprints = self._read_fingerprints()
+        if self.cache is not None:
+            try:
+                return self.cache.load(self._read_excel_sheets)
+            except Exception as e:
+                print(f"Aviso: cache indisponível ({e}). Lendo o arquivo Excel completo.")
+
+        try:
+            if DATA_STREAM_CHUNK_ROWS > 0:
+                return read_sheets_streaming(self.file_path, chunk_rows=DATA_STREAM_CHUNK_ROWS)
+            # Carrega todas as abas de uma vez
+            return pd.read_excel(self.file_path, sheet_name=None)
+        except Exception as e:
+            print(f"❌ Erro ao ler o arquivo Excel: {e}")
+            return {name: pd.DataFrame() for name in sheet_names}
+
+    def _read_excel_sheets(self, sheet_names):
+        """Lê apenas as abas informadas do arquivo Excel, já tipadas (usado pelo cache)."""
+        if DATA_STREAM_CHUNK_ROWS > 0:
+            lidas = read_sheets_streaming(self.file_path, list(sheet_names), DATA_STREAM_CHUNK_ROWS)
+        else:
+            lidas = pd.read_excel(self.file_path, sheet_name=list(sheet_names))
+        return {name: prepare_sheet(name, df) for name, df in lidas.items()}
+
+    def read_sheet(self, sheet_name):
+        return self._read_excel_sheets([sheet_name])[sheet_name]
+
+    def _read_fingerprints(self):
+        try:
+            return sheet_fingerprints(self.file_path)
+        except (OSError, KeyError, zipfile.BadZipFile, ET.ParseError):
+            # Arquivo ausente ou no meio de uma gravação
+            return None
+
+    def changed_sheets(self):
+        """Abas cujo conteúdo no .xlsx mudou desde a última leitura."""
+        atuais = self._read_fingerprints()
+        if atuais is None:
+            return []
+        return stale_sheets(self.file_path, self._fingerprints, atuais)
+
+    def reload_sheets(self, sheet_names):
+        """Relê só as abas informadas (pelo cache colunar, quando ligado)."""
+        atuais = self._read_fingerprints()
+        lidas = None
+        if self.cache is not None:
+            try:
+                lidas = self.cache.load(self._read_excel_sheets, only=set(sheet_names))
+            except Exception as e:
+                print(f"Aviso: cache indisponível ({e}). Lendo as abas alteradas do Excel.")
+        if lidas is None:
+            lidas = self._read_excel_sheets(sheet_names)
+        if atuais is not None:
+            # Abas que não foram relidas mantêm a impressão antiga: se mudaram
+            # nesse meio tempo, aparecem na próxima verificação
+            por_aba, compartilhadas = atuais
+            anteriores = self._fingerprints[0] if self._fingerprints else {}
+            self._fingerprints = (
+                {name: fp if name in lidas else anteriores.get(name) for name, fp in por_aba.items()},
+                compartilhadas,
+            )
+        return {name: lidas[name] for name in sheet_names if name in lidas}
+
+    def pending_inserts(self, sheet_names):
+        """As inserções do journal ainda não compactadas no Excel."""
+        try:
+            pendentes = self.journal.replay(sheet_names, lambda: file_sha256(self.file_path))
+        except Exception as e:
+            print(f"❌ Erro ao ler o journal de inserções: {e}")
+            return {}
+        if pendentes:
+            print(f"Journal: {self.journal.pending_rows} linha(s) ainda não compactadas no Excel.")
+        return pendentes
+
+    # --- Escrita ---
+
+    def append(self, sheet_name, data_df):
+        self.journal.append(sheet_name, data_df)
+
+    def needs_compaction(self):
+        return self.journal.pending_rows >= JOURNAL_COMPACT_THRESHOLD
+
+    def initialize(self, sheet_names):
+        """Cria um arquivo Excel vazio com todas as abas necessárias se ele não existir."""
+        if not os.path.exists(self.file_path):
+            with pd.ExcelWriter(self.file_path, engine='openpyxl') as writer:
+                for sheet_name in sheet_names:
+                    # Cria uma aba vazia para cada nome de sheet
+                    pd.DataFrame().to_excel(writer, sheet_name=sheet_name, index=False)
+            print(f"Arquivo '{self.file_path}' criado com as abas necessárias.")
+
+    def _temp_workbook_path(self):
+        # O openpyxl exige a extensão .xlsx também no arquivo temporário
+        root, ext = os.path.splitext(self.file_path)
+        return f"{root}.tmp{ext}"
+
+    def write_snapshot(self, dataframes):
+        """Grava os DataFrames num .xlsx temporário e devolve o SHA-256 dele (None em caso de erro)."""
+        tmp_path = self._temp_workbook_path()
+        try:
+            with pd.ExcelWriter(tmp_path, engine='openpyxl') as writer:
+                for sheet_name, df in dataframes.items():
+                    # Datas e horários voltam ao formato texto do arquivo original
+                    to_storage(df, SHEET_SCHEMAS.get(sheet_name, {})).to_excel(writer, sheet_name=sheet_name, index=False)
+            sha = file_sha256(tmp_path)
+        except Exception as e:
+            print(f"❌ Erro ao salvar o arquivo Excel: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+        return sha
+
+    def commit_snapshot(self, sha, line_counts, dataframes):
+        """Troca o .xlsx pelo temporário de write_snapshot e descarta do journal as linhas já gravadas."""
+        self.journal.mark_compacted(sha, line_counts)
+        os.replace(self._temp_workbook_path(), self.file_path)
+        # O arquivo novo reflete a memória: não deve ser visto como alteração externa
+        self._fingerprints = self._read_fingerprints() or self._fingerprints
+        print("✅ Dados salvos no arquivo Excel com sucesso.")
+        if self.cache is not None:
+            try:
+                # Os DataFrames em memória já refletem o arquivo salvo
+                self.cache.store(dataframes)
+            except Exception as e:
+                print(f"Aviso: não foi possível atualizar o cache: {e}")
+        self.journal.drop_compacted(line_counts)
+
+
+def create_storage(backend, path=None, use_cache=True, cache_dir=None):
+    """Backend configurado em DATA_BACKEND: 'excel', 'sqlite' ou 'duckdb'."""
+    if backend == "excel":
+        return ExcelStorage(path or DATA_XLSX_PATH, use_cache, cache_dir)
+    if backend in ("sqlite", "duckdb"):
+        from utils.sql_storage import SqlStorage
+        return SqlStorage(path or DATA_SQL_PATH, engine=backend)
+    raise ValueError(f"Backend de armazenamento desconhecido: '{backend}' (use excel, sqlite ou duckdb)")